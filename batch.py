@@ -0,0 +1,312 @@
+import io
+import json
+import multiprocessing
+import os
+import platform
+import signal
+import sys
+import time
+from contextlib import redirect_stdout
+from queue import Empty
+
+# Segundos por programa (compilar + ejecutar) antes de darlo por colgado
+DEFAULT_TIMEOUT = 10.0
+# Cada cuántos segundos se revisa si un trabajador murió sin responder
+WORKER_POLL = 0.5
+
+# Códigos de salida de cada programa en el reporte
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_TIMEOUT = 2
+
+# Opciones del lote; cada trabajador recibe una copia en init_worker
+_options = {}
+
+
+class TimeLimitExceeded(Exception):
+    pass
+
+
+def read_manifest(path):
+    # Una ruta por línea, relativa al manifiesto; '#' inicia un comentario
+    base = os.path.dirname(os.path.abspath(path))
+    paths = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                paths.append(os.path.join(base, line))
+    return paths
+
+
+def collect_programs(sources):
+    # Directorios (sus *.txt y *.pbin), manifiestos (*.lst) o programas sueltos
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(os.path.join(source, name) for name in os.listdir(source)
+                                if name.endswith(('.txt', '.pbin'))))
+        elif source.endswith('.lst'):
+            paths.extend(read_manifest(source))
+        else:
+            paths.append(source)
+    return paths
+
+
+def init_worker(options):
+    # Un trabajador tibio: importa el compilador y construye el lexer y el
+    # parser una sola vez; cada programa sólo paga su propia compilación
+    _options.update(options)
+    import main
+    import patito_parser
+    from patito_lexer import get_lexer
+    import inliner
+    import loop_optimizer
+    import peephole
+    for module in options['rule_modules']:
+        __import__(module)
+    get_lexer()
+    patito_parser.get_parser()
+
+
+def expire(signum, frame):
+    raise TimeLimitExceeded(f"Tiempo límite de {_options['timeout']} s excedido")
+
+
+def compile_program(data):
+    # Regresa la VM (o el código Python con --nativo) y el texto de
+    # diagnóstico del compilador, que no va al reporte salvo si falla
+    from compiler_context import CompilerContext
+    from main import optimize
+    from transpiler import transpile
+    from virtual_machine import VirtualMachine
+
+    diagnostics = io.StringIO()
+    with redirect_stdout(diagnostics):
+        context = CompilerContext()
+        context.parse(data)
+        if context.syntax_errors:
+            raise Exception(f"{context.syntax_errors} errores de sintaxis: "
+                            + ' | '.join(line for line in diagnostics.getvalue().splitlines() if 'Error de sintaxis' in line))
+        optimize(context, _options['optimization_level'], _options['inline_threshold'],
+                 _options['memoize'], _options['rule_modules'])
+    quadruples = context.quadruple_manager.quadruples
+    constants_table = context.memory_manager.constants_table
+    if _options['native']:
+        return transpile(quadruples, constants_table, context.function_directory)
+    return VirtualMachine(quadruples, constants_table, context.function_directory.functions)
+
+
+def new_result(path, worker):
+    return {'path': path, 'status': 'ok', 'exit_code': EXIT_OK, 'stdout': '', 'error': None,
+            'compile_ms': 0.0, 'run_ms': 0.0, 'total_ms': 0.0, 'worker': worker}
+
+
+def run_program(path):
+    # Se ejecuta en un trabajador: compila y corre un programa con su
+    # propio límite de tiempo (SIGALRM) y captura lo que imprime
+    from binary_program import is_binary_program, load_vm
+    from transpiler import run_native
+    from virtual_machine import VirtualMachine
+
+    result = new_result(path, os.getpid())
+    output = io.StringIO()
+    start = time.perf_counter()
+    phase_start = start
+    phase = 'compile_ms'
+    signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, _options['timeout'])
+    try:
+        if is_binary_program(path):
+            program = load_vm(path)
+        else:
+            with open(path, 'r') as f:
+                program = compile_program(f.read())
+        now = time.perf_counter()
+        result['compile_ms'] = (now - phase_start) * 1000
+        phase_start = now
+        phase = 'run_ms'
+        with redirect_stdout(output):
+            # Un binario ya es una VM: --nativo sólo aplica al código fuente
+            if _options['native'] and not isinstance(program, VirtualMachine):
+                run_native(program)
+            else:
+                program.run()
+    except TimeLimitExceeded as e:
+        result.update(status='timeout', exit_code=EXIT_TIMEOUT, error=str(e))
+    except Exception as e:
+        result.update(status='error', exit_code=EXIT_ERROR, error=str(e) or type(e).__name__)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    end = time.perf_counter()
+    result[phase] = (end - phase_start) * 1000
+    result['total_ms'] = (end - start) * 1000
+    result['stdout'] = output.getvalue()
+    return result
+
+
+def worker_loop(options, tasks, results):
+    # Un trabajador del lote: corre los programas que le manda run_batch
+    # por su propia cola hasta recibir None. Tras un límite de tiempo se
+    # retira sin tomar otro: con --nativo antes de Python 3.11 el programa
+    # corre en un hilo que SIGALRM no detiene y que seguiría corriendo
+    # junto a los programas siguientes
+    init_worker(options)
+    for index, path in iter(tasks.get, None):
+        result = run_program(path)
+        results.put((index, result))
+        if result['status'] == 'timeout':
+            return
+
+
+def run_batch(paths, workers=None, **options):
+    # Reparte los programas entre trabajadores tibios; los resultados
+    # quedan en el orden de 'paths'. Cada trabajador recibe un programa a
+    # la vez, así que si muere sin responder (OOM, señal, os._exit) se sabe
+    # cuál perdió: ese programa queda como error. Un trabajador retirado
+    # por límite de tiempo o muerto se reemplaza por uno nuevo
+    options.setdefault('optimization_level', 0)
+    options.setdefault('inline_threshold', 20)
+    options.setdefault('memoize', options['optimization_level'] >= 1)
+    options.setdefault('rule_modules', [])
+    options.setdefault('native', False)
+    options.setdefault('timeout', DEFAULT_TIMEOUT)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    queue = multiprocessing.Queue()
+    pending = list(enumerate(paths))[::-1]
+    # Proceso -> (su cola de tareas, índice del programa que está corriendo)
+    assigned = {}
+    processes = []
+
+    def dispatch(process, tasks):
+        if pending:
+            index, path = pending.pop()
+            tasks.put((index, path))
+            assigned[process] = (tasks, index)
+        else:
+            tasks.put(None)
+            assigned.pop(process, None)
+
+    def spawn():
+        tasks = multiprocessing.Queue()
+        process = multiprocessing.Process(target=worker_loop, args=(options, tasks, queue), daemon=True)
+        process.start()
+        processes.append(process)
+        dispatch(process, tasks)
+
+    def receive(index, result):
+        results[index] = result
+        process = next(process for process, (_, running) in assigned.items() if running == index)
+        tasks, _ = assigned.pop(process)
+        if result['status'] == 'timeout' or not process.is_alive():
+            recycled[0] += 1
+            if pending:
+                spawn()
+        else:
+            dispatch(process, tasks)
+
+    results = [None] * len(paths)
+    recycled = [0]
+    for _ in range(min(workers, len(paths))):
+        spawn()
+    done = 0
+    while done < len(paths):
+        try:
+            receive(*queue.get(timeout=WORKER_POLL))
+            done += 1
+            continue
+        except Empty:
+            pass
+        dead = [process for process in assigned if not process.is_alive()]
+        if not dead:
+            continue
+        # Lo que alcanzó a mandar antes de morir ya está en la cola
+        try:
+            while True:
+                receive(*queue.get_nowait())
+                done += 1
+        except Empty:
+            pass
+        for process in dead:
+            if process not in assigned:
+                continue
+            _, index = assigned.pop(process)
+            results[index] = new_result(paths[index], process.pid)
+            results[index].update(status='error', exit_code=EXIT_ERROR,
+                                  error=f"El trabajador terminó sin responder (código {process.exitcode})")
+            done += 1
+            recycled[0] += 1
+            if pending:
+                spawn()
+    for process in processes:
+        # Uno retirado puede tener todavía el hilo del programa colgado
+        process.join(1)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    elapsed = time.perf_counter() - start
+
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ('ok', 'error', 'timeout')}
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'workers': workers,
+        'options': options,
+        'programs': len(paths),
+        'summary': summary,
+        'total_s': elapsed,
+        'programs_per_s': len(paths) / elapsed if elapsed > 0 else 0.0,
+        'recycled_workers': recycled[0],
+        'results': results,
+    }
+
+
+def main():
+    # Uso: python batch.py DIR|MANIFIESTO.lst|programa.txt ... [-O[N]] [--nativo]
+    #                      [--memo] [--sin-memo] [--inline=N] [--reglas=MOD[,MOD]]
+    #                      [--trabajadores=N] [--limite=SEG] [--json=reporte.json]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith('-')]
+    sources = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    if not sources:
+        print("Uso: python batch.py DIR|MANIFIESTO.lst|programa.txt ... [--trabajadores=N] [--limite=SEG] [--json=reporte.json]")
+        sys.exit(1)
+    values = dict(flag[2:].split('=', 1) for flag in flags if flag.startswith('--') and '=' in flag)
+    optimization_level = 0
+    for flag in flags:
+        if flag.startswith('-O'):
+            if flag[2:] and not flag[2:].isdigit():
+                print(f"Error: nivel de optimización inválido '{flag}'")
+                print("Uso: python batch.py DIR|MANIFIESTO.lst|programa.txt ... [-O[N]] [--trabajadores=N] [--limite=SEG] [--json=reporte.json]")
+                sys.exit(1)
+            optimization_level = int(flag[2:] or 1)
+
+    paths = collect_programs(sources)
+    report = run_batch(
+        paths,
+        workers=int(values.get('trabajadores', 0)) or None,
+        optimization_level=optimization_level,
+        inline_threshold=int(values.get('inline', 20)),
+        memoize=('--memo' in flags or optimization_level >= 1) and '--sin-memo' not in flags,
+        rule_modules=values['reglas'].split(',') if 'reglas' in values else [],
+        native='--nativo' in flags,
+        timeout=float(values.get('limite', DEFAULT_TIMEOUT)),
+    )
+
+    for r in report['results']:
+        print(f"{r['status']:<8} {r['total_ms']:>10.1f} ms  {r['path']}" + (f"  ({r['error']})" if r['error'] else ''))
+    summary = report['summary']
+    print(f"\n{report['programs']} programas en {report['total_s']:.2f} s con {report['workers']} trabajadores "
+          f"({report['programs_per_s']:.1f} programas/s): ok={summary['ok']} error={summary['error']} "
+          f"límite={summary['timeout']}")
+    if values.get('json'):
+        with open(values['json'], 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {values['json']}")
+    sys.exit(EXIT_OK if summary['ok'] == report['programs'] else EXIT_ERROR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,700 @@
+import glob
+import itertools
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from contextlib import redirect_stdout
+
+import ply.yacc as yacc
+
+import patito_parser
+from patito_lexer import get_lexer
+from stream_lexer import StreamLexer
+from quadruples import quadruple_manager
+from memory_manager import memory_manager
+from virtual_machine import VirtualMachine
+from symbol_table import FunctionDirectory, function_directory
+from optimizer import fuse_superinstructions, specialize_types
+
+# Una fase es regresión si tarda más que la línea base por encima de este margen
+REGRESSION_THRESHOLD = 0.10
+
+PHASES = ['lex_ms', 'parse_ms', 'codegen_ms', 'vm_load_ms', 'vm_run_ms']
+
+
+# --- Programas sintéticos -------------------------------------------------
+
+def deep_recursion_program(depth):
+    return f'''programa Profundo;
+vars
+    r : entero;
+
+entero baja(n : entero) {{
+    {{
+        si (n == 0) {{
+            baja = 0;
+        }} sino {{
+            baja = baja(n - 1) + 1;
+        }};
+    }}
+}}
+
+inicio
+    r = baja({depth});
+    escribe(r);
+fin'''
+
+
+def long_loop_program(iterations):
+    return f'''programa Ciclo;
+vars
+    i, s : entero;
+    f : flotante;
+inicio
+    i = 0;
+    s = 0;
+    f = 0.0;
+    mientras (i < {iterations}) haz {{
+        s = s + i * 2 - 1;
+        f = f + 0.5;
+        i = i + 1;
+    }};
+    escribe(s, f);
+fin'''
+
+
+def many_functions_program(count):
+    # Funciones nula: cada función con retorno ocupa una global entera
+    funcs = []
+    calls = []
+    for k in range(count):
+        funcs.append(f'''nula f{k}(a : entero) {{
+    vars
+        b : entero;
+    {{
+        b = a * 2 + {k};
+        acum = acum + b;
+    }}
+}}
+''')
+        calls.append(f'    f{k}(acum);')
+    return 'programa Funciones;\nvars\n    acum : entero;\n\n' + '\n'.join(funcs) + \
+        '\ninicio\n    acum = 0;\n' + '\n'.join(calls) + '\n    escribe(acum);\nfin'
+
+
+def many_variables_program(count, per_function=500):
+    # Las variables se reparten en funciones de a lo más 'per_function' locales
+    # para no desbordar los segmentos de 1000 direcciones
+    funcs = []
+    calls = []
+    for k in range(0, count, per_function):
+        names = [f'v{i}' for i in range(k, min(k + per_function, count))]
+        body = '\n'.join(f'        {name} = {i};' for i, name in enumerate(names))
+        total = ' + '.join(names[:50])
+        funcs.append(f'''nula g{k}(x : entero) {{
+    vars
+        {', '.join(names)} : entero;
+    {{
+{body}
+        acum = acum + {total};
+    }}
+}}
+''')
+        calls.append(f'    g{k}(acum);')
+    return 'programa Variables;\nvars\n    acum : entero;\n\n' + '\n'.join(funcs) + \
+        '\ninicio\n    acum = 0;\n' + '\n'.join(calls) + '\n    escribe(acum);\nfin'
+
+
+def statements_program(count, per_function=200):
+    # La mitad de los 'count' estatutos va en funciones de 'per_function'
+    # (para no desbordar los temporales de un frame) y la otra mitad, sin
+    # temporales, en un solo cuerpo largo del main que termina con un
+    # escribe de count // 10 argumentos
+    funcs = []
+    main = []
+    for k in range(0, count // 2, per_function):
+        body = []
+        for i in range(k, min(k + per_function, count // 2), 4):
+            body.append(f'''        b = a * 2 + {i % 100};
+        si (b > {i % 50}) {{
+            c = c + 1;
+        }};
+        escribe(b, c);''')
+        funcs.append(f'''nula f{k}(a : entero) {{
+    vars
+        b, c : entero;
+    {{
+        c = 0;
+{chr(10).join(body)}
+    }}
+}}
+''')
+        main.append(f'    f{k}(acum);')
+    for i in range(len(main), count - count // 2 - 1, 2):
+        main.append(f'    total = acum;\n    escribe(total, acum);')
+    main.append(f"    escribe({', '.join(['total'] * (count // 10))});")
+    return 'programa Estatutos;\nvars\n    acum, total : entero;\n\n' + '\n'.join(funcs) + \
+        '\ninicio\n    acum = 1;\n' + '\n'.join(main) + '\nfin'
+
+
+SYNTHETIC_PROGRAMS = {
+    'sintetico/recursion_profunda': lambda: deep_recursion_program(20000),
+    'sintetico/ciclo_largo': lambda: long_loop_program(200000),
+    'sintetico/muchas_funciones': lambda: many_functions_program(2000),
+    'sintetico/muchas_variables': lambda: many_variables_program(5000),
+}
+
+
+# --- Fases del compilador -------------------------------------------------
+
+def reset_compiler():
+    quadruple_manager.clear()
+    memory_manager.reset()
+    function_directory.reset()
+    get_lexer().lineno = 1
+
+
+_syntax_parser = None
+
+
+def syntax_only_parser():
+    # Mismo grammar que patito_parser, pero con acciones vacías: mide el
+    # análisis sintáctico sin la generación de código de las acciones
+    global _syntax_parser
+    if _syntax_parser is None:
+        module = types.ModuleType('patito_sintaxis')
+        module.__file__ = patito_parser.__file__
+        module.tokens = patito_parser.tokens
+        module.precedence = patito_parser.precedence
+        for name in dir(patito_parser):
+            if name.startswith('p_') and name != 'p_error':
+                def action(p):
+                    pass
+                action.__name__ = name
+                action.__doc__ = getattr(patito_parser, name).__doc__
+                setattr(module, name, action)
+        module.p_error = lambda p: None
+        _syntax_parser = yacc.yacc(module=module, start='programa', debug=False,
+                                   write_tables=False, tabmodule='parsetab_sintaxis',
+                                   errorlog=yacc.NullLogger())
+    return _syntax_parser
+
+
+def best_of(repeat, fn):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def tokenize(data):
+    lexer = get_lexer()
+    lexer.input(data)
+    lexer.lineno = 1
+    count = 0
+    while lexer.token():
+        count += 1
+    return count
+
+
+def compile_source(data, fuse=True):
+    reset_compiler()
+    with redirect_stdout(io.StringIO()):
+        patito_parser.get_parser().parse(data, lexer=get_lexer())
+    if fuse:
+        fuse_superinstructions(quadruple_manager.quadruples, function_directory)
+    specialize_types(quadruple_manager.quadruples)
+    return quadruple_manager.quadruples, memory_manager.constants_table, function_directory.functions
+
+
+def count_instructions(quadruples, constants_table, functions):
+    # Recorre el código decodificado contando pasos, sin tocar el ciclo de run()
+    vm = VirtualMachine(quadruples, constants_table, functions)
+    code = vm.code
+    end = len(code)
+    ip = 0
+    steps = 0
+    with redirect_stdout(io.StringIO()):
+        while ip < end:
+            ip = code[ip]()
+            steps += 1
+    return steps
+
+
+def bench_program(data, repeat, fuse=True):
+    lex_time, tokens = best_of(repeat, lambda: tokenize(data))
+
+    syntax_parser = syntax_only_parser()
+    lexer = get_lexer()
+    def parse_only():
+        lexer.lineno = 1
+        syntax_parser.parse(data, lexer=lexer)
+    syntax_time, _ = best_of(repeat, parse_only)
+
+    compile_time, compiled = best_of(repeat, lambda: compile_source(data, fuse))
+    quadruples, constants_table, functions = compiled
+
+    load_time, _ = best_of(repeat, lambda: VirtualMachine(quadruples, constants_table, functions))
+
+    def run_vm():
+        vm = VirtualMachine(quadruples, constants_table, functions)
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            vm.run()
+            return time.perf_counter() - start
+    run_time = min(run_vm() for _ in range(repeat))
+    steps = count_instructions(quadruples, constants_table, functions)
+
+    return {
+        'bytes': len(data.encode('utf-8')),
+        'tokens': tokens,
+        'quads': len(quadruples),
+        'instructions': steps,
+        'lex_ms': lex_time * 1000,
+        # El parser jala los tokens del lexer: se descuenta el tiempo léxico
+        'parse_ms': max(syntax_time - lex_time, 0.0) * 1000,
+        # Generación de código = acciones semánticas + pases posteriores
+        'codegen_ms': max(compile_time - syntax_time, 0.0) * 1000,
+        'vm_load_ms': load_time * 1000,
+        'vm_run_ms': run_time * 1000,
+        'instr_per_sec': steps / run_time if run_time > 0 else 0.0,
+    }
+
+
+# --- Arranque en frío ------------------------------------------------------
+
+def cold_start(path, repeat, flags=()):
+    # Desde que se lanza 'python main.py' hasta el primer cuádruplo: main
+    # imprime el banner justo antes de correr la VM, y el hijo escribe sin
+    # búfer para que la línea llegue en cuanto se imprime
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(here, 'main.py'), *flags, path]
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, text=True)
+        elapsed = None
+        for line in child.stdout:
+            if 'INICIANDO' in line:
+                elapsed = time.perf_counter() - start
+                break
+        child.kill()
+        child.wait()
+        child.stdout.close()
+        if elapsed is None:
+            raise Exception(f"{path} no llegó a ejecutarse")
+        times.append(elapsed * 1000)
+    return min(times), statistics.median(times)
+
+
+def interpreter_start(repeat):
+    # Piso: arrancar Python sin hacer nada
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+
+def print_cold_start(paths, repeat):
+    print(f"{'Arranque en frío (ms)':<40} {'mínimo':>10} {'mediana':>10}")
+    best, median = interpreter_start(repeat)
+    print(f"{'python -c pass':<40} {best:>10.1f} {median:>10.1f}")
+    for path in paths:
+        for flags in ((), ('-O2',)):
+            best, median = cold_start(path, repeat, flags)
+            label = ' '.join(('main.py',) + flags + (os.path.basename(path),))
+            print(f"{label:<40} {best:>10.1f} {median:>10.1f}")
+
+
+# --- Rendimiento del léxico -----------------------------------------------
+
+def large_source(megabytes):
+    # Repite un programa de muchas funciones hasta llegar al tamaño pedido;
+    # el resultado no necesita compilar, sólo tokenizarse
+    chunk = many_functions_program(1000)
+    copies = max(1, int(megabytes * 1024 * 1024 / len(chunk)))
+    return chunk * copies
+
+
+def ply_file_tokens(path):
+    # Lo que hace main.py sin --flujo: leer todo el archivo y pasarlo a PLY
+    with open(path, 'r') as f:
+        data = f.read()
+    lexer = get_lexer()
+    lexer.input(data)
+    lexer.lineno = 1
+    return iter(lexer.token, None)
+
+
+def stream_file_tokens(path):
+    return iter(StreamLexer.from_file(path))
+
+
+def same_tokens(path):
+    for expected, actual in itertools.zip_longest(ply_file_tokens(path), stream_file_tokens(path)):
+        if expected is None or actual is None or (expected.type, expected.value, expected.lineno) != (actual.type, actual.value, actual.lineno):
+            return False
+    return True
+
+
+def bench_lexers(path, repeat):
+    megabytes = os.path.getsize(path) / (1024 * 1024)
+    results = {}
+    for name, tokens_of in (('PLY (f.read)', ply_file_tokens), ('stream_lexer (mmap)', stream_file_tokens)):
+        elapsed, count = best_of(repeat, lambda: sum(1 for _ in tokens_of(path)))
+        results[name] = {'tokens': count, 'seconds': elapsed, 'mb_per_sec': megabytes / elapsed}
+    return megabytes, results
+
+
+def print_lexer_throughput(paths, megabytes, repeat):
+    generated = None
+    if not paths:
+        generated = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        with generated:
+            generated.write(large_source(megabytes))
+        paths = [generated.name]
+    try:
+        print(f"{'Archivo':<32} {'Léxico':<22} {'MB':>8} {'tokens':>10} {'s':>8} {'MB/s':>8}")
+        for path in paths:
+            size, results = bench_lexers(path, repeat)
+            label = 'sintetico' if generated else os.path.basename(path)
+            for name, r in results.items():
+                print(f"{label:<32} {name:<22} {size:>8.2f} {r['tokens']:>10} {r['seconds']:>8.3f} {r['mb_per_sec']:>8.2f}")
+            speedup = results['PLY (f.read)']['seconds'] / results['stream_lexer (mmap)']['seconds']
+            print(f"{'':<32} {'aceleración':<22} {speedup:>8.2f}x  tokens idénticos: {'sí' if same_tokens(path) else 'NO'}")
+    finally:
+        if generated:
+            os.unlink(generated.name)
+
+
+# --- Lotes en paralelo ----------------------------------------------------
+
+def print_batch_scaling(paths, copies):
+    # Programas por segundo de batch.py con 1, 2, 4... trabajadores hasta el
+    # número de núcleos, contra lanzar 'python main.py' por archivo
+    from batch import run_batch
+    here = os.path.dirname(os.path.abspath(__file__))
+    programs = paths * copies
+    print(f"{len(programs)} programas ({len(paths)} distintos), {os.cpu_count()} núcleos")
+    print(f"{'Modo':<28} {'s':>8} {'programas/s':>12} {'aceleración':>12}")
+
+    start = time.perf_counter()
+    for path in paths:
+        subprocess.run([sys.executable, os.path.join(here, 'main.py'), path], check=True, capture_output=True)
+    per_file = len(paths) / (time.perf_counter() - start)
+    print(f"{'main.py por archivo':<28} {len(paths) / per_file:>8.2f} {per_file:>12.1f} {'':>12}")
+
+    workers = 1
+    base = None
+    while True:
+        report = run_batch(programs, workers)
+        rate = report['programs_per_s']
+        base = base or rate
+        print(f"{f'batch.py, {workers} trabajadores':<28} {report['total_s']:>8.2f} {rate:>12.1f} {rate / base:>11.2f}x")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+# --- Tabla de símbolos ----------------------------------------------------
+
+class DictVariableTable:
+    # Referencia con la forma anterior de symbol_table: un dict por
+    # variable y get_variable que sube recursivamente por parent_scope
+    def __init__(self, parent_scope=None):
+        self.variables = {}
+        self.parent_scope = parent_scope
+
+    def add_variable(self, name, var_type, address, scope):
+        self.variables[name] = {'type': var_type, 'address': address, 'scope': scope}
+
+    def get_variable(self, name):
+        if name in self.variables:
+            return self.variables[name]
+        elif self.parent_scope:
+            return self.parent_scope.get_variable(name)
+        return None
+
+
+def symbol_workload(count, per_function=500):
+    # Globales (a lo más 900 enteras) y funciones de 'per_function' locales
+    # hasta 'count' identificadores; cada función referencia sus locales y
+    # otras tantas globales
+    globals_ = [f'g{i}' for i in range(min(count // 10, 900))]
+    functions = []
+    for k in range(0, count - len(globals_), per_function):
+        names = [f'v{i}' for i in range(k, min(k + per_function, count - len(globals_)))]
+        refs = [name for pair in zip(names, itertools.cycle(globals_)) for name in pair]
+        functions.append((f'f{k}', names, refs))
+    return globals_, functions
+
+
+def build_dict_tables(globals_, functions):
+    global_scope = DictVariableTable()
+    for i, name in enumerate(globals_):
+        global_scope.add_variable(name, 'entero', 1000 + i, 'global')
+    scopes = {'global': global_scope}
+    for func_name, names, _ in functions:
+        scope = scopes[func_name] = DictVariableTable(global_scope)
+        for i, name in enumerate(names):
+            scope.add_variable(name, 'entero', 3000 + i, 'local')
+    return scopes
+
+
+def build_directory(globals_, functions):
+    directory = FunctionDirectory(type(memory_manager)())
+    for name in globals_:
+        directory.global_scope.add_variable(name, 'entero', 'global')
+    for func_name, names, _ in functions:
+        directory.memory_manager.reset_local_counters()
+        directory.add_function(func_name, 'nula', [])
+        scope = directory.functions[func_name].local_scope
+        for name in names:
+            scope.add_variable(name, 'entero', 'local')
+    return directory
+
+
+def table_memory(build, *args):
+    import tracemalloc
+    tracemalloc.start()
+    table = build(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return table, size
+
+
+def print_symbol_tables(count, repeat):
+    # Memoria y búsquedas por segundo: tablas de dicts con búsqueda
+    # recursiva contra registros con __slots__ y resolución de un acceso.
+    # Las referencias llegan como las entrega cada lexer: antes copias
+    # sueltas del texto, ahora nombres internados
+    globals_, functions = symbol_workload(count)
+    identifiers = len(globals_) + sum(len(names) for _, names, _ in functions)
+    lookups = sum(len(refs) for _, _, refs in functions)
+    copies = [(func_name, [''.join(list(name)) for name in refs]) for func_name, _, refs in functions]
+    interned = [(func_name, [sys.intern(name) for name in refs]) for func_name, _, refs in functions]
+
+    scopes, dict_bytes = table_memory(build_dict_tables, globals_, functions)
+    directory, slot_bytes = table_memory(build_directory, globals_, functions)
+
+    def dict_lookups():
+        for func_name, refs in copies:
+            get_variable = scopes[func_name].get_variable
+            for name in refs:
+                get_variable(name)
+
+    def slot_lookups():
+        for func_name, refs in interned:
+            directory.set_current_function(func_name)
+            lookup = directory.lookup
+            for name in refs:
+                lookup(name)
+        directory.set_current_function('global')
+
+    dict_time, _ = best_of(repeat, dict_lookups)
+    slot_time, _ = best_of(repeat, slot_lookups)
+    print(f"{identifiers} identificadores ({len(globals_)} globales, {len(functions)} funciones), "
+          f"{lookups} referencias")
+    print(f"{'Tabla':<26} {'MB':>8} {'bytes/id':>9} {'Mbúsq/s':>9}")
+    print(f"{'dicts + recursiva':<26} {dict_bytes / 1e6:>8.2f} {dict_bytes / identifiers:>9.0f} "
+          f"{lookups / dict_time / 1e6:>9.2f}")
+    print(f"{'__slots__ + un acceso':<26} {slot_bytes / 1e6:>8.2f} {slot_bytes / identifiers:>9.0f} "
+          f"{lookups / slot_time / 1e6:>9.2f}")
+    print(f"\nMemoria {dict_bytes / slot_bytes:.2f}x menor, búsquedas {dict_time / slot_time:.2f}x más rápidas")
+
+
+# --- Escalamiento del front end -------------------------------------------
+
+# Tiempo o memoria por estatuto en el programa más grande entre el del más
+# chico; un front end cuadrático crece con el tamaño, uno lineal no
+SCALING_LIMIT = 2.0
+
+
+def scaling_child(count):
+    # Corre en un proceso aparte para que cada tamaño empiece con el heap
+    # limpio. La primera pasada mide tiempo; la segunda, con tracemalloc
+    # (más lenta), el pico de memoria que asigna el front end
+    import tracemalloc
+    data = statements_program(count)
+    get_lexer()
+    parser = patito_parser.get_parser()
+    measures = []
+    for traced in (False, True):
+        reset_compiler()
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            parser.parse(data, lexer=get_lexer())
+        measures.append(time.perf_counter() - start)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(json.dumps({'statements': count, 'bytes': len(data), 'quads': len(quadruple_manager.quadruples),
+                      'seconds': measures[0], 'peak_kb': peak / 1024}))
+
+
+def measure_scaling(count):
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, '-c', f'import benchmark; benchmark.scaling_child({count})']
+    output = subprocess.run(command, cwd=here, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_scaling(counts):
+    print(f"{'Estatutos':>10} {'MB':>8} {'quads':>10} {'s':>9} {'us/estatuto':>12} {'pico MB':>9} {'KB/estatuto':>12}")
+    rows = []
+    for count in counts:
+        r = measure_scaling(count)
+        r['us_per_statement'] = r['seconds'] * 1e6 / count
+        r['kb_per_statement'] = r['peak_kb'] / count
+        rows.append(r)
+        print(f"{count:>10} {r['bytes'] / 1e6:>8.1f} {r['quads']:>10} {r['seconds']:>9.2f} "
+              f"{r['us_per_statement']:>12.1f} {r['peak_kb'] / 1024:>9.1f} {r['kb_per_statement']:>12.3f}")
+    first, last = rows[0], rows[-1]
+    time_growth = last['us_per_statement'] / first['us_per_statement']
+    memory_growth = last['kb_per_statement'] / max(first['kb_per_statement'], 1e-9)
+    print(f"\nCrecimiento por estatuto de {first['statements']} a {last['statements']}: "
+          f"tiempo {time_growth:.2f}x, memoria {memory_growth:.2f}x (límite {SCALING_LIMIT:.1f}x)")
+    if time_growth > SCALING_LIMIT or memory_growth > SCALING_LIMIT:
+        print("NO LINEAL")
+        sys.exit(1)
+    print("Lineal")
+
+
+# --- Reporte y comparación ------------------------------------------------
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for name, phases in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for phase in PHASES:
+            if base.get(phase, 0) > 0 and phases[phase] > base[phase] * (1 + threshold):
+                regressions.append((name, phase, base[phase], phases[phase]))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    header = f"{'Programa':<32} {'tokens':>8} {'quads':>7} {'instr':>10}" + ''.join(f" {p[:-3]:>12}" for p in PHASES) + f" {'instr/s':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        row = f"{name:<32} {r['tokens']:>8} {r['quads']:>7} {r['instructions']:>10}"
+        base = (baseline or {}).get('results', {}).get(name, {})
+        for phase in PHASES:
+            cell = f"{r[phase]:.2f}"
+            if base.get(phase):
+                cell += f" {(r[phase] / base[phase] - 1) * 100:+.0f}%"
+            row += f" {cell:>12}"
+        row += f" {r['instr_per_sec']:>12,.0f}"
+        print(row)
+
+
+def main():
+    # Uso: python benchmark.py [programa.txt ...] [--repeticiones=N] [--sin-fusion]
+    #                          [--json=salida.json] [--base=base.json] [--guardar-base]
+    #                          [--arranque] [--lexico[=MB]] [--escalamiento[=N,N,...]]
+    #                          [--lote[=COPIAS]] [--simbolos[=N]]
+    # Sin --base se compara contra benchmark_base.json. Los tiempos dependen
+    # de la máquina, así que no se versiona: si no existe, la primera
+    # corrida la escribe y las siguientes se comparan contra ella
+    flags = dict(arg[2:].split('=', 1) if '=' in arg else (arg[2:], '') for arg in sys.argv[1:] if arg.startswith('--'))
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    repeat = int(flags.get('repeticiones', 3))
+    fuse = 'sin-fusion' not in flags
+    base_path = flags.get('base', 'benchmark_base.json')
+
+    if 'arranque' in flags:
+        here = os.path.dirname(os.path.abspath(__file__))
+        print_cold_start(paths or sorted(glob.glob(os.path.join(here, 'pruebas', '*.txt'))), max(repeat, 5))
+        return
+
+    if 'lote' in flags:
+        here = os.path.dirname(os.path.abspath(__file__))
+        print_batch_scaling(paths or sorted(glob.glob(os.path.join(here, 'pruebas', '*.txt'))),
+                            int(flags['lote'] or 50))
+        return
+
+    if 'simbolos' in flags:
+        print_symbol_tables(int(flags['simbolos'] or 100000), repeat)
+        return
+
+    if 'escalamiento' in flags:
+        counts = flags['escalamiento'] or '10000,100000,1000000'
+        print_scaling([int(count) for count in counts.split(',')])
+        return
+
+    if 'lexico' in flags:
+        print_lexer_throughput(paths, float(flags['lexico'] or 10), repeat)
+        return
+
+    programs = {}
+    if paths:
+        for path in paths:
+            with open(path, 'r') as f:
+                programs[path] = f.read()
+    else:
+        here = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(here, 'pruebas', '*.txt'))):
+            with open(path, 'r') as f:
+                programs[os.path.relpath(path, here)] = f.read()
+        for name, generate in SYNTHETIC_PROGRAMS.items():
+            programs[name] = generate()
+
+    results = {}
+    for name, data in programs.items():
+        results[name] = bench_program(data, repeat, fuse)
+
+    baseline = None
+    if os.path.exists(base_path) and 'guardar-base' not in flags:
+        with open(base_path, 'r') as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+        'fusion': fuse,
+        'results': results,
+    }
+    if flags.get('json'):
+        with open(flags['json'], 'w') as f:
+            json.dump(report, f, indent=2)
+    if 'guardar-base' in flags or baseline is None:
+        with open(base_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        if baseline is None and 'guardar-base' not in flags:
+            print(f"\nNo había línea base en {base_path}: se guardó esta corrida y no se comparó contra nada; "
+                  f"las siguientes corridas se comparan contra ella")
+        else:
+            print(f"\nLínea base guardada en {base_path}")
+    else:
+        regressions = compare(results, baseline)
+        if regressions:
+            print(f"\nREGRESIONES (> {REGRESSION_THRESHOLD:.0%} sobre {base_path}):")
+            for name, phase, before, after in regressions:
+                print(f"  {name} {phase}: {before:.2f} -> {after:.2f}")
+            sys.exit(1)
+        print(f"\nSin regresiones respecto a {base_path}")
+
+
+if __name__ == "__main__":
+    main()
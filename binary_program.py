@@ -0,0 +1,182 @@
+import mmap
+import struct
+import zlib
+
+from virtual_machine import OPERATORS, OPCODES, VirtualMachine, parse_constant
+
+# Formato binario de un programa compilado:
+#   encabezado | cuádruplos (registros de 4 enteros de 32 bits) |
+#   constantes tipadas | directorio de funciones
+MAGIC = b'PATO'
+# 3: DIV_II vuelve a ser división real (los de la versión 2 la truncaban)
+# 4: enteros fuera de 64 bits (CONST_BIGINT)
+FORMAT_VERSION = 4
+# Huella de la tabla de opcodes: un binario sólo es válido para la VM que
+# numera los operadores igual que el compilador que lo generó
+OPCODE_FINGERPRINT = zlib.crc32('\0'.join(OPERATORS).encode('utf-8'))
+
+HEADER = struct.Struct('<4sHIIII')
+QUAD = struct.Struct('<iiii')
+CONST_HEADER = struct.Struct('<iB')
+FUNC_HEADER = struct.Struct('<iiiiiiiH')
+
+CONST_INT = 0
+CONST_FLOAT = 1
+CONST_STRING = 2
+# Los enteros de Patito no tienen límite: los que no caben en 64 bits van
+# con su longitud y sus bytes en complemento a dos
+CONST_BIGINT = 3
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+NO_OPERAND = -1
+FRAME_KEYS = ('local_int', 'local_float', 'temp_int', 'temp_float', 'temp_bool')
+
+
+def encode_name(name):
+    data = name.encode('utf-8')
+    return struct.pack('<H', len(data)) + data
+
+
+def save_program(path, quadruples, constants_table, function_directory):
+    functions = function_directory.functions
+    names = list(functions)
+    name_ids = {name: i for i, name in enumerate(names)}
+
+    quads = bytearray()
+    for quad in quadruples:
+        opcode = OPCODES.get(quad.operator)
+        if opcode is None:
+            raise Exception(f"Unknown opcode: {quad.operator}")
+        operands = []
+        for operand in (quad.left_operand, quad.right_operand, quad.result):
+            if operand == '' or operand is None:
+                operands.append(NO_OPERAND)
+            elif operand in name_ids and quad.operator in ('ERA', 'GOSUB'):
+                operands.append(name_ids[operand])
+            else:
+                operands.append(int(operand))
+        quads += QUAD.pack(opcode, *operands)
+
+    constants = bytearray()
+    for key, address in constants_table.items():
+        value = parse_constant(key)
+        if isinstance(value, int) and INT64_MIN <= value <= INT64_MAX:
+            constants += CONST_HEADER.pack(address, CONST_INT) + struct.pack('<q', value)
+        elif isinstance(value, int):
+            data = value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+            constants += CONST_HEADER.pack(address, CONST_BIGINT) + struct.pack('<I', len(data)) + data
+        elif isinstance(value, float):
+            constants += CONST_HEADER.pack(address, CONST_FLOAT) + struct.pack('<d', value)
+        else:
+            data = value.encode('utf-8')
+            constants += CONST_HEADER.pack(address, CONST_STRING) + struct.pack('<I', len(data)) + data
+
+    directory = bytearray()
+    for name in names:
+        info = functions[name]
+        start_quad = info['start_quad'] if info['start_quad'] is not None else -1
+        frame = info.get('frame_size') or {}
+        sizes = [frame.get(key, -1) for key in FRAME_KEYS]
+        memo_address = info.get('memo_address')
+        params = info['parameters']
+        directory += encode_name(name)
+        directory += FUNC_HEADER.pack(start_quad, *sizes, memo_address if memo_address is not None else -1, len(params))
+        for param in params:
+            directory += struct.pack('<i', param['address'])
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, OPCODE_FINGERPRINT,
+                            len(quadruples), len(constants_table), len(names)))
+        f.write(quads)
+        f.write(constants)
+        f.write(directory)
+
+
+def is_binary_program(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_program(path):
+    # Devuelve (registros, constantes, funciones) listos para
+    # VirtualMachine.from_records, leyendo el archivo a través de mmap
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_program(data)
+
+
+def parse_program(data):
+    magic, version, fingerprint, n_quads, n_constants, n_functions = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise Exception("Archivo no es un programa Patito compilado")
+    if version != FORMAT_VERSION or fingerprint != OPCODE_FINGERPRINT:
+        raise Exception("Programa compilado con otra versión del compilador; vuelve a compilarlo")
+
+    offset = HEADER.size
+    quads_end = offset + n_quads * QUAD.size
+    with memoryview(data)[offset:quads_end] as view:
+        raw_records = list(QUAD.iter_unpack(view))
+    offset = quads_end
+
+    constants = {}
+    for _ in range(n_constants):
+        address, kind = CONST_HEADER.unpack_from(data, offset)
+        offset += CONST_HEADER.size
+        if kind == CONST_INT:
+            constants[address] = struct.unpack_from('<q', data, offset)[0]
+            offset += 8
+        elif kind == CONST_FLOAT:
+            constants[address] = struct.unpack_from('<d', data, offset)[0]
+            offset += 8
+        elif kind == CONST_BIGINT:
+            (length,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            constants[address] = int.from_bytes(data[offset:offset + length], 'little', signed=True)
+            offset += length
+        else:
+            (length,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            constants[address] = bytes(data[offset:offset + length]).decode('utf-8')
+            offset += length
+
+    names = []
+    functions = {}
+    for _ in range(n_functions):
+        (length,) = struct.unpack_from('<H', data, offset)
+        offset += 2
+        name = bytes(data[offset:offset + length]).decode('utf-8')
+        offset += length
+        start_quad, *sizes, memo_address, n_params = FUNC_HEADER.unpack_from(data, offset)
+        offset += FUNC_HEADER.size
+        params = []
+        for _ in range(n_params):
+            params.append({'address': struct.unpack_from('<i', data, offset)[0]})
+            offset += 4
+        names.append(name)
+        functions[name] = {
+            'start_quad': start_quad if start_quad >= 0 else None,
+            'frame_size': dict(zip(FRAME_KEYS, sizes)) if sizes[0] >= 0 else None,
+            'parameters': params,
+            'memo_address': memo_address if memo_address >= 0 else None,
+        }
+
+    # Sólo ERA y GOSUB llevan un nombre de función en el operando izquierdo
+    era, gosub = OPCODES['ERA'], OPCODES['GOSUB']
+    records = []
+    for opcode, left, right, res in raw_records:
+        if opcode == era or opcode == gosub:
+            left = names[left]
+        elif left == NO_OPERAND:
+            left = ''
+        if right == NO_OPERAND:
+            right = ''
+        if res == NO_OPERAND:
+            res = ''
+        records.append((opcode, left, right, res))
+    return records, constants, functions
+
+
+def load_vm(path):
+    records, constants, functions = load_program(path)
+    return VirtualMachine.from_records(records, constants, functions)
@@ -0,0 +1,183 @@
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+
+from binary_program import load_program, save_program
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Módulos cuyo contenido determina la salida del compilador; si cambia
+# cualquiera de ellos, cambian todas las llaves del caché. main.py entra
+# porque optimize() decide qué pases corren y en qué orden
+COMPILER_MODULES = [
+    'patito_lexer.py', 'patito_parser.py', 'quadruples.py', 'memory_manager.py',
+    'semantic_cube.py', 'symbol_table.py', 'optimizer.py', 'virtual_machine.py',
+    'binary_program.py', 'ir.py', 'loop_optimizer.py', 'inliner.py',
+    'peephole.py', 'stream_lexer.py', 'compiler_context.py', 'main.py',
+]
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'patito')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_compiler_fingerprint = None
+
+
+def compiler_fingerprint():
+    global _compiler_fingerprint
+    if _compiler_fingerprint is None:
+        base = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for module in COMPILER_MODULES:
+            with open(os.path.join(base, module), 'rb') as f:
+                digest.update(module.encode('utf-8') + b'\0' + f.read() + b'\0')
+        _compiler_fingerprint = digest.hexdigest()
+    return _compiler_fingerprint
+
+
+def rules_fingerprint(rule_modules):
+    # Las reglas peephole de --reglas también cambian la salida: se hashea el
+    # contenido de cada módulo, no sólo su nombre. Uno que no se encuentra
+    # entra sólo por nombre; la compilación fallará al importarlo
+    digest = hashlib.sha256()
+    for module in rule_modules:
+        digest.update(module.encode('utf-8') + b'\0')
+        spec = importlib.util.find_spec(module)
+        if spec is not None and spec.origin and os.path.isfile(spec.origin):
+            with open(spec.origin, 'rb') as f:
+                digest.update(f.read())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class CompilationCache:
+    # Caché en disco de programas compilados (formato de binary_program),
+    # direccionado por el hash del código fuente y del compilador. Las
+    # escrituras son atómicas (archivo temporal + os.replace), así que varios
+    # procesos pueden compartir el directorio; la fecha de modificación de
+    # cada entrada funciona como marca de uso para el desalojo LRU.
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('PATITO_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source, options='', rule_modules=()):
+        digest = hashlib.sha256()
+        digest.update(compiler_fingerprint().encode('utf-8') + b'\0')
+        digest.update(options.encode('utf-8') + b'\0')
+        digest.update(rules_fingerprint(rule_modules).encode('utf-8') + b'\0')
+        # El código puede venir como texto o como bytes (un mmap con --flujo)
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.pbin")
+
+    def lookup(self, key):
+        # Devuelve (registros, constantes, funciones) o None
+        path = self.entry_path(key)
+        try:
+            program = load_program(path)
+        except FileNotFoundError:
+            self.misses += 1
+            self.record_stats(misses=1)
+            return None
+        except Exception:
+            # Entrada corrupta o de otra versión del formato
+            self.remove(path)
+            self.misses += 1
+            self.record_stats(misses=1)
+            return None
+        try:
+            # Marca de uso para el LRU; si otro proceso la desalojó justo
+            # ahora, el programa ya se cargó y sigue siendo un acierto
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        self.record_stats(hits=1)
+        return program
+
+    def store(self, key, quadruples, constants_table, function_directory):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            save_program(temp_path, quadruples, constants_table, function_directory)
+            os.replace(temp_path, self.entry_path(key))
+        except BaseException:
+            self.remove(temp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pbin'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self.remove(path):
+                self.evictions += 1
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def record_stats(self, hits=0, misses=0):
+        # Contadores acumulados entre procesos, protegidos con flock
+        if fcntl is None:
+            return
+        path = os.path.join(self.directory, 'stats.json')
+        with open(path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                stats = json.loads(f.read() or '{}')
+            except ValueError:
+                stats = {}
+            stats['hits'] = stats.get('hits', 0) + hits
+            stats['misses'] = stats.get('misses', 0) + misses
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(stats))
+
+    def stats(self):
+        path = os.path.join(self.directory, 'stats.json')
+        try:
+            with open(path, 'r') as f:
+                totals = json.loads(f.read() or '{}')
+        except (FileNotFoundError, ValueError):
+            totals = {}
+        entries = self.entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'total_hits': totals.get('hits', 0),
+            'total_misses': totals.get('misses', 0),
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
@@ -0,0 +1,80 @@
+import copy
+
+from memory_manager import MemoryManager, memory_manager
+from quadruples import QuadrupleManager, quadruple_manager
+from symbol_table import FunctionDirectory, function_directory
+from patito_lexer import get_lexer
+
+
+class CompilerContext:
+    # Todo el estado de una compilación: memoria virtual, directorio de
+    # funciones y cuádruplos. Las acciones del parser lo toman de
+    # p.parser.context, así que cada contexto compila sin tocar a los demás
+    # y no hace falta limpiar nada entre un programa y otro.
+    def __init__(self, memory_manager=None, function_directory=None, quadruple_manager=None):
+        self.memory_manager = memory_manager or MemoryManager()
+        self.function_directory = function_directory or FunctionDirectory(self.memory_manager)
+        self.quadruple_manager = quadruple_manager or QuadrupleManager(self.memory_manager)
+        # p_error sólo imprime y el parser se recupera: aquí se cuentan
+        self.syntax_errors = 0
+
+    def parse(self, data, lexer=None):
+        # PLY guarda la pila del análisis en el objeto parser y la línea en
+        # el lexer: cada compilación usa sus propias copias (las tablas LALR
+        # y las expresiones del lexer se comparten)
+        import patito_parser
+        parser = copy.copy(patito_parser.get_parser())
+        parser.context = self
+        parser.errorfunc = self.syntax_error
+        if lexer is None:
+            lexer = get_lexer().clone()
+            lexer.lineno = 1
+        return parser.parse(data, lexer=lexer)
+
+    def syntax_error(self, token):
+        import patito_parser
+        self.syntax_errors += 1
+        return patito_parser.p_error(token)
+
+
+# Contexto de los singletons de módulo: es el del parser compartido
+# (patito_parser.parser), para el código que compila con ellos
+shared_context = CompilerContext(memory_manager, function_directory, quadruple_manager)
+
+
+if __name__ == "__main__":
+    import glob
+    import io
+    import os
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import redirect_stdout
+
+    # Los programas de pruebas/ compilados a la vez en hilos deben dar los
+    # mismos cuádruplos y constantes que uno por uno
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = []
+    for path in sorted(glob.glob(os.path.join(here, 'pruebas', '*.txt'))):
+        with open(path, 'r') as f:
+            sources.append((os.path.basename(path), f.read()))
+    sources *= 8
+
+    def listing(context):
+        return ([str(quad) for quad in context.quadruple_manager.quadruples],
+                dict(context.memory_manager.constants_table))
+
+    def compile_program(data):
+        context = CompilerContext()
+        context.parse(data)
+        return context
+
+    # Cambios de hilo muy frecuentes para que las compilaciones se intercalen;
+    # sys.stdout es uno solo para todos los hilos: se redirige una vez afuera
+    sys.setswitchinterval(1e-6)
+    with redirect_stdout(io.StringIO()):
+        expected = [listing(compile_program(data)) for _, data in sources]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            contexts = list(pool.map(lambda source: compile_program(source[1]), sources))
+    for (name, _), context, listing_expected in zip(sources, contexts, expected):
+        status = 'OK' if listing(context) == listing_expected else 'DIFERENTE'
+        print(f"{name:<28} {len(context.quadruple_manager.quadruples):>5} cuádruplos  {status}")
@@ -0,0 +1,198 @@
+from memory_manager import memory_manager
+from quadruples import Quadruple
+from optimizer import (
+    JUMP_OPERATORS, SEGMENT_SIZE, definitely_written, function_ranges, new_frame_address, read_addresses,
+    written_address,
+)
+
+# Tamaño máximo (en cuádruplos, sin contar ENDFUNC) de una función inlineable
+DEFAULT_INLINE_THRESHOLD = 20
+# Rondas: una función inlineada puede traer llamadas que también lo son
+MAX_ROUNDS = 3
+
+
+def frame_kind(address):
+    # Tipo de dirección del frame para new_frame_address; None si no es del frame
+    if not isinstance(address, int):
+        return None
+    if memory_manager.LOCAL_INT_START <= address < memory_manager.LOCAL_FLOAT_START:
+        return 'local_int'
+    if memory_manager.LOCAL_FLOAT_START <= address < memory_manager.TEMP_INT_START:
+        return 'local_float'
+    if memory_manager.TEMP_INT_START <= address < memory_manager.TEMP_FLOAT_START:
+        return 'temp_int'
+    if memory_manager.TEMP_FLOAT_START <= address < memory_manager.TEMP_BOOL_START:
+        return 'temp_float'
+    if memory_manager.TEMP_BOOL_START <= address < memory_manager.CONST_INT_START:
+        return 'temp_bool'
+    return None
+
+
+class Inliner:
+    # Copia el cuerpo de funciones pequeñas y no recursivas en cada llamada:
+    # ERA desaparece, cada PARAM se vuelve '=' al parámetro renombrado y el
+    # GOSUB se reemplaza por el cuerpo con locales y temporales nuevos del
+    # frame del llamador. El valor de retorno sigue pasando por la global.
+    def __init__(self, quadruples, function_directory, threshold=DEFAULT_INLINE_THRESHOLD):
+        self.quadruples = quadruples
+        self.function_directory = function_directory
+        self.threshold = threshold
+        self.sites = []
+
+    def call_graph(self, owners):
+        graph = {name: set() for name in self.function_directory.functions}
+        for i, quad in enumerate(self.quadruples):
+            if quad.operator == 'GOSUB':
+                graph[owners[i]].add(quad.left_operand)
+        return graph
+
+    def recursive_functions(self, graph):
+        # Funciones que pueden llegar a sí mismas (recursión directa o mutua)
+        recursive = set()
+        for name in graph:
+            seen = set()
+            pending = list(graph[name])
+            while pending:
+                callee = pending.pop()
+                if callee == name:
+                    recursive.add(name)
+                    break
+                if callee not in seen:
+                    seen.add(callee)
+                    pending.extend(graph.get(callee, ()))
+        return recursive
+
+    def function_bounds(self, name):
+        start = self.function_directory.functions[name]['start_quad']
+        end = start
+        while self.quadruples[end].operator != 'ENDFUNC':
+            end += 1
+        return start, end
+
+    def candidates(self):
+        owners = function_ranges(self.quadruples, self.function_directory)
+        recursive = self.recursive_functions(self.call_graph(owners))
+        candidates = {}
+        for name, info in self.function_directory.functions.items():
+            if name == 'global' or info['start_quad'] is None or name in recursive:
+                continue
+            start, end = self.function_bounds(name)
+            if end - start <= self.threshold and self.locals_defined_before_use(info, start, end):
+                candidates[name] = (start, end)
+        return owners, candidates
+
+    def locals_defined_before_use(self, info, start, end):
+        # Las locales inlineadas viven en el frame del llamador y nadie las
+        # limpia entre una llamada y otra: si alguna puede leerse antes de
+        # asignarse (valdría None con ERA), la función no se inlinea
+        def is_local(address):
+            return frame_kind(address) in ('local_int', 'local_float')
+
+        def defines(quad):
+            address = written_address(quad)
+            return address if is_local(address) else None
+
+        params = [param['address'] for param in info['parameters']]
+        defined = definitely_written(self.quadruples, start, end + 1, params, defines)
+        return all(address in defined[i]
+                   for i in defined
+                   for address in read_addresses(self.quadruples[i]) if is_local(address))
+
+    def fits(self, caller, callee):
+        # El frame del llamador debe alojar todas las direcciones del llamado
+        caller_frame = self.function_directory.functions[caller]['frame_size']
+        callee_frame = self.function_directory.functions[callee]['frame_size']
+        return all(caller_frame[kind] + callee_frame[kind] <= SEGMENT_SIZE
+                   for kind in callee_frame)
+
+    def run(self):
+        for _ in range(MAX_ROUNDS):
+            if not self.inline_round():
+                break
+        return self.sites
+
+    def inline_round(self):
+        quads = self.quadruples
+        owners, candidates = self.candidates()
+        result = []
+        # Nueva posición de cada cuádruplo viejo (la del primero que lo
+        # reemplaza); len(quads) mapea al final
+        new_index = [0] * (len(quads) + 1)
+        caller_jumps = []
+        inlined = 0
+        i = 0
+        while i < len(quads):
+            quad = quads[i]
+            callee = quad.left_operand if quad.operator == 'ERA' else None
+            if callee not in candidates or owners[i] == callee or not self.fits(owners[i], callee):
+                new_index[i] = len(result)
+                copy = Quadruple(quad.operator, quad.left_operand, quad.right_operand, quad.result)
+                if quad.operator in JUMP_OPERATORS:
+                    caller_jumps.append(copy)
+                result.append(copy)
+                i += 1
+                continue
+
+            # ERA f, PARAM..., GOSUB f son contiguos (p_llamada los emite juntos)
+            era = i
+            gosub = i + 1
+            while quads[gosub].operator == 'PARAM':
+                gosub += 1
+            caller = owners[era]
+            renamed = {}
+
+            def rename(operand):
+                kind = frame_kind(operand)
+                if kind is None:
+                    return operand
+                if operand not in renamed:
+                    renamed[operand] = new_frame_address(self.function_directory, caller, kind)
+                return renamed[operand]
+
+            new_index[era] = len(result)
+            for p in range(era + 1, gosub):
+                new_index[p] = len(result)
+                param = quads[p]
+                result.append(Quadruple('=', param.left_operand, '', rename(param.result)))
+
+            new_index[gosub] = len(result)
+            start, end = candidates[callee]
+            base = len(result)
+            for j in range(start, end):
+                body = quads[j]
+                copy = Quadruple(body.operator, body.left_operand, body.right_operand, body.result)
+                if body.operator in JUMP_OPERATORS:
+                    # El ENDFUNC del llamado se vuelve la continuación
+                    copy.result = base + int(body.result) - start
+                    copy.left_operand = rename(body.left_operand)
+                elif body.operator not in ('ERA', 'GOSUB'):
+                    copy.left_operand = rename(body.left_operand)
+                    copy.right_operand = rename(body.right_operand)
+                    # El destino de un PARAM es un local de otra función
+                    if body.operator != 'PARAM':
+                        copy.result = rename(body.result)
+                result.append(copy)
+
+            self.sites.append((caller, callee, era))
+            inlined += 1
+            i = gosub + 1
+
+        if not inlined:
+            return False
+        new_index[len(quads)] = len(result)
+        for copy in caller_jumps:
+            copy.result = new_index[int(copy.result)]
+        functions = self.function_directory.functions
+        for info in functions.values():
+            if info['start_quad'] is not None:
+                info['start_quad'] = new_index[info['start_quad']]
+        for copy in result:
+            if copy.operator == 'GOSUB':
+                copy.result = functions[copy.left_operand]['start_quad']
+        quads[:] = result
+        return True
+
+
+def inline_functions(quadruples, function_directory, threshold=DEFAULT_INLINE_THRESHOLD):
+    # Regresa los sitios inlineados: (llamador, función, cuádruplo del ERA)
+    return Inliner(quadruples, function_directory, threshold).run()
@@ -0,0 +1,539 @@
+import sys
+
+from memory_manager import memory_manager
+from quadruples import Quadruple
+from optimizer import (
+    BINARY_OPERATORS, FUSED_GOTOF_OPERATORS, FUSED_STORE_OPERATORS, JUMP_OPERATORS,
+    TYPED_ASSIGN_OPERATORS, TYPED_BINARY_OPERATORS, function_ranges,
+)
+
+# Representación intermedia: un grafo de flujo de control (CFG) por función,
+# con bloques básicos de cuádruplos. Los saltos apuntan a bloques, no a
+# índices, así que los pases pueden mover o crear bloques y 'lower' vuelve
+# a numerar todo al regresar a la lista de cuádruplos.
+
+
+def is_frame_address(address):
+    # Locales y temporales: viven en el frame y entran a SSA. Las globales
+    # se quedan como memoria porque cualquier GOSUB puede escribirlas.
+    return isinstance(address, int) and memory_manager.LOCAL_INT_START <= address < memory_manager.CONST_INT_START
+
+
+def use_slots(quad):
+    op = quad.operator
+    if op in BINARY_OPERATORS or op in FUSED_GOTOF_OPERATORS or op in FUSED_STORE_OPERATORS \
+            or op in TYPED_BINARY_OPERATORS:
+        return ('left_operand', 'right_operand')
+    if (op in ('=', 'print', 'gotof', 'PARAM', 'RET') or op in TYPED_ASSIGN_OPERATORS) \
+            and not isinstance(quad.left_operand, str):
+        return ('left_operand',)
+    return ()
+
+
+def def_slot(quad):
+    op = quad.operator
+    if op in BINARY_OPERATORS or op in FUSED_STORE_OPERATORS or op == '=' \
+            or op in TYPED_BINARY_OPERATORS or op in TYPED_ASSIGN_OPERATORS:
+        return 'result'
+    return None
+
+
+class SSAValue:
+    __slots__ = ('address', 'version')
+
+    def __init__(self, address, version):
+        self.address = address
+        self.version = version
+
+    def __eq__(self, other):
+        return isinstance(other, SSAValue) and self.address == other.address and self.version == other.version
+
+    def __hash__(self):
+        return hash((self.address, self.version))
+
+    def __str__(self):
+        return f"{self.address}_{self.version}"
+
+    __repr__ = __str__
+
+
+def base_address(operand):
+    return operand.address if isinstance(operand, SSAValue) else operand
+
+
+class Phi:
+    def __init__(self, address):
+        self.address = address
+        self.result = address
+        # bloque predecesor -> valor que llega por esa arista
+        self.args = {}
+
+    def __str__(self):
+        args = ', '.join(f"{block}: {value}" for block, value in self.args.items())
+        return f"{self.result} = phi({args})"
+
+
+class BasicBlock:
+    def __init__(self, id, function):
+        self.id = id
+        self.function = function
+        self.instructions = []
+        self.phis = []
+        self.preds = []
+        self.succs = []
+        # Sucesor por caída (sin salto); None si el bloque termina en goto o ENDFUNC
+        self.fallthrough = None
+
+    def terminator(self):
+        if self.instructions and self.instructions[-1].operator in JUMP_OPERATORS:
+            return self.instructions[-1]
+        return None
+
+    def __str__(self):
+        return f"B{self.id}"
+
+    __repr__ = __str__
+
+
+class ControlFlowGraph:
+    def __init__(self, name):
+        self.name = name
+        self.entry = None
+        self.blocks = []
+        self.idom = None
+        self.in_ssa = False
+
+    # --- Dominadores (Cooper, Harvey y Kennedy) ------------------------
+
+    def reverse_postorder(self):
+        order = []
+        visited = {self.entry}
+        stack = [(self.entry, iter(self.entry.succs))]
+        while stack:
+            block, children = stack[-1]
+            for child in children:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(child.succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def compute_dominators(self):
+        order = self.reverse_postorder()
+        position = {block: i for i, block in enumerate(order)}
+        idom = {self.entry: self.entry}
+
+        def intersect(a, b):
+            while a is not b:
+                while position[a] > position[b]:
+                    a = idom[a]
+                while position[b] > position[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new_idom = None
+                for pred in block.preds:
+                    if pred in idom:
+                        new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if idom.get(block) is not new_idom:
+                    idom[block] = new_idom
+                    changed = True
+        self.idom = idom
+        self.rpo = order
+        return idom
+
+    def dominates(self, a, b):
+        # ¿a domina a b? (b alcanzable)
+        idom = self.idom
+        while b is not a:
+            parent = idom.get(b)
+            if parent is None or parent is b:
+                return False
+            b = parent
+        return True
+
+    def dominator_tree(self):
+        children = {block: [] for block in self.idom}
+        for block, parent in self.idom.items():
+            if block is not parent:
+                children[parent].append(block)
+        return children
+
+    def natural_loops(self):
+        # Un ciclo por cada cabecera con aristas de regreso (un sucesor que
+        # domina al bloque): (cabecera, bloques del ciclo, bloques latch)
+        if self.idom is None:
+            self.compute_dominators()
+        latches = {}
+        for block in self.idom:
+            for succ in block.succs:
+                if succ in self.idom and self.dominates(succ, block):
+                    latches.setdefault(succ, []).append(block)
+        loops = []
+        for header, sources in latches.items():
+            body = {header}
+            work = list(sources)
+            while work:
+                block = work.pop()
+                if block not in body:
+                    body.add(block)
+                    work.extend(pred for pred in block.preds if pred in self.idom)
+            loops.append((header, body, sources))
+        # Los ciclos internos primero
+        loops.sort(key=lambda loop: len(loop[1]))
+        return loops
+
+    def dominance_frontiers(self):
+        frontiers = {block: set() for block in self.idom}
+        for block in self.idom:
+            preds = [pred for pred in block.preds if pred in self.idom]
+            if len(preds) < 2:
+                continue
+            for pred in preds:
+                runner = pred
+                while runner is not self.idom[block]:
+                    frontiers[runner].add(block)
+                    runner = self.idom[runner]
+        return frontiers
+
+    # --- SSA -----------------------------------------------------------
+
+    def to_ssa(self):
+        # SSA semi-podada: sólo las direcciones que se leen en un bloque
+        # antes de definirse ahí reciben phis en la frontera iterada
+        if self.idom is None:
+            self.compute_dominators()
+        reachable = self.idom
+        def_blocks = {}
+        non_local = set()
+        for block in reachable:
+            defined = set()
+            for quad in block.instructions:
+                for slot in use_slots(quad):
+                    address = getattr(quad, slot)
+                    if is_frame_address(address) and address not in defined:
+                        non_local.add(address)
+                slot = def_slot(quad)
+                if slot and is_frame_address(quad.result):
+                    defined.add(quad.result)
+                    def_blocks.setdefault(quad.result, []).append(block)
+
+        frontiers = self.dominance_frontiers()
+        for address in non_local:
+            has_phi = set()
+            work = list(def_blocks.get(address, ()))
+            while work:
+                block = work.pop()
+                for frontier in frontiers[block]:
+                    if frontier not in has_phi:
+                        has_phi.add(frontier)
+                        frontier.phis.append(Phi(address))
+                        work.append(frontier)
+
+        # Renombrado sobre el árbol de dominadores, sin recursión
+        counters = {}
+        stacks = {}
+
+        def current(address):
+            stack = stacks.get(address)
+            return stack[-1] if stack else SSAValue(address, 0)
+
+        def fresh(address):
+            counters[address] = counters.get(address, 0) + 1
+            value = SSAValue(address, counters[address])
+            stacks.setdefault(address, []).append(value)
+            return value
+
+        children = self.dominator_tree()
+        pushed_by = {}
+        work = [(self.entry, False)]
+        while work:
+            block, leaving = work.pop()
+            if leaving:
+                for address in pushed_by.pop(block):
+                    stacks[address].pop()
+                continue
+            pushed = []
+            for phi in block.phis:
+                phi.result = fresh(phi.address)
+                pushed.append(phi.address)
+            for quad in block.instructions:
+                for slot in use_slots(quad):
+                    address = getattr(quad, slot)
+                    if is_frame_address(address):
+                        setattr(quad, slot, current(address))
+                slot = def_slot(quad)
+                if slot and is_frame_address(quad.result):
+                    quad.result = fresh(quad.result)
+                    pushed.append(quad.result.address)
+            for succ in block.succs:
+                for phi in succ.phis:
+                    phi.args[block] = current(phi.address)
+            pushed_by[block] = pushed
+            work.append((block, True))
+            for child in reversed(children[block]):
+                work.append((child, False))
+        self.in_ssa = True
+
+    def from_ssa(self, program):
+        # Cada phi se vuelve copias al final de sus predecesores (partiendo
+        # aristas críticas). Supone SSA convencional: las versiones de una
+        # misma dirección no se traslapan, así que basta quitar el subíndice.
+        for block in list(self.blocks):
+            for phi in block.phis:
+                for pred, value in list(phi.args.items()):
+                    source = base_address(value)
+                    if source == phi.address:
+                        continue
+                    if len(pred.succs) > 1:
+                        pred = program.split_edge(self, pred, block)
+                    copy = Quadruple('=', source, '', phi.address)
+                    if pred.terminator() is not None:
+                        pred.instructions.insert(len(pred.instructions) - 1, copy)
+                    else:
+                        pred.instructions.append(copy)
+            block.phis = []
+
+        for block in self.blocks:
+            for quad in block.instructions:
+                for slot in ('left_operand', 'right_operand', 'result'):
+                    value = getattr(quad, slot)
+                    if isinstance(value, SSAValue):
+                        setattr(quad, slot, value.address)
+        self.in_ssa = False
+
+    def def_use_chains(self):
+        # valor -> (definición, [instrucciones que lo leen]); en SSA cada
+        # valor tiene una sola definición (Phi o cuádruplo)
+        definitions = {}
+        uses = {}
+        for block in self.blocks:
+            for phi in block.phis:
+                definitions[phi.result] = phi
+                for value in phi.args.values():
+                    uses.setdefault(value, []).append(phi)
+            for quad in block.instructions:
+                for slot in use_slots(quad):
+                    uses.setdefault(getattr(quad, slot), []).append(quad)
+                if def_slot(quad):
+                    definitions[quad.result] = quad
+        return {value: (definitions.get(value), uses.get(value, []))
+                for value in set(definitions) | set(uses) if isinstance(value, (SSAValue, int))}
+
+
+class Program:
+    # Todos los CFGs del programa y el orden de los bloques en memoria
+    def __init__(self, quadruples, function_directory):
+        self.function_directory = function_directory
+        self.functions = {}
+        self.layout = []
+        self.next_id = 0
+        self.build(quadruples)
+
+    def new_block(self, cfg):
+        block = BasicBlock(self.next_id, cfg.name)
+        self.next_id += 1
+        cfg.blocks.append(block)
+        return block
+
+    def build(self, quadruples):
+        n = len(quadruples)
+        owners = function_ranges(quadruples, self.function_directory)
+        leaders = {0}
+        for i, quad in enumerate(quadruples):
+            if quad.operator in JUMP_OPERATORS:
+                leaders.add(int(quad.result))
+                leaders.add(i + 1)
+            elif quad.operator == 'ENDFUNC':
+                leaders.add(i + 1)
+            if i == 0 or owners[i] != owners[i - 1]:
+                leaders.add(i)
+        for info in self.function_directory.functions.values():
+            if info['start_quad'] is not None:
+                leaders.add(info['start_quad'])
+
+        block_at = {}
+        for i in sorted(leader for leader in leaders if leader < n):
+            cfg = self.functions.get(owners[i])
+            if cfg is None:
+                cfg = self.functions[owners[i]] = ControlFlowGraph(owners[i])
+            block_at[i] = self.new_block(cfg)
+            self.layout.append(block_at[i])
+        # Bloque vacío de salida: destino de los saltos al final del programa
+        main = self.functions.get('global') or ControlFlowGraph('global')
+        self.functions['global'] = main
+        exit_block = block_at[n] = self.new_block(main)
+        self.layout.append(exit_block)
+
+        current = None
+        for i, quad in enumerate(quadruples):
+            if i in block_at:
+                current = block_at[i]
+            copy = Quadruple(quad.operator, quad.left_operand, quad.right_operand, quad.result)
+            if quad.operator in JUMP_OPERATORS:
+                copy.result = block_at[int(quad.result)]
+            current.instructions.append(copy)
+
+        for position, block in enumerate(self.layout):
+            last = block.instructions[-1] if block.instructions else None
+            following = self.layout[position + 1] if position + 1 < len(self.layout) else None
+            if last is not None and last.operator in ('goto', 'ENDFUNC'):
+                block.fallthrough = None
+            else:
+                block.fallthrough = following
+            if block.fallthrough is not None:
+                self.add_edge(block, block.fallthrough)
+            if last is not None and last.operator in JUMP_OPERATORS and last.result not in block.succs:
+                self.add_edge(block, last.result)
+
+        for name, cfg in self.functions.items():
+            if name == 'global':
+                cfg.entry = block_at[0] if n else exit_block
+            else:
+                cfg.entry = block_at[self.function_directory.functions[name]['start_quad']]
+
+    def add_edge(self, source, target):
+        source.succs.append(target)
+        target.preds.append(source)
+
+    def insert_preheader(self, cfg, header, loop_blocks):
+        # Bloque nuevo justo antes de la cabecera: las aristas que entran al
+        # ciclo desde fuera pasan por él; las de regreso no
+        preheader = self.new_block(cfg)
+        for pred in [pred for pred in header.preds if pred not in loop_blocks]:
+            pred.succs[pred.succs.index(header)] = preheader
+            preheader.preds.append(pred)
+            if pred.fallthrough is header:
+                pred.fallthrough = preheader
+            terminator = pred.terminator()
+            if terminator is not None and terminator.result is header:
+                terminator.result = preheader
+        header.preds = [pred for pred in header.preds if pred in loop_blocks] + [preheader]
+        preheader.succs.append(header)
+        preheader.fallthrough = header
+        self.layout.insert(self.layout.index(header), preheader)
+        if cfg.entry is header:
+            cfg.entry = preheader
+        cfg.idom = None
+        return preheader
+
+    def split_edge(self, cfg, source, target):
+        # Bloque nuevo entre source y target; 'lower' le pone el goto
+        middle = self.new_block(cfg)
+        middle.fallthrough = target
+        source.succs[source.succs.index(target)] = middle
+        target.preds[target.preds.index(source)] = middle
+        middle.preds.append(source)
+        middle.succs.append(target)
+        if source.fallthrough is target:
+            source.fallthrough = middle
+        terminator = source.terminator()
+        if terminator is not None and terminator.result is target:
+            terminator.result = middle
+        for phi in target.phis:
+            if source in phi.args:
+                phi.args[middle] = phi.args.pop(source)
+        # Va antes del último bloque de la función (el del ENDFUNC) o al final
+        blocks = [block for block in self.layout if block.function == cfg.name]
+        anchor = blocks[-1]
+        if anchor.instructions and anchor.instructions[-1].operator == 'ENDFUNC':
+            self.layout.insert(self.layout.index(anchor), middle)
+        else:
+            self.layout.insert(self.layout.index(anchor) + 1, middle)
+        if cfg.idom is not None:
+            cfg.idom[middle] = source
+        return middle
+
+    def to_ssa(self):
+        for cfg in self.functions.values():
+            cfg.to_ssa()
+
+    def from_ssa(self):
+        for cfg in self.functions.values():
+            if cfg.in_ssa:
+                cfg.from_ssa(self)
+
+    def lower(self, quadruples):
+        # Regresa a la lista plana: numera los bloques en el orden de
+        # 'layout', agrega un goto donde la caída ya no es contigua y
+        # actualiza saltos, GOSUB y start_quad
+        if any(cfg.in_ssa for cfg in self.functions.values()):
+            raise Exception("El programa sigue en SSA: llama a from_ssa antes de lower")
+        # El bloque de salida siempre queda al final
+        exit_blocks = [block for block in self.layout if not block.instructions and not block.succs]
+        layout = [block for block in self.layout if block not in exit_blocks] + exit_blocks
+
+        result = []
+        start = {}
+        for position, block in enumerate(layout):
+            start[block] = len(result)
+            result.extend(block.instructions)
+            following = layout[position + 1] if position + 1 < len(layout) else None
+            if block.fallthrough is not None and block.fallthrough is not following:
+                result.append(Quadruple('goto', '', '', block.fallthrough))
+
+        entries = {name: start[cfg.entry] for name, cfg in self.functions.items()}
+        for quad in result:
+            if isinstance(quad.result, BasicBlock):
+                quad.result = start[quad.result]
+            elif quad.operator == 'GOSUB':
+                quad.result = entries[quad.left_operand]
+        for name, info in self.function_directory.functions.items():
+            if name != 'global' and info['start_quad'] is not None:
+                info['start_quad'] = entries[name]
+        quadruples[:] = result
+        return quadruples
+
+    def to_dot(self):
+        lines = ['digraph Patito {', '    node [shape=box, fontname="monospace"];']
+        for name, cfg in self.functions.items():
+            lines.append(f'    subgraph "cluster_{name}" {{')
+            lines.append(f'        label="{name}";')
+            for block in cfg.blocks:
+                rows = [f"{block}"] + [str(phi) for phi in block.phis]
+                rows += [f"{quad.operator} {quad.left_operand} {quad.right_operand} {quad.result}".strip()
+                         for quad in block.instructions]
+                label = '\\l'.join(row.replace('\\', '\\\\').replace('"', '\\"') for row in rows) + '\\l'
+                lines.append(f'        {block} [label="{label}"];')
+            lines.append('    }')
+        for block in self.layout:
+            for succ in block.succs:
+                style = '' if succ is block.fallthrough else ' [style=dashed]'
+                lines.append(f'    {block} -> {succ}{style};')
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+
+def build_program(quadruples, function_directory):
+    return Program(quadruples, function_directory)
+
+
+if __name__ == "__main__":
+    import io
+    from contextlib import redirect_stdout
+    from patito_parser import parser
+    from patito_lexer import lexer
+    from quadruples import quadruple_manager
+    from symbol_table import function_directory
+
+    # Uso: python ir.py programa.txt [--ssa]  -> DOT del CFG en la salida estándar
+    if len(sys.argv) < 2:
+        print("Uso: python ir.py programa.txt [--ssa]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r') as f:
+        data = f.read()
+    with redirect_stdout(io.StringIO()):
+        parser.parse(data, lexer=lexer)
+    program = build_program(quadruple_manager.quadruples, function_directory)
+    if '--ssa' in sys.argv:
+        program.to_ssa()
+    print(program.to_dot(), end='')
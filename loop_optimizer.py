@@ -0,0 +1,259 @@
+from memory_manager import memory_manager
+from quadruples import Quadruple
+from ir import build_program, def_slot, use_slots
+from optimizer import (
+    ARITHMETIC_OPERATORS, RELATIONAL_OPERATORS, constant_address, is_constant, is_global, is_temp,
+    frame_has_room, new_frame_address, temp_kind,
+)
+from virtual_machine import parse_constant
+
+# Comparación contraria, para probar la condición al final del ciclo
+NEGATED = {'<': '>=', '>': '<=', '==': '!=', '!=': '==', '<=': '>', '>=': '<'}
+
+
+class LoopOptimizer:
+    # Optimizaciones de ciclos 'mientras' sobre el CFG de ir.py:
+    #   - código invariante del ciclo a un preheader
+    #   - reducción de fuerza: v * k con v variable de inducción se vuelve
+    #     una variable que se incrementa junto con v
+    #   - inversión del ciclo: la condición se repite al final con un salto
+    #     de regreso al cuerpo, y el goto de regreso desaparece
+    def __init__(self, quadruples, function_directory):
+        self.quadruples = quadruples
+        self.function_directory = function_directory
+        self.memory = function_directory.memory_manager
+        self.values = {address: parse_constant(key) for key, address in self.memory.constants_table.items()}
+        self.hoisted = 0
+        self.reduced = 0
+        self.inverted = 0
+
+    def run(self):
+        program = build_program(self.quadruples, self.function_directory)
+        for cfg in program.functions.values():
+            # Primero se invierten los ciclos: así el preheader queda después
+            # de la primera prueba y el código que sube sólo corre si el
+            # ciclo se ejecuta al menos una vez
+            self.for_each_loop(cfg, lambda header, blocks, latches: self.invert(header, blocks, latches))
+            self.for_each_loop(cfg, lambda header, blocks, latches: self.optimize_loop(program, cfg, header, blocks, latches))
+        program.lower(self.quadruples)
+        return self.hoisted, self.reduced, self.inverted
+
+    def for_each_loop(self, cfg, action):
+        # Los dominadores se recalculan después de cada ciclo porque los
+        # preheaders y la inversión cambian el CFG
+        seen = set()
+        while True:
+            cfg.idom = None
+            loops = [loop for loop in cfg.natural_loops() if loop[0] not in seen]
+            if not loops:
+                return
+            header, blocks, latches = loops[0]
+            seen.add(header)
+            new_header = action(header, blocks, latches)
+            if new_header is not None:
+                seen.add(new_header)
+
+    def loop_definitions(self, blocks):
+        definitions = {}
+        has_call = False
+        for block in blocks:
+            for quad in block.instructions:
+                if quad.operator == 'GOSUB':
+                    has_call = True
+                if def_slot(quad):
+                    definitions[quad.result] = definitions.get(quad.result, 0) + 1
+        return definitions, has_call
+
+    def optimize_loop(self, program, cfg, header, blocks, latches):
+        definitions, has_call = self.loop_definitions(blocks)
+        preheader = None
+        if cfg.idom is None:
+            cfg.compute_dominators()
+        # Sólo sube lo que corre en toda iteración: un bloque que domina a
+        # los latches y a las salidas. Lo que está dentro de un 'si' puede
+        # fallar (operandos sin valor, división entre cero) si se adelanta
+        exits = [block for block in blocks if any(succ not in blocks for succ in block.succs)]
+        always = {block for block in blocks
+                  if all(cfg.dominates(block, other) for other in list(latches) + exits)}
+
+        def invariant(address, hoisted):
+            if is_constant(address) or address in hoisted:
+                return True
+            if not isinstance(address, int) or definitions.get(address, 0):
+                return False
+            # Un GOSUB dentro del ciclo puede escribir cualquier global
+            return not (has_call and is_global(address))
+
+        # Invariantes: temporales de una sola definición cuyos operandos no
+        # cambian en el ciclo. Una división sólo sube si el divisor es una
+        # constante distinta de cero (no puede fallar antes de tiempo).
+        hoisted = set()
+        ordered = [block for block in cfg.rpo if block in always]
+        changed = True
+        while changed:
+            changed = False
+            for block in ordered:
+                for quad in list(block.instructions):
+                    op = quad.operator
+                    if not (op in ARITHMETIC_OPERATORS or op in RELATIONAL_OPERATORS):
+                        continue
+                    if not is_temp(quad.result) or definitions.get(quad.result) != 1:
+                        continue
+                    if not (invariant(quad.left_operand, hoisted) and invariant(quad.right_operand, hoisted)):
+                        continue
+                    if op == '/' and not (is_constant(quad.right_operand) and self.values[quad.right_operand] != 0):
+                        continue
+                    if preheader is None:
+                        preheader = program.insert_preheader(cfg, header, blocks)
+                    block.instructions.remove(quad)
+                    preheader.instructions.append(quad)
+                    hoisted.add(quad.result)
+                    self.hoisted += 1
+                    changed = True
+
+        self.reduce_strength(program, cfg, header, blocks, definitions, has_call, preheader)
+
+    def induction_variables(self, blocks, definitions, has_call):
+        # v = v + c (o v - c, c + v) con c constante y una sola definición de v
+        variables = {}
+        for block in blocks:
+            instructions = block.instructions
+            for i in range(len(instructions) - 1):
+                step, assign = instructions[i], instructions[i + 1]
+                if assign.operator != '=' or assign.left_operand != step.result or not is_temp(step.result):
+                    continue
+                v = assign.result
+                if definitions.get(v) != 1 or definitions.get(step.result) != 1:
+                    continue
+                if is_global(v) and has_call:
+                    continue
+                if step.operator == '+' and step.left_operand == v and is_constant(step.right_operand):
+                    variables[v] = (block, assign, self.values[step.right_operand])
+                elif step.operator == '+' and step.right_operand == v and is_constant(step.left_operand):
+                    variables[v] = (block, assign, self.values[step.left_operand])
+                elif step.operator == '-' and step.left_operand == v and is_constant(step.right_operand):
+                    variables[v] = (block, assign, -self.values[step.right_operand])
+        return variables
+
+    def reduce_strength(self, program, cfg, header, blocks, definitions, has_call, preheader):
+        variables = self.induction_variables(blocks, definitions, has_call)
+        if not variables:
+            return preheader
+        for block in blocks:
+            instructions = block.instructions
+            for i, quad in enumerate(list(instructions)):
+                if quad.operator != '*' or not is_temp(quad.result) or definitions.get(quad.result) != 1:
+                    continue
+                if quad.left_operand in variables and is_constant(quad.right_operand):
+                    v, k = quad.left_operand, quad.right_operand
+                elif quad.right_operand in variables and is_constant(quad.left_operand):
+                    v, k = quad.right_operand, quad.left_operand
+                else:
+                    continue
+                position = instructions.index(quad)
+                uses = self.uses_before_redefinition(instructions, position, quad.result, v)
+                if uses is None:
+                    continue
+
+                update_block, assign, step = variables[v]
+                # Sólo enteros: sumar un paso flotante acumula redondeo y no
+                # daría exactamente v * k
+                if self.is_float(v) or not isinstance(self.values[k], int) or not isinstance(step, int):
+                    continue
+                if not frame_has_room(self.function_directory, cfg.name, ['local_int']):
+                    continue
+                product = self.values[k] * step
+                reduced = new_frame_address(self.function_directory, cfg.name, 'local_int')
+                increment = constant_address(product, self.memory)
+                self.values[increment] = product
+
+                if preheader is None:
+                    preheader = program.insert_preheader(cfg, header, blocks)
+                preheader.instructions.append(Quadruple('*', v, k, reduced))
+                update_block.instructions.insert(update_block.instructions.index(assign) + 1,
+                                                 Quadruple('+', reduced, increment, reduced))
+                instructions.remove(quad)
+                for use in uses:
+                    for slot in use_slots(use):
+                        if getattr(use, slot) == quad.result:
+                            setattr(use, slot, reduced)
+                self.reduced += 1
+        return preheader
+
+    def is_float(self, address):
+        if is_global(address):
+            return address >= memory_manager.GLOBAL_FLOAT_START
+        return address >= memory_manager.LOCAL_FLOAT_START
+
+    def uses_before_redefinition(self, instructions, position, temp, variable):
+        # Los usos del temporal deben estar en el mismo bloque, antes de
+        # que la variable de inducción cambie; si no, no se reduce
+        uses = []
+        variable_changed = False
+        for quad in instructions[position + 1:]:
+            reads = [getattr(quad, slot) for slot in use_slots(quad)]
+            if temp in reads:
+                if variable_changed:
+                    return None
+                uses.append(quad)
+            if def_slot(quad) and quad.result == variable:
+                variable_changed = True
+        return uses if uses else None
+
+    def invert(self, header, blocks, latches):
+        # Cabecera: cálculos de la condición + gotof a la salida; latch:
+        # termina con goto a la cabecera. La condición se copia (con
+        # temporales nuevos) al final del latch, negada y saltando al cuerpo.
+        # Regresa el cuerpo, que es la nueva cabecera del ciclo.
+        if len(latches) != 1:
+            return None
+        latch = latches[0]
+        instructions = header.instructions
+        if len(instructions) < 2 or not latch.instructions:
+            return None
+        test, back = instructions[-1], latch.instructions[-1]
+        if test.operator != 'gotof' or back.operator != 'goto' or back.result is not header:
+            return None
+        compare = instructions[-2]
+        exit_block = test.result
+        body = header.fallthrough
+        if compare.operator not in NEGATED or compare.result != test.left_operand or exit_block in blocks \
+                or body not in blocks or body is header:
+            return None
+        for quad in instructions[:-1]:
+            if not (quad.operator in ARITHMETIC_OPERATORS or quad.operator in RELATIONAL_OPERATORS
+                    or quad.operator == '=') or not is_temp(quad.result):
+                return None
+
+        kinds = [temp_kind(quad.result)[0] for quad in instructions[:-1]]
+        if not frame_has_room(self.function_directory, header.function, kinds):
+            return None
+
+        renamed = {}
+
+        def rename(operand):
+            return renamed.get(operand, operand)
+
+        copies = []
+        for quad in instructions[:-1]:
+            kind, _ = temp_kind(quad.result)
+            renamed[quad.result] = new_frame_address(self.function_directory, header.function, kind)
+            operator = NEGATED[quad.operator] if quad is compare else quad.operator
+            copies.append(Quadruple(operator, rename(quad.left_operand), rename(quad.right_operand),
+                                    renamed[quad.result]))
+        # gotof del negado: salta al cuerpo cuando la condición original se cumple
+        copies.append(Quadruple('gotof', renamed[compare.result], '', body))
+
+        latch.instructions[-1:] = copies
+        latch.succs[latch.succs.index(header)] = body
+        header.preds.remove(latch)
+        body.preds.append(latch)
+        latch.succs.append(exit_block)
+        exit_block.preds.append(latch)
+        latch.fallthrough = exit_block
+        self.inverted += 1
+        return body
+
+
+def optimize_loops(quadruples, function_directory):
+    return LoopOptimizer(quadruples, function_directory).run()
@@ -1,29 +1,196 @@
 import sys
-from patito_parser import parser
-from patito_lexer import lexer
-from quadruples import quadruple_manager
-from memory_manager import memory_manager
 from virtual_machine import VirtualMachine
-from symbol_table import function_directory
+from binary_program import is_binary_program, load_vm, save_program
+from compile_cache import CompilationCache
+from profiler import VMProfiler
+
+def print_banner():
+    print("\n" + "="*50)
+    print("🚀  INICIANDO MÁQUINA VIRTUAL...")
+    print("="*50 + "\n")
+
+def run_vm(vm, profile):
+    # profile: None (sin perfil), '' (sólo tabla) o archivo de pilas colapsadas
+    if profile is None:
+        vm.run()
+        return
+    profiler = VMProfiler(vm)
+    try:
+        profiler.run()
+    finally:
+        print(profiler.report())
+        if profile:
+            with open(profile, 'w') as f:
+                f.write(profiler.collapsed_stacks())
+            print(f"\nPilas colapsadas guardadas en {profile}")
+
+def run_loaded(load, profile=None):
+    # Un programa ya compilado se carga directo en la VM, sin PLY
+    try:
+        vm = load()
+        print_banner()
+        run_vm(vm, profile)
+        
+        print("\n" + "="*50)
+        print("EJECUCIÓN FINALIZADA")
+        
+    except Exception as e:
+        print(f"\nERROR: {e}")
+
+def print_cache_stats(cache):
+    stats = cache.stats()
+    print(f"\nCaché: aciertos={stats['hits']} fallos={stats['misses']} desalojos={stats['evictions']} "
+          f"(acumulado: {stats['total_hits']}/{stats['total_misses']}, {stats['entries']} entradas, {stats['bytes']} bytes)")
+
+def optimize(context, optimization_level=0, inline_threshold=20, memoize=None, rule_modules=()):
+    # Pases sobre los cuádruplos de una compilación, en el orden de main();
+    # también lo usa batch.py. Sin 'memoize' explícito, sólo se memoiza en -O1 o mayor
+    from optimizer import eliminate_common_subexpressions, eliminate_dead_code, fold_constants, fuse_superinstructions, mark_pure_functions, recycle_temps, specialize_types
+    quadruple_manager = context.quadruple_manager
+    memory_manager = context.memory_manager
+    function_directory = context.function_directory
+    
+    if optimization_level >= 2:
+        from inliner import inline_functions
+        sites = inline_functions(quadruple_manager.quadruples, function_directory, inline_threshold)
+        print(f"\nLlamadas inlineadas: {len(sites)}")
+        for caller, callee, ip in sites:
+            print(f"  {callee} en {caller} (cuádruplo {ip})")
+    
+    if optimization_level >= 1:
+        folded = fold_constants(quadruple_manager.quadruples, function_directory)
+        print(f"\nCuádruplos plegados (constantes): {folded}")
+        common = eliminate_common_subexpressions(quadruple_manager.quadruples, function_directory)
+        print(f"Subexpresiones comunes eliminadas: {common} cuádruplos")
+        eliminated = eliminate_dead_code(quadruple_manager.quadruples, function_directory)
+        print(f"Cuádruplos eliminados (código muerto): {eliminated}")
+    if optimization_level >= 2:
+        from loop_optimizer import optimize_loops
+        hoisted, reduced, inverted = optimize_loops(quadruple_manager.quadruples, function_directory)
+        print(f"Ciclos: invariantes movidos={hoisted} reducciones de fuerza={reduced} invertidos={inverted}")
+    if optimization_level >= 1:
+        import importlib
+        from peephole import optimize_peephole
+        # Los módulos de reglas se registran con @peephole_rule al importarse
+        for module in rule_modules:
+            importlib.import_module(module)
+        peephole = optimize_peephole(quadruple_manager.quadruples, function_directory)
+        print(peephole.report())
+    
+    fused = fuse_superinstructions(quadruple_manager.quadruples, function_directory)
+    print(f"\nSuperinstrucciones fusionadas: {fused}")
+    # Reciclar temporales va al final: los pases anteriores cuentan
+    # lecturas por dirección y suponen temporales de un solo uso
+    if optimization_level >= 1:
+        recycle_temps(quadruple_manager.quadruples, function_directory)
+    if memoize is None:
+        memoize = optimization_level >= 1
+    if memoize:
+        memoized = mark_pure_functions(quadruple_manager.quadruples, function_directory)
+        print(f"Funciones memoizadas: {', '.join(memoized) or 'ninguna'}")
+    specialized = specialize_types(quadruple_manager.quadruples, memory_manager)
+    print(f"Operaciones especializadas por tipo: {specialized}")
 
 def main():
-    if len(sys.argv) > 1:
+    # --nativo: ejecuta el programa traducido a Python en lugar de la VM
+    # --guardar=ARCHIVO: guarda el programa compilado en formato binario
+    # --cache[=DIR]: reutiliza programas ya compilados desde un caché en disco (no con --dot)
+    # --memo / --sin-memo: memoiza (o no) las funciones puras; por defecto sólo en -O1 o mayor
+    # --perfil[=ARCHIVO]: perfila la VM (no con --nativo); con ARCHIVO guarda pilas colapsadas
+    # --dot=ARCHIVO: guarda el CFG en SSA de cada función en formato DOT
+    # --inline=N: tamaño máximo (cuádruplos) de una función inlineable en -O2
+    # --reglas=MOD[,MOD]: módulos con reglas peephole extra (en -O1 o mayor)
+    # --flujo: tokeniza el archivo mapeado en memoria con stream_lexer, sin leerlo completo
+    # -O[N]: nivel de optimización (0 por defecto, -O equivale a -O1)
+    flags = [arg for arg in sys.argv[1:] if arg.startswith('-')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    native = '--nativo' in flags
+    optimization_level = 0
+    for flag in flags:
+        if flag.startswith('-O'):
+            if flag[2:] and not flag[2:].isdigit():
+                print(f"Error: nivel de optimización inválido '{flag}'")
+                print("Uso: python main.py [-O[N]] [--nativo] [--cache[=DIR]] [--guardar=ARCHIVO] ... [programa.txt]")
+                sys.exit(1)
+            optimization_level = int(flag[2:] or 1)
+    memoize = ('--memo' in flags or optimization_level >= 1) and '--sin-memo' not in flags
+    stream = '--flujo' in flags
+    save_path = next((flag.split('=', 1)[1] for flag in flags if flag.startswith('--guardar=')), None)
+    inline_threshold = int(next((flag.split('=', 1)[1] for flag in flags if flag.startswith('--inline=')), 20))
+    rule_modules = next((flag.split('=', 1)[1].split(',') for flag in flags if flag.startswith('--reglas=')), [])
+    dot_path = next((flag.split('=', 1)[1] for flag in flags if flag.startswith('--dot=')), None)
+    cache = None
+    for flag in flags:
+        if flag == '--cache' or flag.startswith('--cache='):
+            cache = CompilationCache(flag.split('=', 1)[1] if '=' in flag else None)
+    profile = None
+    for flag in flags:
+        if flag == '--perfil' or flag.startswith('--perfil='):
+            profile = flag.split('=', 1)[1] if '=' in flag else ''
+
+    if args:
         try:
-            with open(sys.argv[1], 'r') as f:
-                data = f.read()
+            if is_binary_program(args[0]):
+                run_loaded(lambda: load_vm(args[0]), profile)
+                return
+            if stream:
+                from stream_lexer import StreamLexer
+                stream_lexer = StreamLexer.from_file(args[0])
+                data = stream_lexer.buffer
+            else:
+                with open(args[0], 'r') as f:
+                    data = f.read()
         except FileNotFoundError:
-            print(f"Error: Archivo {sys.argv[1]} no encontrado")
+            print(f"Error: Archivo {args[0]} no encontrado")
             return
     else:
         print("Compilador Patito - Escribe código (Ctrl+D para terminar):")
         data = sys.stdin.read()
+        stream = False
+
+    if native and profile is not None:
+        # El perfilador mide la VM; el código traducido por --nativo no pasa por ella
+        if stream:
+            stream_lexer.close()
+        print("Error: --perfil no se puede combinar con --nativo (un programa .pbin sí se perfila en la VM)")
+        return
+
+    cache_key = None
+    # --dot necesita los cuádruplos del compilador, que un programa del caché no trae
+    if cache and not native and not save_path and not dot_path:
+        options = f"O{optimization_level} inline={inline_threshold} reglas={','.join(rule_modules)}"
+        cache_key = cache.key(data, options + ('' if memoize else ' sin-memo'), rule_modules)
+        program = cache.lookup(cache_key)
+        if program:
+            if stream:
+                stream_lexer.close()
+            run_loaded(lambda: VirtualMachine.from_records(*program), profile)
+            print_cache_stats(cache)
+            return
+
+    # El compilador sólo se importa cuando hay código fuente que compilar
+    from compiler_context import CompilerContext
+    from transpiler import transpile, run_native
 
     try:
-        quadruple_manager.clear()
-        memory_manager.reset()
+        # Estado propio de esta compilación; no hay singletons que limpiar
+        context = CompilerContext()
+        quadruple_manager = context.quadruple_manager
+        memory_manager = context.memory_manager
+        function_directory = context.function_directory
         
         print("\n=== 1. COMPILACIÓN ===")
-        parser.parse(data, lexer=lexer)
+        if stream:
+            # Los tokens ya no apuntan al mmap: se cierra en cuanto termina el análisis
+            with stream_lexer:
+                context.parse(data, lexer=stream_lexer)
+        else:
+            context.parse(data)
+        if context.syntax_errors:
+            # El parser se recupera para reportarlos todos, pero no hay programa que optimizar ni ejecutar
+            raise Exception(f"{context.syntax_errors} error(es) de sintaxis, el programa no se ejecuta")
+        
+        optimize(context, optimization_level, inline_threshold, memoize, rule_modules)
         
         print("\n=== 2. DIRECTORIO DE FUNCIONES (TABLA DE SÍMBOLOS) ===")
         function_directory.print_directory()
@@ -32,18 +199,43 @@ def main():
         print("\n=== 3. CÓDIGO INTERMEDIO (CUÁDRUPLOS) ===")
         quadruple_manager.print_quadruples()
         
-        print("\n" + "="*50)
-        print("🚀  INICIANDO MÁQUINA VIRTUAL...")
-        print("="*50 + "\n")
+        if dot_path:
+            from ir import build_program
+            program = build_program(quadruple_manager.quadruples, function_directory)
+            program.to_ssa()
+            with open(dot_path, 'w') as f:
+                f.write(program.to_dot())
+            print(f"\nCFG guardado en {dot_path}")
         
-        vm = VirtualMachine(quadruple_manager.quadruples, memory_manager.constants_table)
-        vm.run()
+        if save_path:
+            save_program(save_path, quadruple_manager.quadruples, memory_manager.constants_table, function_directory)
+            print(f"\nPrograma compilado guardado en {save_path}")
+            return
+        
+        if cache_key:
+            # Guardar en el caché es opcional: si falla, el programa corre igual
+            try:
+                cache.store(cache_key, quadruple_manager.quadruples, memory_manager.constants_table, function_directory)
+            except Exception as e:
+                print(f"\nAviso: el programa no se guardó en el caché ({e})")
+
+        print_banner()
+        
+        if native:
+            source = transpile(quadruple_manager.quadruples, memory_manager.constants_table, function_directory)
+            run_native(source)
+        else:
+            vm = VirtualMachine(quadruple_manager.quadruples, memory_manager.constants_table, function_directory.functions)
+            run_vm(vm, profile)
         
         print("\n" + "="*50)
         print("EJECUCIÓN FINALIZADA")
         
+        if cache_key:
+            print_cache_stats(cache)
+        
     except Exception as e:
         print(f"\nERROR: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
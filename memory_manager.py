@@ -29,6 +29,11 @@ class MemoryManager:
         self.const_string_counter = self.CONST_STRING_START
         
         self.constants_table = {}
+        # Tipo de cada constante: con más de 1000 enteros, sus direcciones
+        # siguen en el segmento de flotantes
+        self.constant_types = {}
+        # Temporales (sumados por función) antes y después del reciclaje
+        self.temp_usage = None
     
     def get_global_address(self, var_type):
         if var_type == 'entero':
@@ -88,8 +93,45 @@ class MemoryManager:
             raise ValueError(f"Tipo {const_type} no soportado en constantes")
         
         self.constants_table[key] = address
+        self.constant_types[address] = const_type
         return address
     
+    def get_address_type(self, address):
+        # Tipo de una dirección según su segmento; el parser eligió el
+        # segmento con el tipo que dio el cubo semántico
+        if not isinstance(address, int) or address < self.GLOBAL_INT_START:
+            return None
+        if address in self.constant_types:
+            return self.constant_types[address]
+        segments = [
+            (self.CONST_STRING_START, 'letrero'), (self.CONST_FLOAT_START, 'flotante'),
+            (self.CONST_INT_START, 'entero'), (self.TEMP_BOOL_START, 'bool'),
+            (self.TEMP_FLOAT_START, 'flotante'), (self.TEMP_INT_START, 'entero'),
+            (self.LOCAL_FLOAT_START, 'flotante'), (self.LOCAL_INT_START, 'entero'),
+            (self.GLOBAL_FLOAT_START, 'flotante'), (self.GLOBAL_INT_START, 'entero'),
+        ]
+        for start, address_type in segments:
+            if address >= start:
+                return address_type
+    
+    def reset_local_counters(self):
+        # Cada función (y el main) numera sus locales y temporales desde el
+        # inicio del segmento; así el tamaño de su registro de activación es exacto
+        self.local_int_counter = self.LOCAL_INT_START
+        self.local_float_counter = self.LOCAL_FLOAT_START
+        self.temp_int_counter = self.TEMP_INT_START
+        self.temp_float_counter = self.TEMP_FLOAT_START
+        self.temp_bool_counter = self.TEMP_BOOL_START
+    
+    def get_frame_size(self):
+        return {
+            'local_int': self.local_int_counter - self.LOCAL_INT_START,
+            'local_float': self.local_float_counter - self.LOCAL_FLOAT_START,
+            'temp_int': self.temp_int_counter - self.TEMP_INT_START,
+            'temp_float': self.temp_float_counter - self.TEMP_FLOAT_START,
+            'temp_bool': self.temp_bool_counter - self.TEMP_BOOL_START,
+        }
+    
     def reset(self):
         self.global_int_counter = self.GLOBAL_INT_START
         self.global_float_counter = self.GLOBAL_FLOAT_START
@@ -102,6 +144,11 @@ class MemoryManager:
         self.const_float_counter = self.CONST_FLOAT_START
         self.const_string_counter = self.CONST_STRING_START
         self.constants_table.clear()
+        self.constant_types.clear()
+        self.temp_usage = None
+    
+    def set_temp_usage(self, before, after):
+        self.temp_usage = (before, after)
     
     def print_memory_distribution(self):
         print("\n=== DISTRIBUCIÓN DE MEMORIA VIRTUAL ===")
@@ -127,6 +174,12 @@ class MemoryManager:
         print(f"Temp Bool:     {self.TEMP_BOOL_START} - {self.temp_bool_counter-1}")
         print(f" -> Total Usados: {self.temp_bool_counter - self.TEMP_BOOL_START}")
         
+        if self.temp_usage:
+            before, after = self.temp_usage
+            print("Temporales por función (antes -> después de reciclar):")
+            for kind in ('temp_int', 'temp_float', 'temp_bool'):
+                print(f" -> {kind}: {before[kind]} -> {after[kind]}")
+        
         print(f"Const Int:     {self.CONST_INT_START} - {self.const_int_counter-1}")
         print(f" -> Total Usados: {self.const_int_counter - self.CONST_INT_START}")
         
@@ -0,0 +1,755 @@
+import heapq
+import operator
+
+from memory_manager import memory_manager
+from semantic_cube import semantic_cube
+from virtual_machine import TYPE_LETTERS, TYPED_OPERATORS, TYPED_PREFIXES, parse_constant
+
+ARITHMETIC_OPERATORS = {'+', '-', '*', '/'}
+RELATIONAL_OPERATORS = {'<', '>', '==', '!=', '<=', '>='}
+BINARY_OPERATORS = ARITHMETIC_OPERATORS | RELATIONAL_OPERATORS
+
+# Superinstrucciones: comparación + gotof y aritmética + asignación
+FUSED_GOTOF = {
+    '<': 'LT_GOTOF', '>': 'GT_GOTOF', '==': 'EQ_GOTOF',
+    '!=': 'NE_GOTOF', '<=': 'LE_GOTOF', '>=': 'GE_GOTOF',
+}
+FUSED_STORE = {
+    '+': 'ADD_STORE', '-': 'SUB_STORE', '*': 'MUL_STORE', '/': 'DIV_STORE',
+}
+FUSED_GOTOF_OPERATORS = set(FUSED_GOTOF.values())
+FUSED_STORE_OPERATORS = set(FUSED_STORE.values())
+
+# Especializados por tipo (ver specialize_types)
+TYPED_BINARY_OPERATORS = {name for name, op in TYPED_OPERATORS.items() if op != '='}
+TYPED_ASSIGN_OPERATORS = {name for name, op in TYPED_OPERATORS.items() if op == '='}
+
+# Operadores cuyo resultado es un índice de cuádruplo
+JUMP_OPERATORS = {'goto', 'gotof'} | FUSED_GOTOF_OPERATORS
+
+# Misma semántica que los handlers de la VM (la división es real)
+PYTHON_FUNCTIONS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '<': operator.lt, '>': operator.gt, '==': operator.eq,
+    '!=': operator.ne, '<=': operator.le, '>=': operator.ge,
+}
+
+
+def is_constant(address):
+    # Constantes numéricas; los letreros no participan en expresiones
+    return isinstance(address, int) and memory_manager.CONST_INT_START <= address < memory_manager.CONST_STRING_START
+
+
+def is_temp(address):
+    return isinstance(address, int) and memory_manager.TEMP_INT_START <= address < memory_manager.CONST_INT_START
+
+
+def read_addresses(quad):
+    op = quad.operator
+    if op in BINARY_OPERATORS or op in FUSED_GOTOF_OPERATORS or op in FUSED_STORE_OPERATORS \
+            or op in TYPED_BINARY_OPERATORS:
+        return [quad.left_operand, quad.right_operand]
+    if (op in ('=', 'print', 'gotof', 'PARAM', 'RET') or op in TYPED_ASSIGN_OPERATORS) \
+            and isinstance(quad.left_operand, int):
+        return [quad.left_operand]
+    return []
+
+
+def written_address(quad):
+    # PARAM escribe en el frame de la función llamada, no en el actual
+    op = quad.operator
+    if op in BINARY_OPERATORS or op in FUSED_STORE_OPERATORS or op == '=' or op in TYPED_OPERATORS:
+        return quad.result
+    return None
+
+
+def function_ranges(quadruples, function_directory):
+    # Nombre de la función dueña de cada cuádruplo; el código fuera de
+    # cualquier función (goto inicial y main) pertenece a 'global'
+    owners = ['global'] * len(quadruples)
+    starts = sorted((info['start_quad'], name) for name, info in function_directory.functions.items()
+                    if name != 'global' and info['start_quad'] is not None)
+    for start, name in starts:
+        ip = start
+        while ip < len(quadruples):
+            owners[ip] = name
+            if quadruples[ip].operator == 'ENDFUNC':
+                break
+            ip += 1
+    return owners
+
+
+def jump_targets(quadruples):
+    targets = set()
+    for quad in quadruples:
+        if quad.operator in JUMP_OPERATORS:
+            targets.add(int(quad.result))
+    return targets
+
+
+def compact(quadruples, function_directory, removed):
+    # Elimina los índices en 'removed' y reajusta saltos, GOSUB y start_quad.
+    # Un salto a un cuádruplo eliminado cae en el siguiente que sobrevive.
+    new_index = []
+    kept = 0
+    for i in range(len(quadruples)):
+        new_index.append(kept)
+        if i not in removed:
+            kept += 1
+    new_index.append(kept)
+
+    result = []
+    for i, quad in enumerate(quadruples):
+        if i in removed:
+            continue
+        if quad.operator in JUMP_OPERATORS or quad.operator == 'GOSUB':
+            quad.result = new_index[int(quad.result)]
+        result.append(quad)
+    quadruples[:] = result
+
+    for info in function_directory.functions.values():
+        if info['start_quad'] is not None:
+            info['start_quad'] = new_index[info['start_quad']]
+
+
+def count_reads(quadruples, owners):
+    reads = {}
+    for i, quad in enumerate(quadruples):
+        for address in read_addresses(quad):
+            key = (owners[i], address)
+            reads[key] = reads.get(key, 0) + 1
+    return reads
+
+
+def fuse_superinstructions(quadruples, function_directory):
+    # Fusiona pares de cuádruplos en una sola instrucción de la VM cuando el
+    # temporal intermedio sólo se lee en el segundo cuádruplo del par
+    memory = function_directory.memory_manager
+    owners = function_ranges(quadruples, function_directory)
+    reads = count_reads(quadruples, owners)
+    targets = jump_targets(quadruples)
+
+    removed = set()
+    fused = 0
+    i = 0
+    while i < len(quadruples) - 1:
+        quad = quadruples[i]
+        following = quadruples[i + 1]
+        temp = quad.result
+        fusable = (
+            is_temp(temp)
+            and (i + 1) not in targets
+            and following.left_operand == temp
+            and reads.get((owners[i], temp)) == 1
+        )
+
+        if fusable and quad.operator in FUSED_GOTOF and following.operator == 'gotof':
+            quad.operator = FUSED_GOTOF[quad.operator]
+            quad.result = following.result
+        elif fusable and quad.operator in FUSED_STORE and following.operator == '=' \
+                and memory.get_address_type(temp) == memory.get_address_type(following.result):
+            # Si los tipos difieren, el '=' convierte y no se puede saltar
+            quad.operator = FUSED_STORE[quad.operator]
+            quad.result = following.result
+        else:
+            i += 1
+            continue
+
+        removed.add(i + 1)
+        fused += 1
+        i += 2
+
+    compact(quadruples, function_directory, removed)
+    return fused
+
+
+def return_slot(function_directory, name):
+    variable = function_directory.global_scope.variables.get(name)
+    return variable['address'] if variable else None
+
+
+def is_global(address):
+    return isinstance(address, int) and memory_manager.GLOBAL_INT_START <= address < memory_manager.LOCAL_INT_START
+
+
+def definitely_written(quadruples, lo, hi, entry, defines):
+    # Flujo hacia adelante dentro de [lo, hi): direcciones con valor
+    # asignado por TODOS los caminos que llegan a cada cuádruplo, partiendo
+    # de 'entry'. defines(quad) da la dirección que define (o None). Los
+    # cuádruplos inalcanzables no aparecen.
+    defined = {lo: frozenset(entry)}
+    pending = [lo]
+    while pending:
+        i = pending.pop()
+        out = defined[i]
+        address = defines(quadruples[i])
+        if address is not None:
+            out = out | {address}
+        for target in successors(quadruples, i, lo, hi):
+            before = defined.get(target)
+            after = out if before is None else before & out
+            if after != before:
+                defined[target] = after
+                pending.append(target)
+    return defined
+
+
+def defined_return_slots(quadruples, lo, hi, slots, own):
+    # Variables de retorno asignadas en esta llamada: la propia al
+    # asignarla, la de otra función al llamarla con GOSUB
+    def defines(quad):
+        if quad.operator == 'GOSUB':
+            return slots.get(quad.left_operand)
+        if own is not None and written_address(quad) == own:
+            return own
+        return None
+    return definitely_written(quadruples, lo, hi, (), defines)
+
+
+def mark_pure_functions(quadruples, function_directory):
+    # Una función es pura si sólo escribe globales en su propia variable de
+    # retorno, no imprime y sólo llama funciones puras; las puras con valor
+    # de retorno se marcan con 'memo_address' para que la VM las memoice.
+    # Además su variable de retorno debe quedar asignada por todos los
+    # caminos hasta ENDFUNC, y sólo puede leer variables de retorno que ya
+    # se asignaron antes en el mismo camino: si no, el resultado depende del
+    # valor que dejó otra llamada y memoizarla cambiaría lo que imprime.
+    functions = function_directory.functions
+    owners = function_ranges(quadruples, function_directory)
+    slots = {name: return_slot(function_directory, name) for name in functions
+             if functions[name]['return_type'] != 'nula'}
+
+    calls = {}
+    pure = set()
+    for name, info in functions.items():
+        if name == 'global' or info['start_quad'] is None:
+            continue
+        own = slots.get(name)
+        lo = hi = info['start_quad']
+        while hi < len(quadruples) and owners[hi] == name:
+            hi += 1
+        defined = defined_return_slots(quadruples, lo, hi, slots, own)
+        callees = set()
+        is_pure = True
+        for ip in sorted(defined):
+            quad = quadruples[ip]
+            if quad.operator == 'print':
+                is_pure = False
+                break
+            if quad.operator == 'ENDFUNC':
+                if own is not None and own not in defined[ip]:
+                    is_pure = False
+                    break
+                continue
+            if quad.operator == 'GOSUB':
+                callees.add(quad.left_operand)
+                continue
+            if any(is_global(address) and address not in defined[ip] for address in read_addresses(quad)):
+                is_pure = False
+                break
+            written = written_address(quad)
+            if is_global(written) and written != own:
+                is_pure = False
+                break
+        if is_pure:
+            pure.add(name)
+            calls[name] = callees
+
+    # Punto fijo: se descartan las que llaman a funciones no puras
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not calls[name] <= pure:
+                pure.discard(name)
+                changed = True
+
+    memoized = []
+    for name, info in functions.items():
+        if name in pure and name in slots:
+            info['memo_address'] = slots[name]
+            memoized.append(name)
+        else:
+            info['memo_address'] = None
+    return memoized
+
+
+def value_type(value):
+    if isinstance(value, bool):
+        return 'bool'
+    return 'entero' if isinstance(value, int) else 'flotante'
+
+
+def coerce(value, address_type):
+    # Conversión del '=' entre enteros y flotantes (como ASSIGN_IF/ASSIGN_FI)
+    if address_type == 'entero' and isinstance(value, float):
+        return int(value)
+    if address_type == 'flotante' and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def constant_address(value, memory=memory_manager):
+    # Los booleanos no tienen segmento de constantes: sólo se usan en gotof
+    if isinstance(value, bool):
+        return None
+    return memory.get_constant_address(value, value_type(value))
+
+
+def fold_constants(quadruples, function_directory):
+    # Pliega operaciones con operandos constantes y propaga los valores
+    # conocidos dentro de cada bloque básico; un gotof con condición
+    # conocida se vuelve goto o desaparece. Regresa los cuádruplos cambiados.
+    memory = function_directory.memory_manager
+    values = {address: parse_constant(key) for key, address in memory.constants_table.items()}
+    leaders = jump_targets(quadruples)
+    leaders.update(info['start_quad'] for info in function_directory.functions.values()
+                   if info['start_quad'] is not None)
+
+    def known_value(address):
+        if address in known:
+            return True, known[address]
+        if is_constant(address):
+            return True, values[address]
+        return False, None
+
+    def substitute(address):
+        if address in known:
+            constant = constant_address(known[address], memory)
+            if constant is not None:
+                values[constant] = known[address]
+                return constant
+        return address
+
+    known = {}
+    removed = set()
+    changed = 0
+    for i, quad in enumerate(quadruples):
+        if i in leaders:
+            known.clear()
+        op = quad.operator
+
+        if op in BINARY_OPERATORS:
+            quad.left_operand = substitute(quad.left_operand)
+            quad.right_operand = substitute(quad.right_operand)
+            left_known, left = known_value(quad.left_operand)
+            right_known, right = known_value(quad.right_operand)
+            result_type = 'error'
+            if left_known and right_known:
+                result_type = semantic_cube.get_result_type(value_type(left), value_type(right), op)
+            # Una división entre cero se deja para que falle en ejecución
+            if result_type == 'error' or (op == '/' and right == 0):
+                known.pop(quad.result, None)
+                continue
+            value = PYTHON_FUNCTIONS[op](left, right)
+            if op == '/' and value_type(value) != result_type:
+                # entero / entero es entero para el cubo pero la VM divide
+                # con '/': el cociente real no se guarda como constante entera
+                known.pop(quad.result, None)
+                continue
+            known[quad.result] = value
+            if not isinstance(value, bool):
+                quad.operator = '='
+                quad.left_operand = substitute(quad.result)
+                quad.right_operand = ''
+            changed += 1
+        elif op == '=':
+            quad.left_operand = substitute(quad.left_operand)
+            is_known, value = known_value(quad.left_operand)
+            if is_known:
+                known[quad.result] = coerce(value, memory.get_address_type(quad.result))
+            else:
+                known.pop(quad.result, None)
+        elif op in ('print', 'PARAM', 'RET'):
+            if isinstance(quad.left_operand, int):
+                quad.left_operand = substitute(quad.left_operand)
+        elif op == 'gotof':
+            is_known, value = known_value(quad.left_operand)
+            if is_known:
+                if value:
+                    removed.add(i)
+                else:
+                    quad.operator = 'goto'
+                    quad.left_operand = ''
+                changed += 1
+        elif op == 'GOSUB':
+            # La función llamada puede escribir cualquier global
+            known = {address: value for address, value in known.items() if not is_global(address)}
+        elif op in ('goto', 'ENDFUNC'):
+            known.clear()
+
+    # Las definiciones de temporales que ya nadie lee se eliminan
+    owners = function_ranges(quadruples, function_directory)
+    reads = count_reads([quad for i, quad in enumerate(quadruples) if i not in removed],
+                        [owner for i, owner in enumerate(owners) if i not in removed])
+    for i, quad in enumerate(quadruples):
+        if (quad.operator == '=' or quad.operator in RELATIONAL_OPERATORS) and is_temp(quad.result) \
+                and not reads.get((owners[i], quad.result)):
+            removed.add(i)
+
+    compact(quadruples, function_directory, removed)
+    return changed
+
+
+def thread_jumps(quadruples):
+    # Un salto que cae en un goto se redirige al destino final de la cadena
+    threaded = 0
+    for quad in quadruples:
+        if quad.operator not in JUMP_OPERATORS:
+            continue
+        target = int(quad.result)
+        seen = set()
+        while target < len(quadruples) and quadruples[target].operator == 'goto' and target not in seen:
+            seen.add(target)
+            target = int(quadruples[target].result)
+        if target != int(quad.result):
+            quad.result = target
+            threaded += 1
+    return threaded
+
+
+def reachable_quads(quadruples, function_directory):
+    # Recorrido desde el inicio del programa y el inicio de cada función;
+    # los ENDFUNC se conservan siempre porque delimitan a las funciones
+    roots = [0] + [info['start_quad'] for info in function_directory.functions.values()
+                   if info['start_quad'] is not None]
+    roots += [i for i, quad in enumerate(quadruples) if quad.operator == 'ENDFUNC']
+    reachable = set()
+    pending = [root for root in roots if root < len(quadruples)]
+    while pending:
+        i = pending.pop()
+        if i in reachable or i >= len(quadruples):
+            continue
+        reachable.add(i)
+        op = quadruples[i].operator
+        if op == 'goto':
+            pending.append(int(quadruples[i].result))
+        elif op in JUMP_OPERATORS:
+            pending.append(int(quadruples[i].result))
+            pending.append(i + 1)
+        elif op != 'ENDFUNC':
+            pending.append(i + 1)
+    return reachable
+
+
+def eliminate_dead_code(quadruples, function_directory):
+    # Hilado de saltos, eliminación de código inalcanzable, de saltos al
+    # siguiente cuádruplo y de escrituras a temporales que nadie lee,
+    # hasta que ya no cambie nada. Regresa los cuádruplos eliminados.
+    total = 0
+    while True:
+        thread_jumps(quadruples)
+        reachable = reachable_quads(quadruples, function_directory)
+        removed = {i for i in range(len(quadruples)) if i not in reachable}
+
+        for i, quad in enumerate(quadruples):
+            if i not in removed and quad.operator in JUMP_OPERATORS and int(quad.result) == i + 1:
+                removed.add(i)
+
+        owners = function_ranges(quadruples, function_directory)
+        kept = [i for i in range(len(quadruples)) if i not in removed]
+        reads = count_reads([quadruples[i] for i in kept], [owners[i] for i in kept])
+        for i in kept:
+            quad = quadruples[i]
+            # Una división se conserva: puede fallar por división entre cero
+            if quad.operator != '/' and is_temp(written_address(quad)) \
+                    and not reads.get((owners[i], quad.result)):
+                removed.add(i)
+
+        if not removed:
+            return total
+        total += len(removed)
+        compact(quadruples, function_directory, removed)
+
+
+TEMP_KINDS = ('temp_int', 'temp_float', 'temp_bool')
+
+
+def temp_kind(address):
+    if address < memory_manager.TEMP_FLOAT_START:
+        return 'temp_int', memory_manager.TEMP_INT_START
+    if address < memory_manager.TEMP_BOOL_START:
+        return 'temp_float', memory_manager.TEMP_FLOAT_START
+    return 'temp_bool', memory_manager.TEMP_BOOL_START
+
+
+def successors(quadruples, i, lo, hi):
+    op = quadruples[i].operator
+    if op == 'ENDFUNC':
+        return []
+    if op == 'goto':
+        targets = [int(quadruples[i].result)]
+    elif op in JUMP_OPERATORS:
+        targets = [int(quadruples[i].result), i + 1]
+    else:
+        targets = [i + 1]
+    return [target for target in targets if lo <= target < hi]
+
+
+def temp_intervals(quadruples, lo, hi):
+    # Liveness por bloques básicos dentro de [lo, hi); el intervalo de cada
+    # temporal cubre todos los cuádruplos donde está vivo o se define
+    leaders = {lo}
+    for i in range(lo, hi):
+        if quadruples[i].operator in JUMP_OPERATORS or quadruples[i].operator == 'ENDFUNC':
+            leaders.add(i + 1)
+            if quadruples[i].operator in JUMP_OPERATORS:
+                leaders.add(int(quadruples[i].result))
+    leaders = sorted(leader for leader in leaders if lo <= leader < hi)
+
+    blocks = []
+    block_of = {}
+    for n, start in enumerate(leaders):
+        end = leaders[n + 1] if n + 1 < len(leaders) else hi
+        blocks.append((start, end))
+        block_of[start] = n
+
+    uses = []
+    defs = []
+    for start, end in blocks:
+        use, define = set(), set()
+        for i in range(start, end):
+            quad = quadruples[i]
+            for address in read_addresses(quad):
+                if is_temp(address) and address not in define:
+                    use.add(address)
+            written = written_address(quad)
+            if is_temp(written):
+                define.add(written)
+        uses.append(use)
+        defs.append(define)
+
+    block_succs = [[block_of[target] for target in successors(quadruples, end - 1, lo, hi)]
+                   for start, end in blocks]
+    live_in = [set() for _ in blocks]
+    live_out = [set() for _ in blocks]
+    changed = True
+    while changed:
+        changed = False
+        for n in range(len(blocks) - 1, -1, -1):
+            out = set()
+            for succ in block_succs[n]:
+                out |= live_in[succ]
+            new_in = uses[n] | (out - defs[n])
+            if out != live_out[n] or new_in != live_in[n]:
+                live_out[n] = out
+                live_in[n] = new_in
+                changed = True
+
+    intervals = {}
+
+    def extend(address, i):
+        if address in intervals:
+            first, last = intervals[address]
+            intervals[address] = (min(first, i), max(last, i))
+        else:
+            intervals[address] = (i, i)
+
+    for n, (start, end) in enumerate(blocks):
+        live = set(live_out[n])
+        for address in live:
+            extend(address, end - 1)
+        for i in range(end - 1, start - 1, -1):
+            quad = quadruples[i]
+            written = written_address(quad)
+            if is_temp(written):
+                extend(written, i)
+                live.discard(written)
+            for address in read_addresses(quad):
+                if is_temp(address):
+                    live.add(address)
+            for address in live:
+                extend(address, i)
+    return intervals
+
+
+def recycle_temps(quadruples, function_directory):
+    # Asignación lineal (linear scan) de direcciones temporales: los
+    # temporales cuyos intervalos de vida no se traslapan comparten
+    # dirección y el frame de cada función se reduce a lo necesario
+    owners = function_ranges(quadruples, function_directory)
+    # Rango contiguo de cada función; el de 'global' es el cuerpo del main,
+    # que empieza después de la última función
+    ranges = {}
+    for i, owner in enumerate(owners):
+        if owner in ranges and ranges[owner][1] == i:
+            ranges[owner] = (ranges[owner][0], i + 1)
+        else:
+            ranges[owner] = (i, i + 1)
+
+    before = dict.fromkeys(TEMP_KINDS, 0)
+    after = dict.fromkeys(TEMP_KINDS, 0)
+    for name, info in function_directory.functions.items():
+        frame = info.get('frame_size')
+        if not frame:
+            continue
+        for kind in TEMP_KINDS:
+            before[kind] += frame[kind]
+        if name not in ranges:
+            for kind in TEMP_KINDS:
+                after[kind] += frame[kind]
+            continue
+
+        lo, hi = ranges[name]
+        intervals = temp_intervals(quadruples, lo, hi)
+        mapping = {}
+        free = {kind: [] for kind in TEMP_KINDS}
+        used = dict.fromkeys(TEMP_KINDS, 0)
+        active = []
+        for address, (first, last) in sorted(intervals.items(), key=lambda item: item[1]):
+            # Si el temporal nace escrito en 'first', ese cuádruplo puede
+            # reutilizar la dirección de un temporal que lee por última vez
+            limit = first if written_address(quadruples[first]) == address else first - 1
+            while active and active[0][0] <= limit:
+                _, old = heapq.heappop(active)
+                kind, _ = temp_kind(old)
+                heapq.heappush(free[kind], mapping[old])
+            kind, base = temp_kind(address)
+            if free[kind]:
+                mapping[address] = heapq.heappop(free[kind])
+            else:
+                mapping[address] = base + used[kind]
+                used[kind] += 1
+            heapq.heappush(active, (last, address))
+
+        for i in range(lo, hi):
+            quad = quadruples[i]
+            if quad.left_operand in mapping:
+                quad.left_operand = mapping[quad.left_operand]
+            if quad.right_operand in mapping:
+                quad.right_operand = mapping[quad.right_operand]
+            # El destino de un salto o GOSUB es un cuádruplo, no un temporal
+            if quad.operator not in JUMP_OPERATORS and quad.operator != 'GOSUB' and quad.result in mapping:
+                quad.result = mapping[quad.result]
+
+        frame.update(used)
+        for kind in TEMP_KINDS:
+            after[kind] += used[kind]
+
+    function_directory.memory_manager.set_temp_usage(before, after)
+    return before, after
+
+
+# Direcciones por tipo en cada segmento del frame (3000-3999, 4000-4999, ...)
+SEGMENT_SIZE = 1000
+
+
+def frame_has_room(function_directory, name, kinds):
+    # Si el frame de la función aloja una dirección nueva por cada tipo en
+    # 'kinds' (puede repetirse) sin salirse de su segmento
+    frame = function_directory.functions[name]['frame_size']
+    return all(frame[kind] + kinds.count(kind) <= SEGMENT_SIZE for kind in set(kinds))
+
+
+def new_frame_address(function_directory, name, kind):
+    # Agrega una dirección al frame de la función (kind: 'local_int',
+    # 'temp_float', etc.) y actualiza su frame_size. Quien la llama revisa
+    # antes frame_has_room y omite la transformación si no hay lugar
+    starts = {
+        'local_int': memory_manager.LOCAL_INT_START, 'local_float': memory_manager.LOCAL_FLOAT_START,
+        'temp_int': memory_manager.TEMP_INT_START, 'temp_float': memory_manager.TEMP_FLOAT_START,
+        'temp_bool': memory_manager.TEMP_BOOL_START,
+    }
+    frame = function_directory.functions[name]['frame_size']
+    if frame[kind] >= SEGMENT_SIZE:
+        raise Exception(f"Segmento {kind} lleno en el frame de '{name}'")
+    address = starts[kind] + frame[kind]
+    frame[kind] += 1
+    return address
+
+
+COMMUTATIVE_OPERATORS = {'+', '*', '==', '!='}
+
+
+def eliminate_common_subexpressions(quadruples, function_directory):
+    # Numeración de valores local: dentro de cada bloque básico, una
+    # operación con el mismo operador y los mismos números de valor que una
+    # anterior reutiliza el temporal de la primera. Regresa los eliminados.
+    memory = function_directory.memory_manager
+    leaders = jump_targets(quadruples)
+    leaders.update(info['start_quad'] for info in function_directory.functions.values()
+                   if info['start_quad'] is not None)
+    owners = function_ranges(quadruples, function_directory)
+
+    numbers = {}
+    expressions = {}
+    next_number = [0]
+
+    def number(address):
+        if address not in numbers:
+            numbers[address] = next_number[0]
+            next_number[0] += 1
+        return numbers[address]
+
+    def kill(address):
+        # Una nueva escritura: la dirección recibe un número nuevo y las
+        # expresiones guardadas con el número viejo ya no coinciden
+        numbers[address] = next_number[0]
+        next_number[0] += 1
+
+    replaced = {}
+    removed = set()
+    for i, quad in enumerate(quadruples):
+        if i in leaders:
+            numbers.clear()
+            expressions.clear()
+        op = quad.operator
+        if op in BINARY_OPERATORS:
+            left = replaced.get((owners[i], quad.left_operand), quad.left_operand)
+            right = replaced.get((owners[i], quad.right_operand), quad.right_operand)
+            quad.left_operand, quad.right_operand = left, right
+            key = (op, number(left), number(right))
+            if op in COMMUTATIVE_OPERATORS and key[1] > key[2]:
+                key = (op, key[2], key[1])
+            holder = expressions.get(key)
+            if holder is not None and is_temp(quad.result):
+                replaced[(owners[i], quad.result)] = holder
+                removed.add(i)
+                continue
+            kill(quad.result)
+            # Sólo un temporal conserva su valor (se escribe una vez)
+            if is_temp(quad.result):
+                expressions[key] = quad.result
+        elif op == '=':
+            quad.left_operand = replaced.get((owners[i], quad.left_operand), quad.left_operand)
+            # Una copia entre tipos distintos convierte el valor: número nuevo
+            if memory.get_address_type(quad.left_operand) == memory.get_address_type(quad.result):
+                numbers[quad.result] = number(quad.left_operand)
+            else:
+                kill(quad.result)
+        else:
+            for slot in ('left_operand', 'right_operand'):
+                value = getattr(quad, slot)
+                if isinstance(value, int) and (owners[i], value) in replaced and op != 'ERA':
+                    setattr(quad, slot, replaced[(owners[i], value)])
+            if op == 'GOSUB':
+                for address in [address for address in numbers if is_global(address)]:
+                    kill(address)
+            elif op in JUMP_OPERATORS or op == 'ENDFUNC':
+                numbers.clear()
+                expressions.clear()
+
+    compact(quadruples, function_directory, removed)
+    return len(removed)
+
+
+def specialize_types(quadruples, memory=memory_manager):
+    # Cambia las operaciones y asignaciones entre enteros y flotantes por su
+    # versión especializada (ADD_II, LT_FF, ASSIGN_IF...). Los tipos salen del
+    # segmento de cada dirección, así que la conversión queda decidida al
+    # compilar. Va al final: los demás pases sólo conocen los genéricos.
+    stores = {fused: op for op, fused in FUSED_STORE.items()}
+    specialized = 0
+    for quad in quadruples:
+        op = stores.get(quad.operator, quad.operator)
+        if op not in TYPED_PREFIXES:
+            continue
+        if op == '=':
+            types = (memory.get_address_type(quad.result), memory.get_address_type(quad.left_operand))
+        else:
+            types = (memory.get_address_type(quad.left_operand), memory.get_address_type(quad.right_operand))
+        if types[0] not in TYPE_LETTERS or types[1] not in TYPE_LETTERS:
+            continue
+        quad.operator = f"{TYPED_PREFIXES[op]}_{TYPE_LETTERS[types[0]]}{TYPE_LETTERS[types[1]]}"
+        specialized += 1
+    return specialized
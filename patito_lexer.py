@@ -1,3 +1,5 @@
+import sys
+
 import ply.lex as lex
 
 tokens = (
@@ -48,6 +50,8 @@ def t_ASIGNACION(t):
 
 def t_ID(t):
     r'[a-zA-Z_][a-zA-Z_0-9]*'
+    # Internado: la búsqueda en la tabla de símbolos compara por identidad
+    t.value = sys.intern(t.value)
     t.type = reserved.get(t.value, 'ID')
     return t
 
@@ -93,7 +97,22 @@ t_DIV = r'/'
 t_MENOR = r'<'
 t_MAYOR = r'>'
 
-lexer = lex.lex()
+_lexer = None
+
+
+def get_lexer():
+    # Se construye la primera vez que se usa: importar el módulo es barato
+    global _lexer
+    if _lexer is None:
+        _lexer = lex.lex(module=sys.modules[__name__])
+    return _lexer
+
+
+def __getattr__(name):
+    # 'from patito_lexer import lexer' sigue funcionando, pero perezoso
+    if name == 'lexer':
+        return get_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 """
 LexToken(
@@ -107,6 +126,7 @@ LexToken(
 def test_lexer(data):
     print("=== ANÁLISIS LÉXICO ===")
     
+    lexer = get_lexer()
     lexer.input(data)
     
     tokens_list = []
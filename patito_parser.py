@@ -1,9 +1,10 @@
+import os
+import sys
+
 import ply.yacc as yacc
-from patito_lexer import tokens, lexer
+from patito_lexer import tokens
 from semantic_cube import semantic_cube
-from symbol_table import function_directory
-from quadruples import quadruple_manager
-from memory_manager import memory_manager
+from compiler_context import shared_context
 
 precedence = (
     ('nonassoc', 'MENOR', 'MAYOR', 'IGUAL', 'DIFERENTE', 'MAYOR_IGUAL', 'MENOR_IGUAL'),
@@ -15,7 +16,12 @@ precedence = (
 def p_programa(p):
     # Regla principal del programa
     'programa : PROGRAMA ID PUNTOCOMA start_goto vars funcs fill_goto_main INICIO start_main cuerpo FIN'
+    quadruple_manager = p.parser.context.quadruple_manager
+    memory_manager = p.parser.context.memory_manager
+    function_directory = p.parser.context.function_directory
     print("\n✓ COMPILACIÓN EXITOSA - Programa válido")
+    # Registra los temporales usados por el main
+    function_directory.set_frame_size('global', memory_manager.get_frame_size())
     # Completa los saltos pendientes
     quadruple_manager.complete_patching()
 
@@ -23,6 +29,7 @@ def p_programa(p):
 def p_start_goto(p):
     #La palabra empty le dice al parser que no espere ningún token
     'start_goto : empty'
+    quadruple_manager = p.parser.context.quadruple_manager
     # Si el siguiente cuadruplo es el cuadruplo 0, significa que no hay cuadruplos anteriores
     if quadruple_manager.next_quad() == 0:
         # Agrega un cuadruplo goto al final
@@ -38,8 +45,12 @@ def p_fill_goto_main(p):
 # Regla para iniciar la función main
 def p_start_main(p):
     'start_main : empty'
+    quadruple_manager = p.parser.context.quadruple_manager
+    memory_manager = p.parser.context.memory_manager
     if quadruple_manager.goto_main_index is not None:
         quadruple_manager.patch(quadruple_manager.goto_main_index, quadruple_manager.next_quad())
+    # El main tiene sus propios temporales
+    memory_manager.reset_local_counters()
 
 # Regla para declaraciones
 def p_vars(p):
@@ -49,7 +60,7 @@ def p_vars(p):
 
 # Regla para declaraciones
 def p_declaraciones(p):
-    '''declaraciones : declaracion declaraciones
+    '''declaraciones : declaraciones declaracion
                      | declaracion'''
     """
     a : entero;
@@ -58,9 +69,12 @@ def p_declaraciones(p):
     |
      a : entero;
     """
+    # Recursión por la izquierda: cada declaración se reduce en cuanto
+    # termina y la pila LALR no crece con el número de declaraciones
 
 def p_declaracion(p):
     'declaracion : lista_ids DOSPUNTOS tipo PUNTOCOMA'
+    function_directory = p.parser.context.function_directory
     var_type = p[3]
     var_names = p[1]
 
@@ -76,18 +90,19 @@ def p_declaracion(p):
     
 def p_lista_ids(p):
     '''lista_ids : ID
-                 | ID COMA lista_ids'''
+                 | lista_ids COMA ID'''
     
     # lista_ids : ID
     # p tiene índices [0, 1]. Longitud = 2
     if len(p) == 2:
         p[0] = [p[1]]
         
-    # lista_ids : ID COMA lista_ids
+    # lista_ids : lista_ids COMA ID
     # p tiene índices [0, 1, 2, 3]. Longitud = 4
     else:
-        # Ignoramos p[2] (la coma)
-        p[0] = [p[1]] + p[3]
+        # Ignoramos p[2] (la coma); se agrega a la misma lista sin copiarla
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_tipo(p):
     '''tipo : ENTERO
@@ -96,17 +111,25 @@ def p_tipo(p):
 
 
 def p_funcs(p):
-    '''funcs : func funcs
+    '''funcs : funcs func
              | empty'''
     p[0] = []
 
 def p_func(p):
     'func : func_header LLAVEIZQ vars cuerpo LLAVEDER'
+    quadruple_manager = p.parser.context.quadruple_manager
+    memory_manager = p.parser.context.memory_manager
+    function_directory = p.parser.context.function_directory
     quadruple_manager.add_endfunc()
+    # Tamaño exacto del registro de activación de la función
+    function_directory.set_frame_size(function_directory.current_function, memory_manager.get_frame_size())
     function_directory.set_current_function('global')
 
 def p_func_header(p):
     'func_header : func_tipo ID PARIZQ params PARDER'
+    quadruple_manager = p.parser.context.quadruple_manager
+    memory_manager = p.parser.context.memory_manager
+    function_directory = p.parser.context.function_directory
     return_type = p[1]
     func_name = p[2]
     parameters = p[4]
@@ -114,6 +137,7 @@ def p_func_header(p):
     try:
         function_directory.add_function(func_name, return_type, [])
         function_directory.set_current_function(func_name)
+        memory_manager.reset_local_counters()
         
         start_quad = quadruple_manager.next_quad()
         function_directory.set_start_quad(func_name, start_quad)
@@ -140,11 +164,12 @@ def p_params(p):
 
 def p_param_list(p):
     '''param_list : param
-                  | param COMA param_list'''
+                  | param_list COMA param'''
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_param(p):
     'param : ID DOSPUNTOS tipo'
@@ -157,7 +182,7 @@ def p_cuerpo(p):
     p[0] = p[2] if len(p) == 4 else p[1]
 
 def p_estatutos(p):
-    '''estatutos : estatuto estatutos
+    '''estatutos : estatutos estatuto
                  | empty'''
     pass
 
@@ -172,6 +197,8 @@ def p_estatuto(p):
 
 def p_asigna(p):
     'asigna : ID ASIGNACION expresion PUNTOCOMA'
+    quadruple_manager = p.parser.context.quadruple_manager
+    function_directory = p.parser.context.function_directory
     var_name = p[1]
     
     if quadruple_manager.operands_stack:
@@ -181,22 +208,23 @@ def p_asigna(p):
     else:
         raise Exception("Error interno: No hay resultado para asignar.")
     
-    current_scope = function_directory.get_current_scope()
-    var_info = current_scope.get_variable(var_name)
+    var_info = function_directory.lookup(var_name)
     
     if var_info is None:
         raise Exception(f"Variable '{var_name}' no declarada")
     
-    quadruple_manager.add_quadruple('=', result_operand_address, '', var_info['address'])
+    quadruple_manager.add_quadruple('=', result_operand_address, '', var_info.address)
 
 
 def p_condicion(p):
     'condicion : SI PARIZQ expresion PARDER cuerpo seen_if_body sino PUNTOCOMA'
+    quadruple_manager = p.parser.context.quadruple_manager
     end_jump = quadruple_manager.pop_jump()
     quadruple_manager.patch(end_jump, quadruple_manager.next_quad())
 
 def p_seen_if_body(p):
     'seen_if_body : empty'
+    quadruple_manager = p.parser.context.quadruple_manager
     goto_end = quadruple_manager.add_quadruple('goto', '', '', '')
     
     false_jump = quadruple_manager.pop_jump()
@@ -211,10 +239,12 @@ def p_sino(p):
 
 def p_seen_mientras(p):
     'seen_mientras : empty'
+    quadruple_manager = p.parser.context.quadruple_manager
     quadruple_manager.push_jump(quadruple_manager.next_quad())
 
 def p_ciclo(p):
     'ciclo : MIENTRAS seen_mientras PARIZQ expresion PARDER HAZ cuerpo PUNTOCOMA'
+    quadruple_manager = p.parser.context.quadruple_manager
     return_quad = quadruple_manager.add_quadruple('goto', '', '', '')
     
     false_jump = quadruple_manager.pop_jump()
@@ -226,6 +256,8 @@ def p_ciclo(p):
 
 def p_llamada(p):
     'llamada : ID PARIZQ argumentos PARDER'
+    quadruple_manager = p.parser.context.quadruple_manager
+    function_directory = p.parser.context.function_directory
     func_name = p[1]
     arguments = p[3]
     
@@ -277,15 +309,18 @@ def p_argumentos(p):
 
 def p_expresion_lista(p):
     '''expresion_lista : expresion
-                       | expresion COMA expresion_lista'''
+                       | expresion_lista COMA expresion'''
     if len(p) == 2:
         p[0] = [1] 
     else:
-        p[0] = [1] + p[3]
+        p[1].append(1)
+        p[0] = p[1]
 
 
 def p_imprime(p):
     'imprime : ESCRIBE PARIZQ imprime_lista PARDER'
+    quadruple_manager = p.parser.context.quadruple_manager
+    memory_manager = p.parser.context.memory_manager
     valores_a_imprimir = []
     
     for elemento in reversed(p[3]):
@@ -306,11 +341,12 @@ def p_imprime(p):
 
 def p_imprime_lista(p):
     '''imprime_lista : elemento_imprimir
-                     | elemento_imprimir COMA imprime_lista'''
+                     | imprime_lista COMA elemento_imprimir'''
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_elemento_imprimir(p):
     '''elemento_imprimir : expresion
@@ -329,6 +365,7 @@ def p_expresion(p):
                  | exp DIFERENTE exp
                  | exp MAYOR_IGUAL exp
                  | exp MENOR_IGUAL exp'''
+    quadruple_manager = p.parser.context.quadruple_manager
     
     if len(p) == 2:
         p[0] = p[1]
@@ -347,6 +384,7 @@ def p_exp(p):
     '''exp : termino
            | exp MAS termino
            | exp MENOS termino'''
+    quadruple_manager = p.parser.context.quadruple_manager
     if len(p) == 2:
         p[0] = p[1]
     else:
@@ -357,6 +395,7 @@ def p_termino(p):
     '''termino : factor
                | termino MULT factor
                | termino DIV factor'''
+    quadruple_manager = p.parser.context.quadruple_manager
     if len(p) == 2:
         p[0] = p[1]
     else:
@@ -369,6 +408,8 @@ def p_factor(p):
               | ID
               | PARIZQ expresion PARDER
               | llamada'''
+    quadruple_manager = p.parser.context.quadruple_manager
+    function_directory = p.parser.context.function_directory
     if len(p) == 2:
         if isinstance(p[1], int):
             quadruple_manager.push_operand(p[1], 'entero')
@@ -376,13 +417,12 @@ def p_factor(p):
             quadruple_manager.push_operand(p[1], 'flotante')
         elif isinstance(p[1], str) and p.slice[1].type == 'ID':
             var_name = p[1]
-            current_scope = function_directory.get_current_scope()
-            var_info = current_scope.get_variable(var_name)
+            var_info = function_directory.lookup(var_name)
             
             if var_info is None:
                 raise Exception(f"Variable '{var_name}' no declarada")
             
-            quadruple_manager.push_address(var_info['address'], var_info['type'])
+            quadruple_manager.push_address(var_info.address, var_info.type)
             
         elif isinstance(p[1], tuple) and p[1][0] == 'llamada':
             pass
@@ -399,4 +439,43 @@ def p_error(p):
     else:
         print("Error de sintaxis: Fin de archivo inesperado")
 
-parser = yacc.yacc()
\ No newline at end of file
+# Tablas LALR pregeneradas que se distribuyen con el compilador. PLY
+# compara su firma con la gramática: si ya no coinciden, las reconstruye en
+# memoria. 'python patito_parser.py' las regenera tras cambiar la gramática.
+TABLE_MODULE = 'patito_parsetab'
+
+_parser = None
+
+
+def create_parser(tabmodule=TABLE_MODULE):
+    # Sin parser.out ni reescritura de tablas en cada ejecución
+    return yacc.yacc(module=sys.modules[__name__], tabmodule=tabmodule, debug=False, write_tables=False)
+
+
+def get_parser():
+    # Se construye la primera vez que se usa: importar el módulo es barato
+    global _parser
+    if _parser is None:
+        _parser = create_parser()
+        # Las acciones toman su estado de p.parser.context; el parser
+        # compartido usa los singletons de módulo (CompilerContext.parse
+        # trabaja sobre una copia con su propio contexto)
+        _parser.context = shared_context
+    return _parser
+
+
+def __getattr__(name):
+    # 'from patito_parser import parser' sigue funcionando, pero perezoso
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    table_path = os.path.join(here, f"{TABLE_MODULE}.py")
+    if os.path.exists(table_path):
+        os.remove(table_path)
+    yacc.yacc(module=sys.modules[__name__], tabmodule=TABLE_MODULE, outputdir=here,
+              debug=False, write_tables=True)
+    print(f"Tablas regeneradas en {table_path}")
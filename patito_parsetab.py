@@ -0,0 +1,99 @@
+
+# patito_parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'nonassocMENORMAYORIGUALDIFERENTEMAYOR_IGUALMENOR_IGUALleftMASMENOSleftMULTDIVASIGNACION COMA CORCHETEDER CORCHETEIZQ CTE_ENT CTE_FLOAT DIFERENTE DIV DOSPUNTOS ENTERO ESCRIBE FIN FLOTANTE HAZ ID IGUAL INICIO LETRERO LLAVEDER LLAVEIZQ MAS MAYOR MAYOR_IGUAL MENOR MENOR_IGUAL MENOS MIENTRAS MULT NULA PARDER PARIZQ PROGRAMA PUNTOCOMA SI SINO VARSprograma : PROGRAMA ID PUNTOCOMA start_goto vars funcs fill_goto_main INICIO start_main cuerpo FINstart_goto : emptyfill_goto_main : emptystart_main : emptyvars : VARS declaraciones\n            | emptydeclaraciones : declaraciones declaracion\n                     | declaraciondeclaracion : lista_ids DOSPUNTOS tipo PUNTOCOMAlista_ids : ID\n                 | lista_ids COMA IDtipo : ENTERO\n            | FLOTANTEfuncs : funcs func\n             | emptyfunc : func_header LLAVEIZQ vars cuerpo LLAVEDERfunc_header : func_tipo ID PARIZQ params PARDERfunc_tipo : NULA\n                 | tipoparams : param_list\n              | emptyparam_list : param\n                  | param_list COMA paramparam : ID DOSPUNTOS tipocuerpo : LLAVEIZQ estatutos LLAVEDER\n              | estatutosestatutos : estatutos estatuto\n                 | emptyestatuto : asigna\n                | condicion\n                | ciclo\n                | llamada PUNTOCOMA\n                | imprime PUNTOCOMAasigna : ID ASIGNACION expresion PUNTOCOMAcondicion : SI PARIZQ expresion PARDER cuerpo seen_if_body sino PUNTOCOMAseen_if_body : emptysino : SINO cuerpo\n            | emptyseen_mientras : emptyciclo : MIENTRAS seen_mientras PARIZQ expresion PARDER HAZ cuerpo PUNTOCOMAllamada : ID PARIZQ argumentos PARDERargumentos : expresion_lista\n                  | emptyexpresion_lista : expresion\n                       | expresion_lista COMA expresionimprime : ESCRIBE PARIZQ imprime_lista PARDERimprime_lista : elemento_imprimir\n                     | imprime_lista COMA elemento_imprimirelemento_imprimir : expresion\n                         | LETREROexpresion : exp\n                 | exp MENOR exp\n                 | exp MAYOR exp\n                 | exp IGUAL exp\n                 | exp DIFERENTE exp\n                 | exp MAYOR_IGUAL exp\n                 | exp MENOR_IGUAL expexp : termino\n           | exp MAS termino\n           | exp MENOS terminotermino : factor\n               | termino MULT factor\n               | termino DIV factorfactor : CTE_ENT\n              | CTE_FLOAT\n              | ID\n              | PARIZQ expresion PARDER\n              | llamadaempty :'
+    
+_lr_action_items = {'PROGRAMA':([0,],[2,]),'$end':([1,48,],[0,-1,]),'ID':([2,8,9,12,13,20,21,22,23,24,25,27,28,29,33,34,35,36,37,39,40,41,49,50,51,52,53,63,65,66,67,68,69,72,82,89,94,95,96,97,98,99,100,101,102,103,104,107,108,111,129,131,134,136,],[3,15,-6,15,-8,30,-18,-19,-12,-13,-7,32,-69,-69,-69,-4,-69,43,-9,-69,56,-28,56,-27,-29,-30,-31,43,-32,-33,75,75,75,75,75,75,-34,75,75,75,75,75,75,75,75,75,75,75,-69,75,-69,-69,-35,-40,]),'PUNTOCOMA':([3,23,24,31,40,41,50,51,52,53,54,55,64,65,66,75,76,77,78,79,80,81,83,94,106,108,110,112,113,114,115,116,117,118,119,120,121,122,124,127,128,129,130,131,132,133,134,135,136,],[4,-12,-13,37,-26,-28,-27,-29,-30,-31,65,66,-25,-32,-33,-66,94,-51,-58,-61,-64,-65,-68,-34,-41,-69,-46,-52,-53,-54,-55,-56,-57,-59,-60,-62,-63,-67,-69,-69,-36,-69,134,-69,-38,136,-35,-37,-40,]),'VARS':([4,5,6,29,],[-69,8,-2,8,]),'NULA':([4,5,6,7,9,10,11,12,13,17,25,37,60,],[-69,-69,-2,-69,-6,21,-15,-5,-8,-14,-7,-9,-16,]),'ENTERO':([4,5,6,7,9,10,11,12,13,17,25,26,37,60,61,],[-69,-69,-2,-69,-6,23,-15,-5,-8,-14,-7,23,-9,-16,23,]),'FLOTANTE':([4,5,6,7,9,10,11,12,13,17,25,26,37,60,61,],[-69,-69,-2,-69,-6,24,-15,-5,-8,-14,-7,24,-9,-16,24,]),'INICIO':([4,5,6,7,9,10,11,12,13,16,17,18,25,37,60,],[-69,-69,-2,-69,-6,-69,-15,-5,-8,28,-14,-3,-7,-9,-16,]),'LLAVEIZQ':([9,12,13,19,25,28,29,33,34,35,37,62,108,129,131,],[-6,-5,-8,29,-7,-69,-69,39,-4,39,-9,-17,39,39,39,]),'LLAVEDER':([9,12,13,25,29,35,37,39,40,41,42,49,50,51,52,53,64,65,66,94,134,136,],[-6,-5,-8,-7,-69,-69,-9,-69,-26,-28,60,64,-27,-29,-30,-31,-25,-32,-33,-34,-35,-40,]),'SI':([9,12,13,25,28,29,33,34,35,37,39,40,41,49,50,51,52,53,65,66,94,108,129,131,134,136,],[-6,-5,-8,-7,-69,-69,-69,-4,-69,-9,-69,57,-28,57,-27,-29,-30,-31,-32,-33,-34,-69,-69,-69,-35,-40,]),'MIENTRAS':([9,12,13,25,28,29,33,34,35,37,39,40,41,49,50,51,52,53,65,66,94,108,129,131,134,136,],[-6,-5,-8,-7,-69,-69,-69,-4,-69,-9,-69,58,-28,58,-27,-29,-30,-31,-32,-33,-34,-69,-69,-69,-35,-40,]),'ESCRIBE':([9,12,13,25,28,29,33,34,35,37,39,40,41,49,50,51,52,53,65,66,94,108,129,131,134,136,],[-6,-5,-8,-7,-69,-69,-69,-4,-69,-9,-69,59,-28,59,-27,-29,-30,-31,-32,-33,-34,-69,-69,-69,-35,-40,]),'DOSPUNTOS':([14,15,32,43,],[26,-10,-11,61,]),'COMA':([14,15,23,24,32,45,47,73,74,75,77,78,79,80,81,83,85,87,90,91,92,93,106,112,113,114,115,116,117,118,119,120,121,122,123,126,],[27,-10,-12,-13,-11,63,-22,-24,-23,-66,-51,-58,-61,-64,-65,-68,107,-44,111,-47,-49,-50,-41,-52,-53,-54,-55,-56,-57,-59,-60,-62,-63,-67,-45,-48,]),'PARDER':([23,24,36,44,45,46,47,68,73,74,75,77,78,79,80,81,83,84,85,86,87,88,90,91,92,93,105,106,109,112,113,114,115,116,117,118,119,120,121,122,123,126,],[-12,-13,-69,62,-20,-21,-22,-69,-24,-23,-66,-51,-58,-61,-64,-65,-68,106,-42,-43,-44,108,110,-47,-49,-50,122,-41,125,-52,-53,-54,-55,-56,-57,-59,-60,-62,-63,-67,-45,-48,]),'FIN':([28,33,34,38,40,41,50,51,52,53,64,65,66,94,134,136,],[-69,-69,-4,48,-26,-28,-27,-29,-30,-31,-25,-32,-33,-34,-35,-40,]),'PARIZQ':([30,56,57,58,59,67,68,69,70,71,72,75,82,89,95,96,97,98,99,100,101,102,103,104,107,111,],[36,68,69,-69,72,82,82,82,89,-39,82,68,82,82,82,82,82,82,82,82,82,82,82,82,82,82,]),'SINO':([40,41,50,51,52,53,64,65,66,94,108,124,127,128,134,136,],[-26,-28,-27,-29,-30,-31,-25,-32,-33,-34,-69,-69,131,-36,-35,-40,]),'ASIGNACION':([56,],[67,]),'CTE_ENT':([67,68,69,72,82,89,95,96,97,98,99,100,101,102,103,104,107,111,],[80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,]),'CTE_FLOAT':([67,68,69,72,82,89,95,96,97,98,99,100,101,102,103,104,107,111,],[81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,]),'LETRERO':([72,111,],[93,93,]),'MULT':([75,78,79,80,81,83,106,118,119,120,121,122,],[-66,103,-61,-64,-65,-68,-41,103,103,-62,-63,-67,]),'DIV':([75,78,79,80,81,83,106,118,119,120,121,122,],[-66,104,-61,-64,-65,-68,-41,104,104,-62,-63,-67,]),'MENOR':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,95,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'MAYOR':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,96,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'IGUAL':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,97,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'DIFERENTE':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,98,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'MAYOR_IGUAL':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,99,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'MENOR_IGUAL':([75,77,78,79,80,81,83,106,118,119,120,121,122,],[-66,100,-58,-61,-64,-65,-68,-41,-59,-60,-62,-63,-67,]),'MAS':([75,77,78,79,80,81,83,106,112,113,114,115,116,117,118,119,120,121,122,],[-66,101,-58,-61,-64,-65,-68,-41,101,101,101,101,101,101,-59,-60,-62,-63,-67,]),'MENOS':([75,77,78,79,80,81,83,106,112,113,114,115,116,117,118,119,120,121,122,],[-66,102,-58,-61,-64,-65,-68,-41,102,102,102,102,102,102,-59,-60,-62,-63,-67,]),'HAZ':([125,],[129,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'programa':([0,],[1,]),'start_goto':([4,],[5,]),'empty':([4,5,7,10,28,29,33,35,36,39,58,68,108,124,127,129,131,],[6,9,11,18,34,9,41,41,46,41,71,86,41,128,132,41,41,]),'vars':([5,29,],[7,35,]),'funcs':([7,],[10,]),'declaraciones':([8,],[12,]),'declaracion':([8,12,],[13,25,]),'lista_ids':([8,12,],[14,14,]),'fill_goto_main':([10,],[16,]),'func':([10,],[17,]),'func_header':([10,],[19,]),'func_tipo':([10,],[20,]),'tipo':([10,26,61,],[22,31,73,]),'start_main':([28,],[33,]),'cuerpo':([33,35,108,129,131,],[38,42,124,133,135,]),'estatutos':([33,35,39,108,129,131,],[40,40,49,40,40,40,]),'params':([36,],[44,]),'param_list':([36,],[45,]),'param':([36,63,],[47,74,]),'estatuto':([40,49,],[50,50,]),'asigna':([40,49,],[51,51,]),'condicion':([40,49,],[52,52,]),'ciclo':([40,49,],[53,53,]),'llamada':([40,49,67,68,69,72,82,89,95,96,97,98,99,100,101,102,103,104,107,111,],[54,54,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,]),'imprime':([40,49,],[55,55,]),'seen_mientras':([58,],[70,]),'expresion':([67,68,69,72,82,89,107,111,],[76,87,88,92,105,109,123,92,]),'exp':([67,68,69,72,82,89,95,96,97,98,99,100,107,111,],[77,77,77,77,77,77,112,113,114,115,116,117,77,77,]),'termino':([67,68,69,72,82,89,95,96,97,98,99,100,101,102,107,111,],[78,78,78,78,78,78,78,78,78,78,78,78,118,119,78,78,]),'factor':([67,68,69,72,82,89,95,96,97,98,99,100,101,102,103,104,107,111,],[79,79,79,79,79,79,79,79,79,79,79,79,79,79,120,121,79,79,]),'argumentos':([68,],[84,]),'expresion_lista':([68,],[85,]),'imprime_lista':([72,],[90,]),'elemento_imprimir':([72,111,],[91,126,]),'seen_if_body':([124,],[127,]),'sino':([127,],[130,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> programa","S'",1,None,None,None),
+  ('programa -> PROGRAMA ID PUNTOCOMA start_goto vars funcs fill_goto_main INICIO start_main cuerpo FIN','programa',11,'p_programa','patito_parser.py',19),
+  ('start_goto -> empty','start_goto',1,'p_start_goto','patito_parser.py',29),
+  ('fill_goto_main -> empty','fill_goto_main',1,'p_fill_goto_main','patito_parser.py',40),
+  ('start_main -> empty','start_main',1,'p_start_main','patito_parser.py',45),
+  ('vars -> VARS declaraciones','vars',2,'p_vars','patito_parser.py',53),
+  ('vars -> empty','vars',1,'p_vars','patito_parser.py',54),
+  ('declaraciones -> declaraciones declaracion','declaraciones',2,'p_declaraciones','patito_parser.py',59),
+  ('declaraciones -> declaracion','declaraciones',1,'p_declaraciones','patito_parser.py',60),
+  ('declaracion -> lista_ids DOSPUNTOS tipo PUNTOCOMA','declaracion',4,'p_declaracion','patito_parser.py',72),
+  ('lista_ids -> ID','lista_ids',1,'p_lista_ids','patito_parser.py',87),
+  ('lista_ids -> lista_ids COMA ID','lista_ids',3,'p_lista_ids','patito_parser.py',88),
+  ('tipo -> ENTERO','tipo',1,'p_tipo','patito_parser.py',103),
+  ('tipo -> FLOTANTE','tipo',1,'p_tipo','patito_parser.py',104),
+  ('funcs -> funcs func','funcs',2,'p_funcs','patito_parser.py',109),
+  ('funcs -> empty','funcs',1,'p_funcs','patito_parser.py',110),
+  ('func -> func_header LLAVEIZQ vars cuerpo LLAVEDER','func',5,'p_func','patito_parser.py',114),
+  ('func_header -> func_tipo ID PARIZQ params PARDER','func_header',5,'p_func_header','patito_parser.py',121),
+  ('func_tipo -> NULA','func_tipo',1,'p_func_tipo','patito_parser.py',145),
+  ('func_tipo -> tipo','func_tipo',1,'p_func_tipo','patito_parser.py',146),
+  ('params -> param_list','params',1,'p_params','patito_parser.py',150),
+  ('params -> empty','params',1,'p_params','patito_parser.py',151),
+  ('param_list -> param','param_list',1,'p_param_list','patito_parser.py',155),
+  ('param_list -> param_list COMA param','param_list',3,'p_param_list','patito_parser.py',156),
+  ('param -> ID DOSPUNTOS tipo','param',3,'p_param','patito_parser.py',164),
+  ('cuerpo -> LLAVEIZQ estatutos LLAVEDER','cuerpo',3,'p_cuerpo','patito_parser.py',169),
+  ('cuerpo -> estatutos','cuerpo',1,'p_cuerpo','patito_parser.py',170),
+  ('estatutos -> estatutos estatuto','estatutos',2,'p_estatutos','patito_parser.py',174),
+  ('estatutos -> empty','estatutos',1,'p_estatutos','patito_parser.py',175),
+  ('estatuto -> asigna','estatuto',1,'p_estatuto','patito_parser.py',179),
+  ('estatuto -> condicion','estatuto',1,'p_estatuto','patito_parser.py',180),
+  ('estatuto -> ciclo','estatuto',1,'p_estatuto','patito_parser.py',181),
+  ('estatuto -> llamada PUNTOCOMA','estatuto',2,'p_estatuto','patito_parser.py',182),
+  ('estatuto -> imprime PUNTOCOMA','estatuto',2,'p_estatuto','patito_parser.py',183),
+  ('asigna -> ID ASIGNACION expresion PUNTOCOMA','asigna',4,'p_asigna','patito_parser.py',188),
+  ('condicion -> SI PARIZQ expresion PARDER cuerpo seen_if_body sino PUNTOCOMA','condicion',8,'p_condicion','patito_parser.py',208),
+  ('seen_if_body -> empty','seen_if_body',1,'p_seen_if_body','patito_parser.py',213),
+  ('sino -> SINO cuerpo','sino',2,'p_sino','patito_parser.py',222),
+  ('sino -> empty','sino',1,'p_sino','patito_parser.py',223),
+  ('seen_mientras -> empty','seen_mientras',1,'p_seen_mientras','patito_parser.py',227),
+  ('ciclo -> MIENTRAS seen_mientras PARIZQ expresion PARDER HAZ cuerpo PUNTOCOMA','ciclo',8,'p_ciclo','patito_parser.py',231),
+  ('llamada -> ID PARIZQ argumentos PARDER','llamada',4,'p_llamada','patito_parser.py',242),
+  ('argumentos -> expresion_lista','argumentos',1,'p_argumentos','patito_parser.py',288),
+  ('argumentos -> empty','argumentos',1,'p_argumentos','patito_parser.py',289),
+  ('expresion_lista -> expresion','expresion_lista',1,'p_expresion_lista','patito_parser.py',293),
+  ('expresion_lista -> expresion_lista COMA expresion','expresion_lista',3,'p_expresion_lista','patito_parser.py',294),
+  ('imprime -> ESCRIBE PARIZQ imprime_lista PARDER','imprime',4,'p_imprime','patito_parser.py',303),
+  ('imprime_lista -> elemento_imprimir','imprime_lista',1,'p_imprime_lista','patito_parser.py',323),
+  ('imprime_lista -> imprime_lista COMA elemento_imprimir','imprime_lista',3,'p_imprime_lista','patito_parser.py',324),
+  ('elemento_imprimir -> expresion','elemento_imprimir',1,'p_elemento_imprimir','patito_parser.py',332),
+  ('elemento_imprimir -> LETRERO','elemento_imprimir',1,'p_elemento_imprimir','patito_parser.py',333),
+  ('expresion -> exp','expresion',1,'p_expresion','patito_parser.py',341),
+  ('expresion -> exp MENOR exp','expresion',3,'p_expresion','patito_parser.py',342),
+  ('expresion -> exp MAYOR exp','expresion',3,'p_expresion','patito_parser.py',343),
+  ('expresion -> exp IGUAL exp','expresion',3,'p_expresion','patito_parser.py',344),
+  ('expresion -> exp DIFERENTE exp','expresion',3,'p_expresion','patito_parser.py',345),
+  ('expresion -> exp MAYOR_IGUAL exp','expresion',3,'p_expresion','patito_parser.py',346),
+  ('expresion -> exp MENOR_IGUAL exp','expresion',3,'p_expresion','patito_parser.py',347),
+  ('exp -> termino','exp',1,'p_exp','patito_parser.py',363),
+  ('exp -> exp MAS termino','exp',3,'p_exp','patito_parser.py',364),
+  ('exp -> exp MENOS termino','exp',3,'p_exp','patito_parser.py',365),
+  ('termino -> factor','termino',1,'p_termino','patito_parser.py',373),
+  ('termino -> termino MULT factor','termino',3,'p_termino','patito_parser.py',374),
+  ('termino -> termino DIV factor','termino',3,'p_termino','patito_parser.py',375),
+  ('factor -> CTE_ENT','factor',1,'p_factor','patito_parser.py',383),
+  ('factor -> CTE_FLOAT','factor',1,'p_factor','patito_parser.py',384),
+  ('factor -> ID','factor',1,'p_factor','patito_parser.py',385),
+  ('factor -> PARIZQ expresion PARDER','factor',3,'p_factor','patito_parser.py',386),
+  ('factor -> llamada','factor',1,'p_factor','patito_parser.py',387),
+  ('empty -> <empty>','empty',0,'p_empty','patito_parser.py',409),
+]
@@ -0,0 +1,196 @@
+from quadruples import Quadruple
+from virtual_machine import parse_constant
+from optimizer import (
+    BINARY_OPERATORS, JUMP_OPERATORS, count_reads, function_ranges, is_constant, is_temp,
+    jump_targets, written_address,
+)
+
+# Registro de reglas: (nombre, tamaño de la ventana, función). Una regla
+# recibe la ventana de cuádruplos y el optimizador; regresa None si no
+# aplica, o los cuádruplos que reemplazan a la ventana (lista vacía para
+# borrarla). Los saltos de la regla usan los índices de antes de la pasada.
+RULES = []
+# Pasadas máximas antes de rendirse con el punto fijo
+MAX_PASSES = 20
+
+
+def peephole_rule(window=1, name=None):
+    # Decorador: otro módulo puede registrar reglas sólo con importarse
+    def register(function):
+        RULES.append((name or function.__name__, window, function))
+        return function
+    return register
+
+
+class PeepholeOptimizer:
+    # Ventana deslizante sobre los cuádruplos: en cada posición aplica la
+    # primera regla que coincide y sigue después de la ventana. Repite hasta
+    # que ninguna regla cambia nada y reajusta los saltos en cada pasada.
+    def __init__(self, quadruples, function_directory, rules=None):
+        self.quadruples = quadruples
+        self.function_directory = function_directory
+        self.rules = RULES if rules is None else rules
+        self.memory = function_directory.memory_manager
+        self.values = {address: parse_constant(key) for key, address in self.memory.constants_table.items()}
+        self.stats = {name: 0 for name, _, _ in self.rules}
+        self.passes = 0
+        self.index = 0
+        self.owners = []
+        self.read_counts = {}
+
+    def value(self, address):
+        # Valor de una constante numérica; None si la dirección no lo es
+        if is_constant(address):
+            return self.values.get(address)
+        return None
+
+    def reads(self, address):
+        # Lecturas de la dirección en la función del cuádruplo actual. Se
+        # cuentan al inicio de la pasada, así que sólo pueden sobrar
+        return self.read_counts.get((self.owners[self.index], address), 0)
+
+    def run(self):
+        while self.passes < MAX_PASSES:
+            self.passes += 1
+            if not self.sweep():
+                break
+        return sum(self.stats.values())
+
+    def sweep(self):
+        quads = self.quadruples
+        functions = self.function_directory.functions
+        self.owners = function_ranges(quads, self.function_directory)
+        self.read_counts = count_reads(quads, self.owners)
+        leaders = jump_targets(quads)
+        leaders.update(info['start_quad'] for info in functions.values() if info['start_quad'] is not None)
+
+        result = []
+        new_index = [0] * (len(quads) + 1)
+        fired = 0
+        i = 0
+        while i < len(quads):
+            self.index = i
+            replacement = None
+            for name, window, function in self.rules:
+                # La ventana no puede empezar un bloque básico a la mitad
+                if i + window > len(quads) or any(j in leaders for j in range(i + 1, i + window)):
+                    continue
+                replacement = function(quads[i:i + window], self)
+                if replacement is not None:
+                    self.stats[name] += 1
+                    break
+
+            if replacement is None:
+                new_index[i] = len(result)
+                result.append(quads[i])
+                i += 1
+                continue
+            for j in range(i, i + window):
+                new_index[j] = len(result)
+            result.extend(replacement)
+            fired += 1
+            i += window
+
+        if not fired:
+            return False
+        new_index[len(quads)] = len(result)
+        for quad in result:
+            if quad.operator in JUMP_OPERATORS:
+                quad.result = new_index[int(quad.result)]
+        for info in functions.values():
+            if info['start_quad'] is not None:
+                info['start_quad'] = new_index[info['start_quad']]
+        for quad in result:
+            if quad.operator == 'GOSUB':
+                quad.result = functions[quad.left_operand]['start_quad']
+        quads[:] = result
+        return True
+
+    def report(self):
+        lines = [f"Peephole: {sum(self.stats.values())} reescrituras en {self.passes} pasadas"]
+        for name, count in self.stats.items():
+            if count:
+                lines.append(f"  {name}: {count}")
+        return '\n'.join(lines)
+
+
+# --- Reglas ---------------------------------------------------------------
+
+@peephole_rule()
+def add_zero(window, peephole):
+    # x + 0, 0 + x, x - 0 -> = x (sólo enteros: -0.0 + 0 da 0.0)
+    quad = window[0]
+    if quad.operator == '+' and peephole.value(quad.left_operand) == 0:
+        operand = quad.right_operand
+    elif quad.operator in ('+', '-') and peephole.value(quad.right_operand) == 0:
+        operand = quad.left_operand
+    else:
+        return None
+    if peephole.memory.get_address_type(operand) != 'entero':
+        return None
+    return [Quadruple('=', operand, '', quad.result)]
+
+
+@peephole_rule()
+def multiply_one(window, peephole):
+    # x * 1, 1 * x, x / 1 -> = x; el '=' hace la misma conversión de tipo.
+    # x / 1 sólo con x flotante: la VM divide con '/' y 5 / 1 imprime 5.0
+    quad = window[0]
+    if quad.operator == '*' and peephole.value(quad.left_operand) == 1:
+        operand = quad.right_operand
+    elif quad.operator == '*' and peephole.value(quad.right_operand) == 1:
+        operand = quad.left_operand
+    elif quad.operator == '/' and peephole.value(quad.right_operand) == 1 \
+            and peephole.memory.get_address_type(quad.left_operand) == 'flotante':
+        operand = quad.left_operand
+    else:
+        return None
+    return [Quadruple('=', operand, '', quad.result)]
+
+
+@peephole_rule()
+def self_assign(window, peephole):
+    quad = window[0]
+    if quad.operator == '=' and quad.left_operand == quad.result:
+        return []
+    return None
+
+
+@peephole_rule()
+def jump_to_next(window, peephole):
+    quad = window[0]
+    if quad.operator in JUMP_OPERATORS and int(quad.result) == peephole.index + 1:
+        return []
+    return None
+
+
+@peephole_rule()
+def unused_temp(window, peephole):
+    # Una división se conserva: puede fallar por división entre cero
+    quad = window[0]
+    if quad.operator != '/' and is_temp(written_address(quad)) and not peephole.reads(quad.result):
+        return []
+    return None
+
+
+@peephole_rule(window=2)
+def copy_chain(window, peephole):
+    # t = <expr>; x = t  ->  x = <expr>, si nadie más lee t y la copia no
+    # convierte el valor (o convierte igual que la primera asignación)
+    first, copy = window
+    temp = first.result
+    if copy.operator != '=' or copy.left_operand != temp or not is_temp(temp) \
+            or not (first.operator in BINARY_OPERATORS or first.operator == '=') \
+            or peephole.reads(temp) != 1:
+        return None
+    temp_type = peephole.memory.get_address_type(temp)
+    same_type = temp_type == peephole.memory.get_address_type(copy.result)
+    if not same_type and not (first.operator == '=' and peephole.memory.get_address_type(first.left_operand) == temp_type):
+        return None
+    return [Quadruple(first.operator, first.left_operand, first.right_operand, copy.result)]
+
+
+def optimize_peephole(quadruples, function_directory, rules=None):
+    optimizer = PeepholeOptimizer(quadruples, function_directory, rules)
+    optimizer.run()
+    return optimizer
@@ -0,0 +1,128 @@
+import time
+
+from virtual_machine import OPERATORS, OPCODES
+
+OP_GOSUB = OPCODES['GOSUB']
+OP_ENDFUNC = OPCODES['ENDFUNC']
+
+
+class VMProfiler:
+    # Ejecuta una VM ya decodificada con su propio ciclo instrumentado;
+    # VirtualMachine.run no cambia, así que sin perfilador no hay costo extra
+    def __init__(self, vm):
+        self.vm = vm
+        self.quad_hits = [0] * len(vm.code)
+        self.opcode_counts = {}
+        # nombre -> {'start_quad', 'calls', 'inclusive', 'exclusive'}
+        self.functions = {}
+        # pila colapsada 'main;f;g' -> segundos exclusivos
+        self.collapsed = {}
+        self.max_depth = 0
+        self.instructions = 0
+        self.elapsed = 0.0
+
+    def function_stats(self, name, start_quad):
+        if name not in self.functions:
+            self.functions[name] = {'start_quad': start_quad, 'calls': 0, 'inclusive': 0.0, 'exclusive': 0.0}
+        return self.functions[name]
+
+    def run(self):
+        vm = self.vm
+        code = vm.code
+        opcodes = vm.opcodes
+        records = vm.records
+        hits = self.quad_hits
+        clock = time.perf_counter
+        end = len(code)
+
+        # Cada frame: [nombre, inicio, tiempo de hijos, ruta]
+        main_stats = self.function_stats('main', None)
+        main_stats['calls'] = 1
+        start = clock()
+        stack = [['main', start, 0.0, 'main']]
+        active = {'main': 1}
+
+        ip = vm.instruction_pointer
+        try:
+            while ip < end:
+                hits[ip] += 1
+                opcode = opcodes[ip]
+                if opcode == OP_GOSUB:
+                    name = records[ip][1]
+                    stats = self.function_stats(name, int(records[ip][3]))
+                    stats['calls'] += 1
+                    active[name] = active.get(name, 0) + 1
+                    stack.append([name, clock(), 0.0, f"{stack[-1][3]};{name}"])
+                    if len(stack) - 1 > self.max_depth:
+                        self.max_depth = len(stack) - 1
+                    next_ip = code[ip]()
+                    # Un acierto del memo regresa sin entrar a la función
+                    if next_ip == ip + 1:
+                        self.close_frame(stack, active, clock())
+                    ip = next_ip
+                    continue
+                if opcode == OP_ENDFUNC and len(stack) > 1:
+                    self.close_frame(stack, active, clock())
+                ip = code[ip]()
+        finally:
+            vm.instruction_pointer = ip
+            now = clock()
+            while stack:
+                self.close_frame(stack, active, now)
+            self.elapsed = now - start
+            self.instructions = sum(hits)
+            for i, count in enumerate(hits):
+                if count:
+                    operator = OPERATORS[opcodes[i]]
+                    self.opcode_counts[operator] = self.opcode_counts.get(operator, 0) + count
+
+    def close_frame(self, stack, active, now):
+        name, started, children, path = stack.pop()
+        inclusive = now - started
+        exclusive = inclusive - children
+        stats = self.functions[name]
+        stats['exclusive'] += exclusive
+        active[name] -= 1
+        # En recursión sólo la llamada más externa suma tiempo inclusivo
+        if active[name] == 0:
+            stats['inclusive'] += inclusive
+        if stack:
+            stack[-1][2] += inclusive
+        self.collapsed[path] = self.collapsed.get(path, 0.0) + exclusive
+
+    def report(self, top=10):
+        lines = ["\n=== PERFIL DE EJECUCIÓN ==="]
+        rate = self.instructions / self.elapsed if self.elapsed > 0 else 0.0
+        lines.append(f"Instrucciones: {self.instructions} | Tiempo: {self.elapsed * 1000:.2f} ms | "
+                     f"Instr/segundo: {rate:,.0f} | Profundidad máxima: {self.max_depth}")
+
+        lines.append(f"\n{'Opcode':<10} {'Ejecuciones':>12} {'%':>7}")
+        for operator, count in sorted(self.opcode_counts.items(), key=lambda item: -item[1]):
+            lines.append(f"{operator:<10} {count:>12} {count * 100 / max(self.instructions, 1):>6.1f}%")
+
+        lines.append(f"\n{'Función':<20} {'Quad':>6} {'Llamadas':>10} {'Incl. ms':>10} {'Excl. ms':>10}")
+        for name, stats in sorted(self.functions.items(), key=lambda item: -item[1]['exclusive']):
+            start_quad = '' if stats['start_quad'] is None else stats['start_quad']
+            lines.append(f"{name:<20} {start_quad:>6} {stats['calls']:>10} "
+                         f"{stats['inclusive'] * 1000:>10.2f} {stats['exclusive'] * 1000:>10.2f}")
+
+        memo_stats = self.vm.memo_stats()
+        if memo_stats:
+            lines.append(f"\n{'Memo':<20} {'Aciertos':>10} {'Fallos':>10} {'Desalojos':>10} {'Entradas':>10}")
+            for name, stats in memo_stats.items():
+                lines.append(f"{name:<20} {stats['hits']:>10} {stats['misses']:>10} "
+                             f"{stats['evictions']:>10} {stats['entries']:>10}")
+
+        lines.append(f"\nCuádruplos más ejecutados (top {top}):")
+        hot = sorted(range(len(self.quad_hits)), key=lambda i: -self.quad_hits[i])[:top]
+        for ip in hot:
+            if not self.quad_hits[ip]:
+                break
+            opcode, left, right, res = self.vm.records[ip]
+            lines.append(f"  {ip:<5} {self.quad_hits[ip]:>10}  ({OPERATORS[opcode]}, {left}, {right}, {res})")
+        return '\n'.join(lines)
+
+    def collapsed_stacks(self):
+        # Formato "pila;colapsada peso" de flamegraph.pl / speedscope, en microsegundos
+        return '\n'.join(f"{path} {max(int(seconds * 1e6), 0)}"
+                         for path, seconds in sorted(self.collapsed.items())) + '\n'
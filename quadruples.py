@@ -16,7 +16,9 @@ class Quadruple:
         return self.__str__()
 
 class QuadrupleManager:
-    def __init__(self):
+    # 'memory' es el MemoryManager de la compilación; sin él, el del módulo
+    def __init__(self, memory=None):
+        self.memory_manager = memory or memory_manager
         self.quadruples = []
         self.operators_stack = []
         self.operands_stack = []
@@ -24,18 +26,20 @@ class QuadrupleManager:
         self.jump_stack = []
         self.temp_counter = 0
         self.goto_main_index = None
+        # Saltos emitidos sin destino; complete_patching sólo revisa éstos
+        self.pending_jumps = []
 
     def next_quad(self):
         return len(self.quadruples)
     
     def new_temp(self, temp_type='entero'):
         self.temp_counter += 1
-        return memory_manager.get_temp_address(temp_type)
+        return self.memory_manager.get_temp_address(temp_type)
     
     def push_operand(self, operand, type_):
         if isinstance(operand, int) or isinstance(operand, float):
             const_type = 'entero' if isinstance(operand, int) else 'flotante'
-            address = memory_manager.get_constant_address(operand, const_type)
+            address = self.memory_manager.get_constant_address(operand, const_type)
             self.push_address(address, const_type)
         else:
             raise Exception(f"Error: push_operand recibió '{operand}'. Usa push_address para variables.")
@@ -74,6 +78,8 @@ class QuadrupleManager:
     def add_quadruple(self, operator, left_operand, right_operand, result):
         quad = Quadruple(operator, left_operand, right_operand, result)
         self.quadruples.append(quad)
+        if result == '' and operator in ('goto', 'gotof'):
+            self.pending_jumps.append(quad)
         return len(self.quadruples) - 1
 
     def add_era(self, func_name):
@@ -102,9 +108,10 @@ class QuadrupleManager:
         return self.jump_stack.pop() if self.jump_stack else None
     
     def complete_patching(self):
-        for i, quad in enumerate(self.quadruples):
-            if quad.operator in ['goto', 'gotof'] and quad.result == '':
+        for quad in self.pending_jumps:
+            if quad.result == '':
                 quad.result = str(len(self.quadruples))
+        self.pending_jumps.clear()
     
     def print_quadruples(self):
         print("\n=== CUÁDRUPLOS (Direcciones Reales) ===")
@@ -120,5 +127,6 @@ class QuadrupleManager:
         self.jump_stack.clear()
         self.temp_counter = 0
         self.goto_main_index = None
+        self.pending_jumps.clear()
 
 quadruple_manager = QuadrupleManager()
\ No newline at end of file
@@ -0,0 +1,199 @@
+import mmap
+import re
+import sys
+
+from ply.lex import LexToken
+
+import patito_lexer
+from patito_lexer import reserved
+
+# Conversión del texto de cada token, igual que las funciones t_ de patito_lexer
+CONVERSIONS = {
+    'CTE_FLOAT': float,
+    'CTE_ENT': int,
+    'LETRERO': lambda text: text[1:-1],
+}
+
+
+def lexer_rules(module=patito_lexer):
+    # Mismo orden que PLY: funciones en el orden del archivo y después las
+    # cadenas de la más larga a la más corta
+    functions = []
+    strings = []
+    for name, value in vars(module).items():
+        if not name.startswith('t_') or name in ('t_error', 't_ignore'):
+            continue
+        if callable(value):
+            functions.append((value.__code__.co_firstlineno, name[2:], value.__doc__))
+        else:
+            strings.append((name[2:], value))
+    functions.sort()
+    strings.sort(key=lambda rule: -len(rule[1]))
+    return [(name, pattern) for _, name, pattern in functions] + strings
+
+
+def literal_text(pattern):
+    # Texto que reconoce un patrón sin metacaracteres (r'\{' -> '{'); None si no es literal
+    if re.search(r'[\\.^$*+?{}\[\]|()]', re.sub(r'\\\W', '', pattern)):
+        return None
+    return re.sub(r'\\(\W)', r'\1', pattern)
+
+
+def master_pattern(module=patito_lexer):
+    # Una sola expresión con un grupo por regla. Las reglas literales
+    # consecutivas comparten un grupo (el orden dentro de él se conserva,
+    # así que reconoce lo mismo) y su tipo sale de LITERALS. Los espacios
+    # ignorados se consumen antes de cada token; cualquier otro byte cae en
+    # 'error' y '\Z' absorbe los espacios del final.
+    literals = {}
+    groups = []
+    run = []
+    for name, pattern in lexer_rules(module) + [(None, None)]:
+        text = literal_text(pattern) if pattern else None
+        if text is not None:
+            literals[text.encode('utf-8')] = (name, text)
+            run.append(pattern)
+            continue
+        if run:
+            groups.append(f'(?P<literal{len(groups)}>{"|".join(run)})')
+            run = []
+        if name:
+            groups.append(f'(?P<{name}>{pattern})')
+    groups.append('(?P<error>(?s:.))')
+    groups.append('(?P<ignore>\\Z)')
+    ignore = re.escape(module.t_ignore)
+    master = f'[{ignore}]*(?:' + '|'.join(groups) + ')'
+    return re.compile(master.encode('utf-8')), literals
+
+
+MASTER, LITERALS = master_pattern()
+LITERAL_GROUPS = {name for name in MASTER.groupindex if name.startswith('literal')}
+
+
+def illegal_character(buffer, position):
+    # El carácter completo (UTF-8) que empieza en 'position'
+    lead = buffer[position]
+    size = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    return bytes(buffer[position:position + size]).decode('utf-8', 'replace')
+
+
+class StreamLexer:
+    # Sustituto de patito_lexer.lexer para parser.parse: recorre bytes (o
+    # un archivo mapeado en memoria) con la expresión maestra y entrega
+    # LexToken con el mismo tipo, valor y línea que PLY. lexpos es el
+    # desplazamiento en bytes, no en caracteres.
+    def __init__(self):
+        self.buffer = b''
+        self.lineno = 1
+        self.lexpos = 0
+        self.file = None
+        self.mapping = None
+        self.stream = iter(())
+
+    @classmethod
+    def from_file(cls, path):
+        lexer = cls()
+        lexer.open(path)
+        return lexer
+
+    def open(self, path):
+        # El archivo no se lee: el regex corre directo sobre el mmap
+        self.close()
+        self.file = open(path, 'rb')
+        if self.file.seek(0, 2) == 0:
+            self.input(b'')
+        else:
+            self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.input(self.mapping)
+        return self
+
+    def close(self):
+        # El recorrido a medias (un error semántico corta el análisis)
+        # conserva el finditer sobre el mmap, que no se puede cerrar mientras tanto
+        if hasattr(self.stream, 'close'):
+            self.stream.close()
+        self.stream = iter(())
+        self.buffer = b''
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def input(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.buffer = data
+        self.lexpos = 0
+        self.stream = self.scan()
+
+    def scan(self):
+        buffer = self.buffer
+        literals = LITERALS
+        literal_groups = LITERAL_GROUPS
+        conversions = CONVERSIONS
+        # Identificadores ya vistos: bytes -> (tipo, nombre)
+        names = {}
+        for match in MASTER.finditer(buffer):
+            kind = match.lastgroup
+            start, position = match.span(kind)
+            if kind in literal_groups:
+                token_type, value = literals[match.group(kind)]
+            elif kind == 'ID':
+                raw = match.group(kind)
+                entry = names.get(raw)
+                if entry is None:
+                    text = sys.intern(raw.decode('utf-8'))
+                    entry = names[raw] = (reserved.get(text, 'ID'), text)
+                token_type, value = entry
+            elif kind in conversions:
+                token_type = kind
+                value = conversions[kind](match.group(kind).decode('utf-8'))
+            elif kind == 'newline':
+                self.lineno += position - start
+                continue
+            elif kind == 'error':
+                # Los bytes de continuación de UTF-8 ya se reportaron con su carácter
+                if not 0x80 <= buffer[start] < 0xC0:
+                    print(f"Carácter ilegal '{illegal_character(buffer, start)}' en línea {self.lineno}")
+                continue
+            else:
+                # 'COMMENT' y los espacios al final del archivo
+                continue
+            token = LexToken()
+            token.type = token_type
+            token.value = value
+            token.lineno = self.lineno
+            token.lexpos = start
+            self.lexpos = position
+            yield token
+
+    def token(self):
+        return next(self.stream, None)
+
+    def __iter__(self):
+        return self.stream
+
+
+def tokenize_file(path):
+    # (tipo, valor, línea) de cada token del archivo
+    lexer = StreamLexer.from_file(path)
+    try:
+        return [(token.type, token.value, token.lineno) for token in lexer]
+    finally:
+        lexer.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python stream_lexer.py programa.txt")
+    else:
+        for token_type, value, lineno in tokenize_file(sys.argv[1]):
+            print(f"Línea {lineno}: {token_type} -> {value}")
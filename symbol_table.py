@@ -1,38 +1,94 @@
+import sys
+
 from memory_manager import memory_manager
 
+
+class Record:
+    # Registro con __slots__ (sin __dict__ por instancia); info['campo'] y
+    # info.get('campo') siguen funcionando para el código que lo usa como dict
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class Variable(Record):
+    __slots__ = ('type', 'address', 'scope')
+
+    def __init__(self, var_type, address, scope):
+        self.type = var_type
+        self.address = address
+        self.scope = scope
+
+
+class Function(Record):
+    __slots__ = ('return_type', 'parameters', 'local_scope', 'start_quad', 'frame_size', 'memo_address')
+
+    def __init__(self, return_type, parameters, local_scope):
+        self.return_type = return_type
+        self.parameters = parameters
+        self.local_scope = local_scope
+        self.start_quad = None
+        self.frame_size = None
+        self.memo_address = None
+
+
 class VariableTable:
-    def __init__(self, parent_scope=None):
+    def __init__(self, parent_scope=None, memory=None):
         self.variables = {}
         self.parent_scope = parent_scope
+        self.memory_manager = memory or memory_manager
+        # Nombres visibles del directorio mientras este ámbito está activo
+        self.visible = None
     
     def add_variable(self, name, var_type, scope='global'):
         if name in self.variables:
             raise Exception(f"Variable '{name}' ya declarada en este ámbito")
         
         if scope == 'global':
-            address = memory_manager.get_global_address(var_type)
+            address = self.memory_manager.get_global_address(var_type)
         else:
-            address = memory_manager.get_local_address(var_type)
+            address = self.memory_manager.get_local_address(var_type)
         
-        self.variables[name] = {
-            'type': var_type,
-            'address': address,
-            'scope': scope
-        }
+        name = sys.intern(name)
+        variable = self.variables[name] = Variable(var_type, address, scope)
+        if self.visible is not None:
+            # Una global nueva no tapa a la local del mismo nombre
+            if self.parent_scope is None:
+                self.visible.setdefault(name, variable)
+            else:
+                self.visible[name] = variable
         return address
     
     def get_variable(self, name):
-        if name in self.variables:
-            return self.variables[name]
-        elif self.parent_scope:
-            return self.parent_scope.get_variable(name)
+        scope = self
+        while scope is not None:
+            variable = scope.variables.get(name)
+            if variable is not None:
+                return variable
+            scope = scope.parent_scope
         return None
 
 class FunctionDirectory:
-    def __init__(self):
+    # 'memory' es el MemoryManager de la compilación; sin él, el del módulo
+    def __init__(self, memory=None):
+        self.memory_manager = memory or memory_manager
+        self.reset()
+    
+    def reset(self):
         self.functions = {}
         self.current_function = 'global'
-        self.global_scope = VariableTable()
+        # Resolución ya hecha local-luego-global del ámbito actual: las
+        # locales de la función activa encima de las globales
+        self.visible = {}
+        self.global_scope = VariableTable(memory=self.memory_manager)
+        self.global_scope.visible = self.visible
         self.add_function('global', 'nula', [])
     
     def add_function(self, name, return_type, parameters):
@@ -42,14 +98,9 @@ class FunctionDirectory:
         if name == 'global':
             local_scope = self.global_scope
         else:
-            local_scope = VariableTable(self.global_scope)
+            local_scope = VariableTable(self.global_scope, self.memory_manager)
         
-        self.functions[name] = {
-            'return_type': return_type,
-            'parameters': parameters,
-            'local_scope': local_scope,
-            'start_quad': None
-        }
+        self.functions[sys.intern(name)] = Function(return_type, parameters, local_scope)
         
         if return_type != 'nula':
             try:
@@ -68,8 +119,26 @@ class FunctionDirectory:
     def set_current_function(self, name):
         if name not in self.functions and name != 'global':
             raise Exception(f"Función '{name}' no declarada")
+        previous = self.functions[self.current_function].local_scope
+        if previous is not self.global_scope:
+            # Se quitan las locales y reaparecen las globales que tapaban
+            previous.visible = None
+            global_variables = self.global_scope.variables
+            for var_name in previous.variables:
+                if var_name in global_variables:
+                    self.visible[var_name] = global_variables[var_name]
+                else:
+                    del self.visible[var_name]
+        current = self.functions[name].local_scope
+        if current is not self.global_scope:
+            self.visible.update(current.variables)
+            current.visible = self.visible
         self.current_function = name
     
+    def lookup(self, name):
+        # Un solo acceso al diccionario por referencia a un ID
+        return self.visible.get(name)
+    
     def get_current_scope_info(self):
         current_func = self.current_function
         scope = self.functions[current_func]['local_scope']
@@ -93,6 +162,11 @@ class FunctionDirectory:
             raise Exception(f"Función '{func_name}' no encontrada")
         self.functions[func_name]['start_quad'] = quad_index
     
+    def set_frame_size(self, func_name, frame_size):
+        if func_name not in self.functions:
+            raise Exception(f"Función '{func_name}' no encontrada")
+        self.functions[func_name]['frame_size'] = frame_size
+    
     def validate_call(self, func_name, arguments):
         if not self.function_exists(func_name):
             raise Exception(f"Función '{func_name}' no declarada")
@@ -111,6 +185,9 @@ class FunctionDirectory:
         print("\n=== DIRECTORIO DE FUNCIONES ===")
         for name, info in self.functions.items():
             print(f"Función: {name} | Return: {info['return_type']} | Start Quad: {info['start_quad']}")
+            if info['frame_size']:
+                sizes = ', '.join(f"{kind}={count}" for kind, count in info['frame_size'].items())
+                print(f"  Frame: {sizes}")
             print("  Variables:")
             for var_name, var_info in info['local_scope'].variables.items():
                 print(f"    {var_name}: {var_info['type']} (Addr: {var_info['address']})")
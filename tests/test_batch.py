@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FACTORIAL = os.path.join(ROOT, 'pruebas', 'factorial.txt')
+
+
+def python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+
+@pytest.mark.parametrize('modo', [[], ['--nativo']], ids=['vm', 'nativo'])
+def test_lote_mezcla_fuentes_y_binarios(tmp_path, modo):
+    # Un directorio con el mismo programa como .txt y como .pbin: los dos
+    # deben correr bien e imprimir lo mismo, también con --nativo
+    shutil.copy(FACTORIAL, tmp_path / 'factorial.txt')
+    python('main.py', f"--guardar={tmp_path / 'factorial.pbin'}", FACTORIAL)
+    reporte = tmp_path / 'reporte.json'
+    resultado = python('batch.py', str(tmp_path), '--trabajadores=1', f'--json={reporte}', *modo)
+    assert resultado.returncode == 0, resultado.stdout
+    results = json.loads(reporte.read_text())['results']
+    assert [os.path.basename(r['path']) for r in results] == ['factorial.pbin', 'factorial.txt']
+    assert all(r['status'] == 'ok' for r in results), results
+    assert results[0]['stdout'] == results[1]['stdout'] != ''
+
+
+CICLO = '''programa Ciclo;
+vars
+    i : entero;
+
+inicio
+    i = 0;
+    mientras (i >= 0) haz {
+        i = i + 1;
+    };
+fin
+'''
+
+
+@pytest.mark.parametrize('modo', [[], ['--nativo']], ids=['vm', 'nativo'])
+def test_lote_reemplaza_trabajador_tras_limite(tmp_path, modo):
+    # El programa que excede el límite se lleva a su trabajador; los
+    # siguientes corren en uno nuevo
+    (tmp_path / 'a_ciclo.txt').write_text(CICLO)
+    shutil.copy(FACTORIAL, tmp_path / 'b_factorial.txt')
+    reporte = tmp_path / 'reporte.json'
+    python('batch.py', str(tmp_path), '--trabajadores=1', '--limite=0.5', f'--json={reporte}', *modo)
+    report = json.loads(reporte.read_text())
+    ciclo, factorial = report['results']
+    assert (ciclo['status'], factorial['status']) == ('timeout', 'ok')
+    assert ciclo['worker'] != factorial['worker']
+    assert report['recycled_workers'] == 1
+
+
+def test_lote_no_se_cuelga_si_muere_un_trabajador(tmp_path):
+    # Un módulo de reglas que mata al trabajador al importarse: cada
+    # programa queda como error y el lote termina en lugar de esperar
+    (tmp_path / 'reglas_mortales.py').write_text('import os\nos._exit(3)\n')
+    shutil.copy(FACTORIAL, tmp_path / 'a.txt')
+    shutil.copy(FACTORIAL, tmp_path / 'b.txt')
+    reporte = tmp_path / 'reporte.json'
+    resultado = subprocess.run([sys.executable, 'batch.py', str(tmp_path), '--trabajadores=1', '-O1',
+                                '--reglas=reglas_mortales', f'--json={reporte}'],
+                               cwd=ROOT, capture_output=True, text=True, timeout=60,
+                               env={**os.environ, 'PYTHONPATH': str(tmp_path)})
+    assert resultado.returncode == 1
+    results = json.loads(reporte.read_text())['results']
+    assert [r['status'] for r in results] == ['error', 'error']
+    assert all('código 3' in r['error'] for r in results)
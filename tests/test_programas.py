@@ -0,0 +1,376 @@
+import glob
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRUEBAS = sorted(glob.glob(os.path.join(ROOT, 'pruebas', '*.txt')))
+
+# Modos que deben imprimir exactamente lo mismo que -O0
+MODOS = [['-O1'], ['-O2'], ['--nativo'], ['-O2', '--nativo'], ['--memo'], ['--sin-memo'], ['--flujo']]
+
+
+def ejecuta(*args):
+    # Lo que imprime el programa (sin los mensajes del compilador ni el marco de la VM)
+    stdout = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), *args], cwd=ROOT,
+                            capture_output=True, text=True, timeout=60).stdout
+    assert 'INICIANDO' in stdout, stdout
+    lines = stdout.split('INICIANDO', 1)[1].splitlines()[1:]
+    return [line for line in lines if line and not line.startswith('=') and 'EJECUCIÓN FINALIZADA' not in line]
+
+
+def escribe_programa(tmp_path, nombre, codigo):
+    path = tmp_path / nombre
+    path.write_text(codigo)
+    return str(path)
+
+
+@pytest.mark.parametrize('modo', MODOS, ids=' '.join)
+@pytest.mark.parametrize('programa', PRUEBAS, ids=os.path.basename)
+def test_modos_imprimen_lo_mismo(programa, modo):
+    assert ejecuta(*modo, programa) == ejecuta(programa)
+
+
+@pytest.mark.parametrize('nivel', ['-O0', '-O2'])
+@pytest.mark.parametrize('programa', PRUEBAS, ids=os.path.basename)
+def test_binario_ida_y_vuelta(tmp_path, programa, nivel):
+    # --guardar sólo compila; el binario se corre aparte
+    binario = str(tmp_path / 'programa.pbin')
+    subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), nivel, f'--guardar={binario}', programa],
+                   cwd=ROOT, capture_output=True, check=True, timeout=60)
+    assert ejecuta(binario) == ejecuta(nivel, programa)
+
+
+# La función no asigna su variable de retorno en todos los caminos: f(0)
+# regresa lo que dejó la llamada anterior y no se puede memoizar
+RETORNO_PARCIAL = '''programa MemoCamino;
+vars
+    a : entero;
+
+entero f(v : entero) {
+    {
+        si (v > 0) {
+            f = v;
+        };
+    }
+}
+
+inicio
+    a = f(5);
+    escribe(a);
+    a = f(0);
+    escribe(a);
+    a = f(7);
+    escribe(a);
+    a = f(0);
+    escribe(a);
+fin
+'''
+
+# En el sino se lee la variable de retorno de k sin haberla llamado
+RETORNO_AJENO = '''programa MemoSino;
+vars
+    a : entero;
+
+entero k(v : entero) {
+    {
+        k = v * 2;
+    }
+}
+
+entero h(v : entero) {
+    {
+        si (v > 0) {
+            h = k(v);
+        } sino {
+            h = k;
+        };
+    }
+}
+
+inicio
+    a = h(5);
+    escribe(a);
+    a = h(0);
+    escribe(a);
+    a = h(10);
+    escribe(a);
+    a = h(0);
+    escribe(a);
+fin
+'''
+
+# Una local que se lee sin asignar vale None en cada llamada
+LOCAL_SIN_ASIGNAR = '''programa Frames;
+vars
+    r : entero;
+
+nula f(v : entero) {
+    vars acc : entero;
+    {
+        si (v > 0) {
+            acc = v;
+        };
+        escribe(acc);
+    }
+}
+
+inicio
+    f(5);
+    f(0);
+fin
+'''
+
+# Lo mismo dentro de un ciclo: una función inlineada no debe ver la local
+# que dejó la iteración anterior
+LOCAL_SIN_ASIGNAR_CICLO = '''programa FramesCiclo;
+vars
+    i : entero;
+
+nula f(v : entero) {
+    vars acc : entero;
+    {
+        si (v > 0) {
+            acc = v;
+        };
+        escribe(acc);
+    }
+}
+
+inicio
+    i = 2;
+    mientras (i >= 0) haz {
+        f(i);
+        i = i - 1;
+    };
+fin
+'''
+
+# Una expresión invariante dentro de un 'si' no sube al preheader: a y b
+# no tienen valor y la suma sólo correría si i > 5
+INVARIANTE_GUARDADA = '''programa Guarda;
+vars
+    i, s, a, b : entero;
+
+inicio
+    i = 0;
+    s = 0;
+    mientras (i < 3) haz {
+        si (i > 5) {
+            s = a + b;
+        };
+        i = i + 1;
+    };
+    escribe(i);
+fin
+'''
+
+# x / 1 con x entero sigue siendo división real
+ENTRE_UNO = '''programa EntreUno;
+vars
+    x : entero;
+    y : flotante;
+
+inicio
+    x = 5;
+    y = 2.5;
+    escribe(x / 1);
+    escribe(y / 1);
+fin
+'''
+
+# El caché de una función memoizada distingue 3 de 3.0
+MEMO_TIPOS = '''programa MemoTipos;
+vars
+    k : entero;
+
+entero e(v : entero) {
+    {
+        e = v + 1;
+    }
+}
+
+inicio
+    k = 6 / 2;
+    escribe(e(k));
+    k = 3;
+    escribe(e(k));
+fin
+'''
+
+# '/' entre enteros es división real aunque el cubo tipa el resultado como
+# entero: se puede pasar a un parámetro entero y se asigna sin truncar
+DIVISION = '''programa Division;
+vars
+    a, b : entero;
+
+flotante mitad(n : entero) {
+    {
+        mitad = n / 2;
+    }
+}
+
+entero doble(n : entero) {
+    {
+        doble = n * 2;
+    }
+}
+
+inicio
+    escribe(7 / 3);
+    escribe(mitad(7));
+    a = 7;
+    b = 2;
+    escribe(doble(a / b));
+    a = a / 2;
+    escribe(a);
+fin
+'''
+
+
+@pytest.mark.parametrize('modo', [[], ['--memo'], ['-O1'], ['-O2'], ['--nativo'], ['-O2', '--nativo']],
+                         ids=lambda modo: ' '.join(modo) or '-O0')
+@pytest.mark.parametrize('codigo, esperado', [
+    (RETORNO_PARCIAL, ['5', '5', '7', '7']),
+    (RETORNO_AJENO, ['10', '10', '20', '20']),
+    (LOCAL_SIN_ASIGNAR, ['5', 'None']),
+    (LOCAL_SIN_ASIGNAR_CICLO, ['2', '1', 'None']),
+    (DIVISION, ['2.3333333333333335', '3.5', '7.0', '3.5']),
+    (MEMO_TIPOS, ['4.0', '4']),
+    (INVARIANTE_GUARDADA, ['3']),
+    (ENTRE_UNO, ['5.0', '2.5']),
+], ids=['retorno_parcial', 'retorno_ajeno', 'local_sin_asignar', 'local_sin_asignar_ciclo', 'division', 'memo_tipos',
+        'invariante_guardada', 'entre_uno'])
+def test_regresiones(tmp_path, codigo, esperado, modo):
+    assert ejecuta(*modo, escribe_programa(tmp_path, 'programa.txt', codigo)) == esperado
+
+
+PROFUNDO = '''programa Profundo;
+vars
+    r : entero;
+
+entero baja(n : entero) {
+    {
+        si (n == 0) {
+            baja = 0;
+        } sino {
+            baja = baja(n - 1) + 1;
+        };
+    }
+}
+
+inicio
+    r = baja(200000);
+    escribe(r);
+fin
+'''
+
+
+def test_recursion_profunda_nativo(tmp_path):
+    # La VM no tiene límite de profundidad; --nativo debe aguantar lo mismo
+    programa = escribe_programa(tmp_path, 'profundo.txt', PROFUNDO)
+    assert ejecuta('--nativo', programa) == ejecuta(programa) == ['200000']
+
+
+@pytest.mark.parametrize('modo', [[], ['--flujo']], ids=['-O0', '--flujo'])
+def test_error_de_sintaxis_no_ejecuta(tmp_path, modo):
+    programa = escribe_programa(tmp_path, 'malo.txt', 'programa X;\nvars a : entero;\ninicio\n a = 3 +;\nfin\n')
+    stdout = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), *modo, programa], cwd=ROOT,
+                            capture_output=True, text=True, timeout=60).stdout
+    assert "Error de sintaxis en ';' (Línea 4)" in stdout
+    assert 'INICIANDO' not in stdout
+    assert 'ERROR: 1 error(es) de sintaxis' in stdout
+
+
+# Asignar una variable sin valor avisa igual con '=' genérico o especializado
+SIN_VALOR = '''programa Nada;
+vars
+    a, r : entero;
+    x : flotante;
+
+inicio
+    r = a;
+    x = a;
+    r = x;
+    escribe(r);
+fin
+'''
+
+
+@pytest.mark.parametrize('nivel', ['-O0', '-O1', '-O2'])
+def test_aviso_variable_sin_valor(tmp_path, nivel):
+    assert ejecuta(nivel, escribe_programa(tmp_path, 'nada.txt', SIN_VALOR)) == [
+        'WARNING: Get value 1000 returned None',
+        'WARNING: Get value 1000 returned None',
+        'WARNING: Get value 2000 returned None',
+        'None',
+    ]
+
+
+def test_perfil_con_nativo_se_rechaza(tmp_path):
+    # El perfilador sólo mide la VM: con --nativo se avisa en lugar de ignorarlo
+    programa = os.path.join(ROOT, 'pruebas', 'factorial.txt')
+    stdout = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--nativo', '--perfil', programa],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60).stdout
+    assert 'Error: --perfil no se puede combinar con --nativo' in stdout
+    assert 'INICIANDO' not in stdout
+
+
+# Constantes que no caben en 64 bits, escritas y plegadas (-O1)
+GRANDE = '''programa Grande;
+vars
+    a, b : entero;
+
+inicio
+    a = 99999999999999999999;
+    b = 3037000500 * 3037000500;
+    escribe(a);
+    escribe(b);
+    b = 0 - 99999999999999999999;
+    escribe(b);
+fin
+'''
+GRANDE_SALIDA = ['99999999999999999999', '9223372037000250000', '-99999999999999999999']
+
+
+@pytest.mark.parametrize('nivel', ['-O0', '-O1'])
+def test_binario_enteros_grandes(tmp_path, nivel):
+    programa = escribe_programa(tmp_path, 'grande.txt', GRANDE)
+    binario = str(tmp_path / 'grande.pbin')
+    subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), nivel, f'--guardar={binario}', programa],
+                   cwd=ROOT, capture_output=True, check=True, timeout=60)
+    assert ejecuta(binario) == ejecuta(nivel, programa) == GRANDE_SALIDA
+
+
+@pytest.mark.parametrize('nivel', ['-O0', '-O1'])
+def test_cache_enteros_grandes(tmp_path, nivel):
+    # La primera corrida guarda en el caché y la segunda lo lee; las dos ejecutan
+    programa = escribe_programa(tmp_path, 'grande.txt', GRANDE)
+    cache = f"--cache={tmp_path / 'cache'}"
+    # La última línea es el resumen del caché
+    assert ejecuta(nivel, cache, programa)[:-1] == ejecuta(nivel, cache, programa)[:-1] == GRANDE_SALIDA
+
+
+def test_cache_cambia_con_las_reglas(tmp_path, monkeypatch):
+    # Editar un módulo de --reglas invalida las entradas compiladas con él
+    monkeypatch.syspath_prepend(ROOT)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from compile_cache import CompilationCache
+    reglas = tmp_path / 'reglas_prueba.py'
+    reglas.write_text('# versión 1\n')
+    cache = CompilationCache(str(tmp_path / 'cache'))
+    antes = cache.key('programa', 'O1', ['reglas_prueba'])
+    reglas.write_text('# versión 2\n')
+    assert cache.key('programa', 'O1', ['reglas_prueba']) != antes
+    assert cache.key('programa', 'O1') != antes
+
+
+@pytest.mark.parametrize('flag', ['-Ox', '-O-'])
+def test_nivel_de_optimizacion_invalido(flag):
+    resultado = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), flag, os.path.join(ROOT, 'pruebas', 'factorial.txt')],
+                               cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert resultado.returncode == 1
+    assert f"nivel de optimización inválido '{flag}'" in resultado.stdout
+    assert 'Traceback' not in resultado.stderr
@@ -0,0 +1,36 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory_manager import MemoryManager
+from quadruples import QuadrupleManager
+
+
+class SoloLongitud(list):
+    # Lista de cuádruplos que sólo deja pedir su longitud
+    def __iter__(self):
+        raise AssertionError("complete_patching recorrió todos los cuádruplos")
+
+    def __getitem__(self, index):
+        raise AssertionError("complete_patching leyó un cuádruplo por índice")
+
+
+def test_complete_patching_solo_revisa_saltos_pendientes():
+    manager = QuadrupleManager(MemoryManager())
+    manager.add_quadruple('goto', '', '', '')
+    for i in range(100000):
+        manager.add_quadruple('=', 8000, '', 1000)
+        if i % 25000 == 0:
+            manager.add_quadruple('gotof', 9000, '', '')
+    manager.add_quadruple('goto', '', '', 7)
+    assert len(manager.pending_jumps) == 5
+
+    total = len(manager.quadruples)
+    pending = list(manager.pending_jumps)
+    manager.quadruples = SoloLongitud(manager.quadruples)
+    manager.complete_patching()
+
+    assert all(quad.result == str(total) for quad in pending)
+    assert manager.pending_jumps == []
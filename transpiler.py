@@ -0,0 +1,328 @@
+import sys
+import threading
+
+from memory_manager import memory_manager
+from virtual_machine import TYPED_OPERATORS, parse_constant
+from optimizer import (
+    BINARY_OPERATORS, FUSED_GOTOF, FUSED_STORE, JUMP_OPERATORS, TYPED_BINARY_OPERATORS,
+    function_ranges, read_addresses,
+)
+
+# Operador de Python para cada operador (normal o fusionado) de los cuádruplos
+PYTHON_OPERATORS = {op: op for op in BINARY_OPERATORS}
+PYTHON_OPERATORS.update({fused: op for op, fused in FUSED_GOTOF.items()})
+PYTHON_OPERATORS.update({fused: op for op, fused in FUSED_STORE.items()})
+PYTHON_OPERATORS.update({typed: TYPED_OPERATORS[typed] for typed in TYPED_BINARY_OPERATORS})
+
+# Conversión de cada asignación especializada ('' = copia directa)
+ASSIGN_CONVERSIONS = {typed: '' for typed, op in TYPED_OPERATORS.items() if op == '='}
+ASSIGN_CONVERSIONS.update({'ASSIGN_IF': 'int', 'ASSIGN_FI': 'float'})
+
+CONDITIONAL_JUMPS = {'gotof'} | set(FUSED_GOTOF.values())
+
+# Profundidad de llamadas de --nativo y pila del hilo que la aloja en Python < 3.11
+NATIVE_RECURSION_LIMIT = 1000000
+NATIVE_STACK_SIZE = 1024 * 1024 * 1024
+
+
+class Unstructured(Exception):
+    pass
+
+
+class Transpiler:
+    # Convierte los cuádruplos de cada función en una función de Python:
+    # locales y temporales como variables locales, saltos como while/if
+    # (o una máquina de estados por bloques si el flujo no es estructurado)
+    # y GOSUB como una llamada real
+    def __init__(self, quadruples, constants_table, function_directory):
+        self.quadruples = quadruples
+        self.function_directory = function_directory
+        self.constants = {address: parse_constant(key) for key, address in constants_table.items()}
+        self.owners = function_ranges(quadruples, function_directory)
+        self.pending_args = {}
+        self.callee = None
+        self.globals_used = set()
+        self.globals_written = set()
+
+    def name(self, address):
+        address = int(address)
+        if address >= memory_manager.CONST_INT_START:
+            return repr(self.constants[address])
+        if address >= memory_manager.TEMP_INT_START:
+            return f"t{address}"
+        if address >= memory_manager.LOCAL_INT_START:
+            return f"l{address}"
+        if address >= memory_manager.GLOBAL_INT_START:
+            self.globals_used.add(address)
+            return f"g{address}"
+        raise Exception(f"Segmentation Fault: Address {address} out of bounds")
+
+    def target(self, address):
+        address = int(address)
+        if address >= memory_manager.GLOBAL_INT_START and address < memory_manager.LOCAL_INT_START:
+            self.globals_written.add(address)
+        return self.name(address)
+
+    def condition(self, quad):
+        if quad.operator == 'gotof':
+            return self.name(quad.left_operand)
+        return f"{self.name(quad.left_operand)} {PYTHON_OPERATORS[quad.operator]} {self.name(quad.right_operand)}"
+
+    def statement(self, quad):
+        op = quad.operator
+        if op in PYTHON_OPERATORS:
+            left = self.name(quad.left_operand)
+            right = self.name(quad.right_operand)
+            dest = self.target(quad.result)
+            symbol = PYTHON_OPERATORS[op]
+            lines = []
+            if symbol == '/' and not (int(quad.right_operand) in self.constants and self.constants[int(quad.right_operand)] != 0):
+                lines.append(f"if {right} == 0: raise Exception(\"Division by Zero\")")
+            lines.append(f"{dest} = {left} {symbol} {right}")
+            return lines
+        if op == '=':
+            return [f"{self.target(quad.result)} = {self.name(quad.left_operand)}"]
+        if op in ASSIGN_CONVERSIONS:
+            return [f"{self.target(quad.result)} = {ASSIGN_CONVERSIONS[op]}({self.name(quad.left_operand)})"]
+        if op == 'print':
+            if isinstance(quad.left_operand, str) and quad.left_operand.startswith('"'):
+                return [f"print({quad.left_operand.strip(chr(34))!r})"]
+            return [f"print({self.name(quad.left_operand)})"]
+        if op == 'ERA':
+            self.callee = quad.left_operand
+            self.pending_args = {}
+            return []
+        if op == 'PARAM':
+            self.pending_args[int(quad.result)] = self.name(quad.left_operand)
+            return []
+        if op == 'GOSUB':
+            func_name = quad.left_operand
+            params = self.function_directory.functions[func_name]['parameters']
+            args = ', '.join(self.pending_args.get(param['address'], 'None') for param in params)
+            self.pending_args = {}
+            return [f"fn_{func_name}({args})"]
+        if op == 'ENDFUNC':
+            return ["return"]
+        if op == 'RET':
+            return []
+        raise Exception(f"Unknown opcode: {op}")
+
+    def structure(self, lo, hi, indent):
+        # Reconstruye if/sino y mientras a partir de los patrones que emite
+        # el parser; cualquier salto que no encaje lanza Unstructured
+        quads = self.quadruples
+        pad = '    ' * indent
+        lines = []
+        p = lo
+        while p < hi:
+            loop = self.match_loop(p, hi)
+            if loop:
+                cond_index, back_edge = loop
+                lines.append(f"{pad}while True:")
+                for i in range(p, cond_index):
+                    lines.extend(f"{pad}    {line}" for line in self.statement(quads[i]))
+                lines.append(f"{pad}    if not ({self.condition(quads[cond_index])}):")
+                lines.append(f"{pad}        break")
+                lines.extend(self.structure(cond_index + 1, back_edge, indent + 1))
+                p = back_edge + 1
+                continue
+
+            quad = quads[p]
+            if quad.operator in CONDITIONAL_JUMPS:
+                t = int(quad.result)
+                if t <= p or t > hi:
+                    raise Unstructured()
+                end_goto = quads[t - 1]
+                lines.append(f"{pad}if {self.condition(quad)}:")
+                if t - 1 > p and end_goto.operator == 'goto' and t <= int(end_goto.result) <= hi:
+                    e = int(end_goto.result)
+                    lines.extend(self.structure(p + 1, t - 1, indent + 1))
+                    if e > t:
+                        lines.append(f"{pad}else:")
+                        lines.extend(self.structure(t, e, indent + 1))
+                    p = e
+                else:
+                    lines.extend(self.structure(p + 1, t, indent + 1))
+                    p = t
+                continue
+
+            if quad.operator == 'goto':
+                if int(quad.result) != p + 1:
+                    raise Unstructured()
+            else:
+                lines.extend(f"{pad}{line}" for line in self.statement(quad))
+            p += 1
+
+        if not lines:
+            lines.append(f"{pad}pass")
+        return lines
+
+    def match_loop(self, p, hi):
+        quads = self.quadruples
+        for back_edge in range(p + 1, hi):
+            quad = quads[back_edge]
+            if quad.operator == 'goto' and int(quad.result) == p:
+                break
+        else:
+            return None
+
+        for cond_index in range(p, back_edge):
+            op = quads[cond_index].operator
+            if op in CONDITIONAL_JUMPS:
+                if int(quads[cond_index].result) == back_edge + 1:
+                    return cond_index, back_edge
+                return None
+            if op in JUMP_OPERATORS or op == 'ENDFUNC':
+                return None
+        return None
+
+    def state_machine(self, lo, hi, indent):
+        # Respaldo general: un bloque básico por estado
+        quads = self.quadruples
+        leaders = {lo}
+        for i in range(lo, hi):
+            quad = quads[i]
+            if quad.operator in JUMP_OPERATORS:
+                leaders.add(int(quad.result))
+                leaders.add(i + 1)
+            elif quad.operator == 'ENDFUNC':
+                leaders.add(i + 1)
+        leaders = sorted(leader for leader in leaders if lo <= leader < hi)
+
+        pad = '    ' * indent
+        lines = [f"{pad}block = {lo}", f"{pad}while True:"]
+        for n, start in enumerate(leaders):
+            end = leaders[n + 1] if n + 1 < len(leaders) else hi
+            keyword = 'if' if n == 0 else 'elif'
+            lines.append(f"{pad}    {keyword} block == {start}:")
+            body = []
+            terminated = False
+            for i in range(start, end):
+                quad = quads[i]
+                if quad.operator == 'goto':
+                    body += [f"block = {int(quad.result)}", "continue"]
+                    terminated = True
+                elif quad.operator in CONDITIONAL_JUMPS:
+                    body += [f"if not ({self.condition(quad)}):", f"    block = {int(quad.result)}", "    continue"]
+                elif quad.operator == 'ENDFUNC':
+                    body.append("return")
+                    terminated = True
+                else:
+                    body += self.statement(quad)
+            if not terminated:
+                body += ["return"] if end >= hi else [f"block = {end}", "continue"]
+            lines.extend(f"{pad}        {line}" for line in body)
+        lines.append(f"{pad}    else:")
+        lines.append(f"{pad}        return")
+        return lines
+
+    def function(self, py_name, params, lo, hi):
+        self.globals_used = set()
+        self.globals_written = set()
+        try:
+            body = self.structure(lo, hi, 1)
+        except Unstructured:
+            body = self.state_machine(lo, hi, 1)
+
+        header = [f"def {py_name}({', '.join(params)}):"]
+        if self.globals_written:
+            header.append(f"    global {', '.join(f'g{address}' for address in sorted(self.globals_written))}")
+        initialized = set(params)
+        for i in range(lo, hi):
+            quad = self.quadruples[i]
+            if quad.operator in JUMP_OPERATORS or quad.operator in ('GOSUB', 'PARAM'):
+                operands = read_addresses(quad)
+            else:
+                operands = (quad.left_operand, quad.right_operand, quad.result)
+            for operand in operands:
+                if isinstance(operand, int) and memory_manager.LOCAL_INT_START <= operand < memory_manager.CONST_INT_START:
+                    initialized.add(self.name(operand))
+        locals_ = sorted(initialized - set(params))
+        if locals_:
+            header.append(f"    {' = '.join(locals_)} = None")
+        return header + body
+
+    def transpile(self):
+        quads = self.quadruples
+        lines = ["# Módulo generado a partir de los cuádruplos de un programa Patito", ""]
+        functions = []
+        globals_all = set()
+
+        for name, info in self.function_directory.functions.items():
+            if name == 'global' or info['start_quad'] is None:
+                continue
+            lo = info['start_quad']
+            hi = lo
+            while hi < len(quads) and self.owners[hi] == name:
+                hi += 1
+            params = [f"l{param['address']}" for param in info['parameters']]
+            functions.append(self.function(f"fn_{name}", params, lo, hi))
+            globals_all |= self.globals_used
+
+        main_start = 0
+        if quads and quads[0].operator == 'goto':
+            main_start = int(quads[0].result)
+        functions.append(self.function("main", [], main_start, len(quads)))
+        globals_all |= self.globals_used
+
+        for address in sorted(globals_all):
+            lines.append(f"g{address} = None")
+        for function in functions:
+            lines.append("")
+            lines.extend(function)
+        lines.append("")
+        return '\n'.join(lines)
+
+
+def transpile(quadruples, constants_table, function_directory):
+    return Transpiler(quadruples, constants_table, function_directory).transpile()
+
+
+def run_native(source):
+    # Python llama a sí mismo por cada GOSUB: la recursión de Patito
+    # necesita un límite mucho mayor al de default (la VM no tiene límite,
+    # su pila de llamadas es una lista)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), NATIVE_RECURSION_LIMIT))
+    namespace = {'__name__': 'patito_program'}
+    exec(compile(source, '<patito>', 'exec'), namespace)
+    if sys.version_info >= (3, 11):
+        # Desde 3.11 una llamada Python a Python no usa la pila de C
+        namespace['main']()
+        return
+    # Antes, cada nivel sí la usa: se corre en un hilo con una pila grande
+    errors = []
+
+    def run():
+        try:
+            namespace['main']()
+        except BaseException as e:
+            errors.append(e)
+
+    previous = threading.stack_size(NATIVE_STACK_SIZE)
+    try:
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+    finally:
+        threading.stack_size(previous)
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+if __name__ == "__main__":
+    import io
+    from contextlib import redirect_stdout
+    from patito_parser import parser
+    from patito_lexer import lexer
+    from quadruples import quadruple_manager
+    from symbol_table import function_directory
+
+    if len(sys.argv) < 2:
+        print("Uso: python transpiler.py programa.txt")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r') as f:
+        data = f.read()
+    with redirect_stdout(io.StringIO()):
+        parser.parse(data, lexer=lexer)
+    print(transpile(quadruple_manager.quadruples, memory_manager.constants_table, function_directory))
@@ -1,216 +1,784 @@
 from memory_manager import memory_manager
+from bisect import bisect_right
+from collections import OrderedDict
 import sys
 
+def parse_constant(key):
+    # Las llaves de la tabla de constantes tienen la forma "<valor>_<tipo>"
+    value_str = key.rsplit('_', 1)[0]
+    type_str = key.rsplit('_', 1)[1]
+    
+    if type_str in ['entero', 'int']:
+        return int(value_str)
+    elif type_str in ['flotante', 'float']:
+        return float(value_str)
+    return value_str.strip('"')
+
+# Segmentos de memoria en ejecución; las direcciones se resuelven a
+# (segmento, desplazamiento) una sola vez, al cargar el programa
+GLOBAL_SEGMENT = 0
+LOCAL_SEGMENT = 1
+TEMP_SEGMENT = 2
+CONST_SEGMENT = 3
+
 class MemoryMap:
     def __init__(self):
-        self.global_memory = {}
-        self.constant_memory = {}
+        # (inicio, segmento) de cada subsegmento virtual, en orden ascendente
+        self.subsegments = [
+            (memory_manager.GLOBAL_INT_START, GLOBAL_SEGMENT),
+            (memory_manager.GLOBAL_FLOAT_START, GLOBAL_SEGMENT),
+            (memory_manager.LOCAL_INT_START, LOCAL_SEGMENT),
+            (memory_manager.LOCAL_FLOAT_START, LOCAL_SEGMENT),
+            (memory_manager.TEMP_INT_START, TEMP_SEGMENT),
+            (memory_manager.TEMP_FLOAT_START, TEMP_SEGMENT),
+            (memory_manager.TEMP_BOOL_START, TEMP_SEGMENT),
+            (memory_manager.CONST_INT_START, CONST_SEGMENT),
+            (memory_manager.CONST_FLOAT_START, CONST_SEGMENT),
+            (memory_manager.CONST_STRING_START, CONST_SEGMENT),
+        ]
+        self.subsegment_starts = [start for start, _ in self.subsegments]
+        self.subsegment_offsets = [0] * len(self.subsegments)
+        self.segment_sizes = [0, 0, 0, 0]
+
+        self.segments = [[], [], [], []]
         self.local_memory_stack = [] 
         self.temp_memory_stack = [] 
-        
-        self.global_memory = {}
-        
-        self.local_memory = {}
-        self.temp_memory = {}
-        
-    def get_value(self, address):
-        if address >= memory_manager.CONST_INT_START:
-            return self.constant_memory.get(address)
-        elif address >= memory_manager.TEMP_INT_START:
-            if self.temp_memory_stack:
-                return self.temp_memory_stack[-1].get(address)
-            return self.temp_memory.get(address) 
-        elif address >= memory_manager.LOCAL_INT_START:
-            if self.local_memory_stack:
-                return self.local_memory_stack[-1].get(address)
-            return self.local_memory.get(address)
-        elif address >= memory_manager.GLOBAL_INT_START:
-            val = self.global_memory.get(address)
-            return val
-        else:
+
+    def allocate(self, addresses):
+        # Empaca los subsegmentos usados (ej. enteros y flotantes locales)
+        # en una lista contigua por segmento
+        used = [0] * len(self.subsegments)
+        for address in addresses:
+            index = self.find_subsegment(address)
+            used[index] = max(used[index], address - self.subsegment_starts[index] + 1)
+
+        self.segment_sizes = [0, 0, 0, 0]
+        for index, (_, segment) in enumerate(self.subsegments):
+            self.subsegment_offsets[index] = self.segment_sizes[segment]
+            self.segment_sizes[segment] += used[index]
+
+        self.segments = [[None] * size for size in self.segment_sizes]
+
+    def find_subsegment(self, address):
+        if address < memory_manager.GLOBAL_INT_START:
             raise Exception(f"Segmentation Fault: Address {address} out of bounds")
+        return bisect_right(self.subsegment_starts, address) - 1
+
+    def resolve(self, address, offsets=None):
+        if offsets is None:
+            offsets = self.subsegment_offsets
+        index = self.find_subsegment(address)
+        offset = offsets[index] + address - self.subsegment_starts[index]
+        return self.subsegments[index][1], offset
+
+    def frame_layout(self, frame_size):
+        # Desplazamientos de los subsegmentos locales y temporales de una
+        # función, a partir de los contadores que registró el compilador
+        counts = [
+            frame_size['local_int'], frame_size['local_float'],
+            frame_size['temp_int'], frame_size['temp_float'], frame_size['temp_bool'],
+        ]
+        offsets = list(self.subsegment_offsets)
+        sizes = [0, 0, 0, 0]
+        frame_subsegments = [index for index, (_, segment) in enumerate(self.subsegments)
+                             if segment in (LOCAL_SEGMENT, TEMP_SEGMENT)]
+        for index, count in zip(frame_subsegments, counts):
+            segment = self.subsegments[index][1]
+            offsets[index] = sizes[segment]
+            sizes[segment] += count
+        return offsets, sizes[LOCAL_SEGMENT], sizes[TEMP_SEGMENT]
+
+    def get_value(self, address):
+        segment, offset = self.resolve(address)
+        return self.segments[segment][offset]
 
     def set_value(self, address, value):
-        if address >= memory_manager.CONST_INT_START:
+        segment, offset = self.resolve(address)
+        if segment == CONST_SEGMENT:
             raise Exception("Segmentation Fault: Cannot write to Read-Only Memory (Constants)")
-        elif address >= memory_manager.TEMP_INT_START:
-            if self.temp_memory_stack:
-                self.temp_memory_stack[-1][address] = value
-            else:
-                self.temp_memory[address] = value
-        elif address >= memory_manager.LOCAL_INT_START:
-            if self.local_memory_stack:
-                self.local_memory_stack[-1][address] = value
-            else:
-                self.local_memory[address] = value
-        elif address >= memory_manager.GLOBAL_INT_START:
-            self.global_memory[address] = value
-        else:
-            raise Exception(f"Segmentation Fault: Address {address} out of bounds")
+        self.segments[segment][offset] = value
+
+    def push_frame(self, local_frame, temp_frame):
+        segments = self.segments
+        self.local_memory_stack.append(segments[LOCAL_SEGMENT])
+        self.temp_memory_stack.append(segments[TEMP_SEGMENT])
+        segments[LOCAL_SEGMENT] = local_frame
+        segments[TEMP_SEGMENT] = temp_frame
 
     def push_local_memory(self):
-        self.local_memory_stack.append({})
-        self.temp_memory_stack.append({})
+        self.push_frame([None] * self.segment_sizes[LOCAL_SEGMENT], [None] * self.segment_sizes[TEMP_SEGMENT])
 
     def pop_local_memory(self):
         if self.local_memory_stack:
-            self.local_memory_stack.pop()
-            self.temp_memory_stack.pop()
-
-    def load_constants(self, constants_table):
-        for key, address in constants_table.items():
-            value_str = key.rsplit('_', 1)[0]
-            type_str = key.rsplit('_', 1)[1]
-            
-            if type_str in ['entero', 'int']:
-                value = int(value_str)
-            elif type_str in ['flotante', 'float']:
-                value = float(value_str)
-            else:
-                value = value_str.strip('"') 
-                
-            self.constant_memory[address] = value
+            self.segments[LOCAL_SEGMENT] = self.local_memory_stack.pop()
+            self.segments[TEMP_SEGMENT] = self.temp_memory_stack.pop()
+
+    def load_constants(self, constants):
+        constant_memory = self.segments[CONST_SEGMENT]
+        for address, value in constants.items():
+            constant_memory[self.resolve(address)[1]] = value
+
+# Códigos de operación enteros: cada cuádruplo se decodifica una sola vez
+OPERATORS = [
+    '=', '+', '-', '*', '/',
+    '<', '>', '==', '!=', '<=', '>=',
+    'print', 'goto', 'gotof',
+    'ERA', 'PARAM', 'GOSUB', 'ENDFUNC', 'RET',
+    'LT_GOTOF', 'GT_GOTOF', 'EQ_GOTOF', 'NE_GOTOF', 'LE_GOTOF', 'GE_GOTOF',
+    'ADD_STORE', 'SUB_STORE', 'MUL_STORE', 'DIV_STORE',
+]
+
+# Operadores especializados por tipo: el sufijo da el tipo (I entero,
+# F flotante) de cada operando en el orden del cubo semántico; en ASSIGN
+# el primero es el destino y el segundo la fuente
+TYPED_PREFIXES = {
+    '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV',
+    '<': 'LT', '>': 'GT', '==': 'EQ', '!=': 'NE', '<=': 'LE', '>=': 'GE',
+    '=': 'ASSIGN',
+}
+TYPE_LETTERS = {'entero': 'I', 'flotante': 'F'}
+TYPED_OPERATORS = {f"{prefix}_{left}{right}": operator
+                   for operator, prefix in TYPED_PREFIXES.items()
+                   for left in 'IF' for right in 'IF'}
+OPERATORS += list(TYPED_OPERATORS)
+OPCODES = {operator: opcode for opcode, operator in enumerate(OPERATORS)}
+OP_ERA = OPCODES['ERA']
+OP_ENDFUNC = OPCODES['ENDFUNC']
+
+# Operadores cuyo resultado es un índice de cuádruplo y no una dirección
+JUMP_OPERATORS = {
+    'goto', 'gotof', 'GOSUB',
+    'LT_GOTOF', 'GT_GOTOF', 'EQ_GOTOF', 'NE_GOTOF', 'LE_GOTOF', 'GE_GOTOF',
+}
+# Operadores que no leen ni escriben memoria
+NON_ADDRESS_OPERATORS = {'goto', 'ERA', 'GOSUB', 'ENDFUNC'}
+
+JUMP_OPCODES = {OPCODES[operator] for operator in JUMP_OPERATORS}
+NON_ADDRESS_OPCODES = {OPCODES[operator] for operator in NON_ADDRESS_OPERATORS}
+
+def encode_quadruples(quadruples):
+    # Registros (opcode, izquierdo, derecho, resultado) que consume la VM
+    records = []
+    for quad in quadruples:
+        opcode = OPCODES.get(quad.operator)
+        if opcode is None:
+            raise Exception(f"Unknown opcode: {quad.operator}")
+        records.append((opcode, quad.left_operand, quad.right_operand, quad.result))
+    return records
 
 class VirtualMachine:
-    def __init__(self, quadruples, constants_table):
-        self.quadruples = quadruples
+    # Entradas máximas del caché LRU de cada función memoizada
+    memo_size = 4096
+
+    def __init__(self, quadruples, constants_table, functions=None):
+        constants = {address: parse_constant(key) for key, address in constants_table.items()}
+        self.load(encode_quadruples(quadruples), constants, functions)
+
+    @classmethod
+    def from_records(cls, records, constants, functions=None):
+        # Carga directa de registros ya codificados (ej. un programa binario),
+        # sin construir objetos Quadruple
+        vm = cls.__new__(cls)
+        vm.load(records, constants, functions)
+        return vm
+
+    def load(self, records, constants, functions):
+        self.records = records
+        self.functions = functions or {}
         self.memory = MemoryMap()
-        self.memory.load_constants(constants_table)
+        self.memory.allocate(self.collect_addresses(records, constants))
+        self.memory.load_constants(constants)
+        self.frames = self.build_frame_table()
         self.instruction_pointer = 0
         self.call_stack = [] 
         self.pending_stack = []
+        self.handlers = self.build_handler_table()
+        self.decode_frame = self.frame_for('global')
+        self.decode_callee = None
+        self.opcodes, self.code = self.decode(records)
+
+    def build_frame_table(self):
+        # Registro de activación de cada función: desplazamientos de sus
+        # direcciones, tamaños exactos y pools de frames reutilizables
+        memory = self.memory
+        self.default_frame = {
+            'offsets': memory.subsegment_offsets,
+            'local_size': memory.segment_sizes[LOCAL_SEGMENT],
+            'temp_size': memory.segment_sizes[TEMP_SEGMENT],
+            'local_pool': [],
+            'temp_pool': [],
+            'memo': None,
+        }
+        frames = {}
+        for name, info in self.functions.items():
+            if info.get('frame_size'):
+                offsets, local_size, temp_size = memory.frame_layout(info['frame_size'])
+                frames[name] = {
+                    'offsets': offsets,
+                    'local_size': local_size,
+                    'temp_size': temp_size,
+                    'local_pool': [],
+                    'temp_pool': [],
+                    'memo': self.build_memo(info, offsets),
+                }
+
+        main_frame = frames.get('global', self.default_frame)
+        memory.segments[LOCAL_SEGMENT] = [None] * main_frame['local_size']
+        memory.segments[TEMP_SEGMENT] = [None] * main_frame['temp_size']
+        return frames
+
+    def build_memo(self, info, offsets):
+        # Caché de una función pura: llave = valores de sus parámetros en el
+        # frame pendiente, valor = lo que dejó en su variable de retorno
+        if info.get('memo_address') is None:
+            return None
+        return {
+            'slot': self.memory.resolve(info['memo_address']),
+            'params': tuple(self.memory.resolve(param['address'], offsets)[1] for param in info['parameters']),
+            'cache': OrderedDict(),
+            'keys': [],
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def memo_stats(self):
+        return {name: {'hits': frame['memo']['hits'], 'misses': frame['memo']['misses'],
+                       'evictions': frame['memo']['evictions'], 'entries': len(frame['memo']['cache'])}
+                for name, frame in self.frames.items() if frame['memo']}
+
+    def frame_for(self, func_name):
+        return self.frames.get(func_name, self.default_frame)
+
+    def build_handler_table(self):
+        builders = {
+            '=': self._op_assign,
+            '+': self._op_add,
+            '-': self._op_sub,
+            '*': self._op_mul,
+            '/': self._op_div,
+            '<': self._op_lt,
+            '>': self._op_gt,
+            '==': self._op_eq,
+            '!=': self._op_ne,
+            '<=': self._op_le,
+            '>=': self._op_ge,
+            'print': self._op_print,
+            'goto': self._op_goto,
+            'gotof': self._op_gotof,
+            'ERA': self._op_era,
+            'PARAM': self._op_param,
+            'GOSUB': self._op_gosub,
+            'ENDFUNC': self._op_endfunc,
+            'RET': self._op_ret,
+            'LT_GOTOF': self._op_lt_gotof,
+            'GT_GOTOF': self._op_gt_gotof,
+            'EQ_GOTOF': self._op_eq_gotof,
+            'NE_GOTOF': self._op_ne_gotof,
+            'LE_GOTOF': self._op_le_gotof,
+            'GE_GOTOF': self._op_ge_gotof,
+            'ADD_STORE': self._op_add,
+            'SUB_STORE': self._op_sub,
+            'MUL_STORE': self._op_mul,
+            'DIV_STORE': self._op_div,
+        }
+        # Los especializados no revisan None: los tipos ya se validaron al
+        # compilar. Las asignaciones sí avisan, como '=': una variable sin
+        # asignar vale None en ejecución y el compilador no lo puede descartar
+        generic = {
+            '+': self._op_add_typed, '-': self._op_sub, '*': self._op_mul, '/': self._op_div_float,
+            '<': self._op_lt, '>': self._op_gt, '==': self._op_eq,
+            '!=': self._op_ne, '<=': self._op_le, '>=': self._op_ge,
+            '=': self._op_assign,
+        }
+        for name, operator in TYPED_OPERATORS.items():
+            builders[name] = generic[operator]
+        builders['ASSIGN_IF'] = self._op_truncate
+        builders['ASSIGN_FI'] = self._op_promote
+        return [builders[operator] for operator in OPERATORS]
+
+    def collect_addresses(self, records, constants):
+        addresses = list(constants)
+        for opcode, left, right, res in records:
+            if opcode in NON_ADDRESS_OPCODES:
+                continue
+            operands = [left, right]
+            if opcode not in JUMP_OPCODES:
+                operands.append(res)
+            for operand in operands:
+                if operand == '' or (isinstance(operand, str) and operand.startswith('"')):
+                    continue
+                addresses.append(int(operand))
+        return addresses
+
+    def decode(self, records):
+        # Liga cada registro a una función cerrada sobre sus operandos ya
+        # resueltos; la función regresa el siguiente instruction pointer
+        starts = {info['start_quad']: name for name, info in self.functions.items()
+                  if name != 'global' and info.get('start_quad') is not None}
+        current_function = 'global'
+        opcodes = []
+        code = []
+        for ip, (opcode, left, right, res) in enumerate(records):
+            if ip in starts:
+                current_function = starts[ip]
+            self.decode_frame = self.frame_for(current_function)
+            if opcode == OP_ERA:
+                self.decode_callee = left
+
+            opcodes.append(opcode)
+            code.append(self.handlers[opcode](left, right, res, ip))
+
+            if opcode == OP_ENDFUNC:
+                current_function = 'global'
+        return opcodes, code
+
     def run(self, debug=False):
-        while self.instruction_pointer < len(self.quadruples):
-            quad = self.quadruples[self.instruction_pointer]
-            
-            if debug:
-                print(f"[VM-STEP] IP={self.instruction_pointer} | {quad}")
-            
-            op = quad.operator
-            left = quad.left_operand
-            right = quad.right_operand
-            res = quad.result
-            
-            if op == '=':
-                value = self.memory.get_value(left)
-                if value is None: print(f"WARNING: Get value {left} returned None")
-                self.memory.set_value(res, value)
-                self.instruction_pointer += 1
-                
-            elif op == '+':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                if left_val is None: print(f"WARNING: Left {left} is None")
-                if right_val is None: print(f"WARNING: Right {right} is None")
-                self.memory.set_value(res, left_val + right_val)
-                self.instruction_pointer += 1
-                
-            elif op == '-':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val - right_val)
-                self.instruction_pointer += 1
-                
-            elif op == '*':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val * right_val)
-                self.instruction_pointer += 1
-                
-            elif op == '/':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                if right_val == 0:
-                    raise Exception("Division by Zero")
-                self.memory.set_value(res, left_val / right_val)
-                self.instruction_pointer += 1
-                
-            elif op == '<':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val < right_val)
-                self.instruction_pointer += 1
-                
-            elif op == '>':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val > right_val)
-                self.instruction_pointer += 1
-
-            elif op == '==':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val == right_val)
-                self.instruction_pointer += 1
-
-            elif op == '!=':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val != right_val)
-                self.instruction_pointer += 1
-
-            elif op == '<=':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val <= right_val)
-                self.instruction_pointer += 1
-
-            elif op == '>=':
-                left_val = self.memory.get_value(left)
-                right_val = self.memory.get_value(right)
-                self.memory.set_value(res, left_val >= right_val)
-                self.instruction_pointer += 1
-                self.memory.set_value(res, left_val > right_val)
-                self.instruction_pointer += 1
-                
-            elif op == 'print':
-                if isinstance(left, str) and left.startswith('"'):
-                    print(left.strip('"'))
-                else:
-                    value = self.memory.get_value(left)
-                    print(value)
-                self.instruction_pointer += 1
-                
-            elif op == 'goto':
-                self.instruction_pointer = int(res)
-                
-            elif op == 'gotof':
-                condition = self.memory.get_value(left)
-                if not condition:
-                    self.instruction_pointer = int(res)
-                else:
-                    self.instruction_pointer += 1
-                    
-            elif op == 'ERA':
-                self.pending_stack.append({})
-                self.instruction_pointer += 1
-                
-            elif op == 'PARAM':
-                value = self.memory.get_value(left)
-                dest_addr = int(res)
-                if not self.pending_stack:
-                    raise Exception("PARAM without ERA")
-                self.pending_stack[-1][dest_addr] = value
-                self.instruction_pointer += 1
-                
-            elif op == 'GOSUB':
-                self.call_stack.append(self.instruction_pointer + 1)
-                self.instruction_pointer = int(res)
-                
-                if not self.pending_stack:
-                    raise Exception("GOSUB without ERA")
-                new_local_memory = self.pending_stack.pop()
-                
-                self.memory.local_memory_stack.append(new_local_memory)
-                self.memory.temp_memory_stack.append({}) 
-                
-            elif op == 'ENDFUNC':
-                self.memory.pop_local_memory()
-                self.instruction_pointer = self.call_stack.pop()
-                
-            elif op == 'RET':
-                self.instruction_pointer += 1
-                
+        if debug:
+            return self.run_debug()
+
+        code = self.code
+        end = len(code)
+        ip = self.instruction_pointer
+        try:
+            while ip < end:
+                ip = code[ip]()
+        finally:
+            self.instruction_pointer = ip
+
+    def run_debug(self):
+        code = self.code
+        while self.instruction_pointer < len(code):
+            opcode, left, right, res = self.records[self.instruction_pointer]
+            print(f"[VM-STEP] IP={self.instruction_pointer} | ({OPERATORS[opcode]}, {left}, {right}, {res})")
+            self.instruction_pointer = code[self.instruction_pointer]()
+
+    def resolve(self, address):
+        # Direcciones locales y temporales se resuelven con el frame de la
+        # función que contiene el cuádruplo que se está decodificando
+        return self.memory.resolve(int(address), self.decode_frame['offsets'])
+
+    def resolve_writable(self, address):
+        segment, offset = self.resolve(address)
+        if segment == CONST_SEGMENT:
+            raise Exception("Segmentation Fault: Cannot write to Read-Only Memory (Constants)")
+        return segment, offset
+
+    def _op_assign(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            value = segments[ls][lo]
+            if value is None: print(f"WARNING: Get value {left} returned None")
+            segments[ds][do] = value
+            return next_ip
+        return op
+
+    def _op_add(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            left_val = segments[ls][lo]
+            right_val = segments[rs][ro]
+            if left_val is None: print(f"WARNING: Left {left} is None")
+            if right_val is None: print(f"WARNING: Right {right} is None")
+            segments[ds][do] = left_val + right_val
+            return next_ip
+        return op
+
+    def _op_sub(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] - segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_mul(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] * segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_div(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            right_val = segments[rs][ro]
+            if right_val == 0:
+                raise Exception("Division by Zero")
+            segments[ds][do] = segments[ls][lo] / right_val
+            return next_ip
+        return op
+
+    def _op_truncate(self, left, right, res, ip):
+        # entero = flotante: el cubo lo permite truncando hacia cero
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            value = segments[ls][lo]
+            if value is None:
+                print(f"WARNING: Get value {left} returned None")
+                segments[ds][do] = None
+            else:
+                segments[ds][do] = int(value)
+            return next_ip
+        return op
+
+    def _op_promote(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            value = segments[ls][lo]
+            if value is None:
+                print(f"WARNING: Get value {left} returned None")
+                segments[ds][do] = None
             else:
-                raise Exception(f"Unknown opcode: {op}")
+                segments[ds][do] = float(value)
+            return next_ip
+        return op
+
+    def _op_add_typed(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] + segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_div_float(self, left, right, res, ip):
+        # El cero sólo se detecta cuando Python lo reporta: sin comparación previa
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            try:
+                segments[ds][do] = segments[ls][lo] / segments[rs][ro]
+            except ZeroDivisionError:
+                raise Exception("Division by Zero")
+            return next_ip
+        return op
+
+    def _op_lt(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] < segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_gt(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] > segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_eq(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] == segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_ne(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] != segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_le(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] <= segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_ge(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        ds, do = self.resolve_writable(res)
+        next_ip = ip + 1
+        def op():
+            segments[ds][do] = segments[ls][lo] >= segments[rs][ro]
+            return next_ip
+        return op
+
+    def _op_print(self, left, right, res, ip):
+        next_ip = ip + 1
+        if isinstance(left, str) and left.startswith('"'):
+            text = left.strip('"')
+            def op():
+                print(text)
+                return next_ip
+            return op
+
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        def op():
+            print(segments[ls][lo])
+            return next_ip
+        return op
+
+    def _op_goto(self, left, right, res, ip):
+        target = int(res)
+        def op():
+            return target
+        return op
+
+    def _op_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if not segments[ls][lo]:
+                return target
+            return next_ip
+        return op
+
+    def _op_era(self, left, right, res, ip):
+        pending_stack = self.pending_stack
+        frame = self.frame_for(left)
+        local_pool = frame['local_pool']
+        local_size = frame['local_size']
+        blank = [None] * local_size
+        next_ip = ip + 1
+        def op():
+            # Un frame reciclado se limpia: una local que se lee antes de
+            # asignarse vale None, no lo que dejó la llamada anterior (los
+            # temporales no hace falta, siempre se escriben antes de leerse)
+            if local_pool:
+                local = local_pool.pop()
+                local[:] = blank
+            else:
+                local = blank[:]
+            pending_stack.append(local)
+            return next_ip
+        return op
+
+    def _op_param(self, left, right, res, ip):
+        segments = self.memory.segments
+        pending_stack = self.pending_stack
+        ls, lo = self.resolve(left)
+        # El destino es un local de la función llamada, no de la actual
+        ds, do = self.memory.resolve(int(res), self.frame_for(self.decode_callee)['offsets'])
+        if ds != LOCAL_SEGMENT:
+            raise Exception(f"PARAM destination {res} is not a local address")
+        next_ip = ip + 1
+        def op():
+            if not pending_stack:
+                raise Exception("PARAM without ERA")
+            pending_stack[-1][do] = segments[ls][lo]
+            return next_ip
+        return op
+
+    def _op_gosub(self, left, right, res, ip):
+        push_frame = self.memory.push_frame
+        frame = self.frame_for(left)
+        temp_pool = frame['temp_pool']
+        temp_size = frame['temp_size']
+        call_stack = self.call_stack
+        pending_stack = self.pending_stack
+        target = int(res)
+        return_ip = ip + 1
+        if frame['memo']:
+            return self.memo_gosub(frame, target, return_ip)
+        def op():
+            call_stack.append(return_ip)
+            if not pending_stack:
+                raise Exception("GOSUB without ERA")
+            push_frame(pending_stack.pop(), temp_pool.pop() if temp_pool else [None] * temp_size)
+            return target
+        return op
+
+    def memo_gosub(self, frame, target, return_ip):
+        # Si los argumentos ya se vieron, se copia el resultado a la variable
+        # de retorno y se regresa el frame pendiente sin ejecutar la función
+        push_frame = self.memory.push_frame
+        segments = self.memory.segments
+        local_pool = frame['local_pool']
+        temp_pool = frame['temp_pool']
+        temp_size = frame['temp_size']
+        call_stack = self.call_stack
+        pending_stack = self.pending_stack
+        memo = frame['memo']
+        cache = memo['cache']
+        keys = memo['keys']
+        params = memo['params']
+        ss, so = memo['slot']
+        missing = object()
+        def op():
+            if not pending_stack:
+                raise Exception("GOSUB without ERA")
+            args = pending_stack[-1]
+            # El tipo va en la llave: 3 y 3.0 son iguales para un dict,
+            # pero e(3) y e(3.0) no imprimen lo mismo
+            key = tuple([(type(args[offset]), args[offset]) for offset in params])
+            value = cache.get(key, missing)
+            if value is not missing:
+                cache.move_to_end(key)
+                memo['hits'] += 1
+                segments[ss][so] = value
+                local_pool.append(pending_stack.pop())
+                return return_ip
+            memo['misses'] += 1
+            keys.append(key)
+            call_stack.append(return_ip)
+            push_frame(pending_stack.pop(), temp_pool.pop() if temp_pool else [None] * temp_size)
+            return target
+        return op
+
+    def _op_endfunc(self, left, right, res, ip):
+        # Los frames regresan al pool de la función para la siguiente llamada
+        memory = self.memory
+        segments = memory.segments
+        local_pool = self.decode_frame['local_pool']
+        temp_pool = self.decode_frame['temp_pool']
+        call_stack = self.call_stack
+        memo = self.decode_frame['memo']
+        if memo:
+            cache = memo['cache']
+            keys = memo['keys']
+            ss, so = memo['slot']
+            size = self.memo_size
+            def op():
+                cache[keys.pop()] = segments[ss][so]
+                if len(cache) > size:
+                    cache.popitem(last=False)
+                    memo['evictions'] += 1
+                local_pool.append(segments[LOCAL_SEGMENT])
+                temp_pool.append(segments[TEMP_SEGMENT])
+                memory.pop_local_memory()
+                return call_stack.pop()
+            return op
+        def op():
+            local_pool.append(segments[LOCAL_SEGMENT])
+            temp_pool.append(segments[TEMP_SEGMENT])
+            memory.pop_local_memory()
+            return call_stack.pop()
+        return op
+
+    def _op_ret(self, left, right, res, ip):
+        next_ip = ip + 1
+        def op():
+            return next_ip
+        return op
+
+    def _op_lt_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] < segments[rs][ro]:
+                return next_ip
+            return target
+        return op
+
+    def _op_gt_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] > segments[rs][ro]:
+                return next_ip
+            return target
+        return op
+
+    def _op_eq_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] == segments[rs][ro]:
+                return next_ip
+            return target
+        return op
+
+    def _op_ne_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] != segments[rs][ro]:
+                return next_ip
+            return target
+        return op
+
+    def _op_le_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] <= segments[rs][ro]:
+                return next_ip
+            return target
+        return op
 
+    def _op_ge_gotof(self, left, right, res, ip):
+        segments = self.memory.segments
+        ls, lo = self.resolve(left)
+        rs, ro = self.resolve(right)
+        target = int(res)
+        next_ip = ip + 1
+        def op():
+            if segments[ls][lo] >= segments[rs][ro]:
+                return next_ip
+            return target
+        return op